@@ -0,0 +1,124 @@
+"""
+Shared helpers of benchmarks.
+
+The corpus is the recorded pages of parser tests,
+the pages are stored in `tests/test_parsers/product_case/pages` by running the tests
+(see :mod:`figure_parser.store`).
+"""
+import gc
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+import inflection
+import yaml
+
+from figure_parser.parsers.regions import make_source
+from figure_parser.store import PageStore
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+TEST_CASE_DIR = ROOT_DIR.joinpath("tests", "test_parsers", "product_case")
+PAGE_STORE_DIR = TEST_CASE_DIR.joinpath("pages")
+
+SITE_PARSERS: Dict[str, str] = {
+    path.stem: inflection.camelize(path.stem) + "ProductParser"
+    for path in sorted(TEST_CASE_DIR.glob("*.yml"))
+}
+"""The sites with test cases, the same naming as `cli.py generate`."""
+
+PARSE_METHODS = (
+    "parse_name",
+    "parse_series",
+    "parse_manufacturer",
+    "parse_category",
+    "parse_releases",
+    "parse_order_period",
+    "parse_size",
+    "parse_scale",
+    "parse_sculptors",
+    "parse_paintworks",
+    "parse_rerelease",
+    "parse_adult",
+    "parse_copyright",
+    "parse_releaser",
+    "parse_distributer",
+    "parse_JAN",
+    "parse_images",
+    "parse_thumbnail",
+    "parse_og_image",
+)
+
+
+@dataclass
+class Page:
+    site: str
+    url: str
+    html: Union[str, bytes]
+
+
+@dataclass
+class Timing:
+    runs: List[float]
+
+    @property
+    def best(self) -> float:
+        return min(self.runs)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.runs)
+
+    def __str__(self) -> str:
+        return f"median {self.median * 1000:8.3f} ms  best {self.best * 1000:8.3f} ms"
+
+
+def load_corpus(
+    sites: Optional[Iterable[str]] = None, store_dir: Path = PAGE_STORE_DIR
+) -> List[Page]:
+    """Load recorded pages of sites, the pages which are not recorded are skipped."""
+    store = PageStore(store_dir)
+    pages = []
+    for site in sites or SITE_PARSERS:
+        with open(TEST_CASE_DIR.joinpath(f"{site}.yml"), encoding="utf-8") as stream:
+            cases = yaml.safe_load(stream)
+        for case in cases:
+            stored = store.get(case["url"])
+            if stored and stored.size:
+                pages.append(Page(site=site, url=case["url"], html=store.read(stored)))
+    return pages
+
+
+def get_parser_class(site: str):
+    import figure_parser.parsers
+
+    return getattr(figure_parser.parsers, SITE_PARSERS[site])
+
+
+def parse_all_fields(parser) -> Dict[str, Any]:
+    return {method: getattr(parser, method)() for method in PARSE_METHODS}
+
+
+def parse_page(page: Page) -> Dict[str, Any]:
+    """Build the pruned soup of page and parse all the fields."""
+    parser_cls = get_parser_class(page.site)
+    source = make_source(page.html, parser_cls.regions)
+    return parse_all_fields(parser_cls.create_parser(url=page.url, source=source))
+
+
+def measure(func: Callable[[], Any], repeat: int = 5, number: int = 1) -> Timing:
+    """Time `func` `repeat` times, each run calls it `number` times."""
+    runs = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            runs.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return Timing(runs)
@@ -0,0 +1,96 @@
+"""
+Measure the cold-start cost of figure_parser with `python -X importtime`.
+
+Usage::
+
+    python -m benchmarks.import_time --repeat 5 --top 15
+"""
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple
+
+import click
+
+SCENARIOS: Dict[str, str] = {
+    "import figure_parser": "import figure_parser",
+    "import factories": "import figure_parser.factories",
+    "create_factory": (
+        "from figure_parser import GeneralBs4ProductFactory\n"
+        "GeneralBs4ProductFactory.create_factory()"
+    ),
+    "route one site": (
+        "from figure_parser import GeneralBs4ProductFactory\n"
+        "factory = GeneralBs4ProductFactory.create_factory()\n"
+        "factory.get_parser_by_url('https://www.goodsmile.info/ja/product/1')"
+    ),
+    "import all parsers": (
+        "import figure_parser.parsers as parsers\n"
+        "for name in parsers.__all__:\n"
+        "    getattr(parsers, name)"
+    ),
+}
+
+
+class ImportRecord(NamedTuple):
+    module: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def run_importtime(code: str) -> List[ImportRecord]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    records = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        depth = (len(module) - len(module.lstrip()) - 1) // 2
+        records.append(
+            ImportRecord(
+                module=module.strip(),
+                depth=depth,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+            )
+        )
+    return records
+
+
+def total_import_time(records: List[ImportRecord]) -> int:
+    """Sum of top-level imports in microseconds."""
+    return sum(r.cumulative_us for r in records if r.depth == 0)
+
+
+@click.command()
+@click.option("--repeat", default=5, show_default=True, help="Runs per scenario.")
+@click.option("--top", default=10, show_default=True, help="Show the slowest N.")
+def main(repeat: int, top: int):
+    for scenario, code in SCENARIOS.items():
+        totals = []
+        records: List[ImportRecord] = []
+        for _ in range(repeat):
+            records = run_importtime(code)
+            totals.append(total_import_time(records))
+
+        click.echo(
+            f"{scenario:<24} median {statistics.median(totals) / 1000:8.2f} ms"
+            f"  (min {min(totals) / 1000:.2f} ms, {len(records)} modules)"
+        )
+        slowest = sorted(
+            (r for r in records if r.depth == 0),
+            key=lambda r: r.cumulative_us,
+            reverse=True,
+        )
+        for r in slowest[:top]:
+            click.echo(f"    {r.cumulative_us / 1000:8.2f} ms  {r.module}")
+
+
+if __name__ == "__main__":
+    main()
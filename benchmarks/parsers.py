@@ -0,0 +1,121 @@
+"""
+Benchmark the site parsers on the recorded corpus.
+
+Usage::
+
+    python -m benchmarks.parsers alter native --repeat 10
+    python -m benchmarks.parsers alter --page http://www.alter-web.jp/products/261/=page.html
+    python -m benchmarks.parsers amakuni --variant AmakuniLegacyParser
+"""
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import click
+from bs4 import BeautifulSoup
+
+from figure_parser.core.parser_base import ParserVariants
+from figure_parser.parsers.regions import make_source
+from figure_parser.parsers.source_cache import SourceCache
+from figure_parser.profiling import measure_heap
+
+from .harness import (
+    SITE_PARSERS,
+    Page,
+    get_parser_class,
+    load_corpus,
+    measure,
+    parse_all_fields,
+    parse_page,
+)
+
+
+@click.command()
+@click.argument("sites", nargs=-1, type=click.Choice(list(SITE_PARSERS)))
+@click.option("--repeat", default=5, show_default=True)
+@click.option("--number", default=10, show_default=True, help="Calls per run.")
+@click.option(
+    "--page",
+    "extra_pages",
+    multiple=True,
+    help="Extra page as URL=PATH, the site is the first of SITES.",
+)
+@click.option(
+    "--variant",
+    help="Only the pages parsed by the variant parser of sites (class name).",
+)
+def main(
+    sites: Tuple[str, ...],
+    repeat: int,
+    number: int,
+    extra_pages: List[str],
+    variant: Optional[str],
+):
+    sites = sites or tuple(SITE_PARSERS)
+    pages = load_corpus(sites)
+    for extra_page in extra_pages:
+        url, _, path = extra_page.partition("=")
+        pages.append(Page(site=sites[0], url=url, html=Path(path).read_text("utf-8")))
+    if variant:
+        pages = [page for page in pages if get_variant(page) == variant]
+    run_benchmark(pages, repeat=repeat, number=number)
+
+
+def get_variant(page: Page) -> str:
+    """The name of parser class which parses the page, see `ParserVariants`."""
+    parser_cls = get_parser_class(page.site)
+    if issubclass(parser_cls, ParserVariants):
+        parser_cls = parser_cls.select_parser(BeautifulSoup(page.html, "lxml"))
+    return parser_cls.__name__
+
+
+def run_benchmark(pages: List[Page], repeat: int = 5, number: int = 10):
+    """Report the timings and the heap usage of each page."""
+    if not pages:
+        raise click.ClickException("No recorded page. Run the parser tests first.")
+
+    with tempfile.TemporaryDirectory(prefix="source-cache-") as cache_dir:
+        source_cache = SourceCache(cache_dir)
+        for page in pages:
+            parser_cls = get_parser_class(page.site)
+            source = BeautifulSoup(page.html, "lxml")
+
+            soup_timing = measure(
+                lambda: BeautifulSoup(page.html, "lxml"), repeat=repeat, number=1
+            )
+            pruned_soup_timing = measure(
+                lambda: make_source(page.html, parser_cls.regions),
+                repeat=repeat,
+                number=1,
+            )
+            cached_soup_timing = measure(
+                lambda: source_cache.make_source(page.html, parser_cls.regions),
+                repeat=repeat,
+                number=1,
+            )
+            create_timing = measure(
+                lambda: parser_cls.create_parser(url=page.url, source=source),
+                repeat=repeat,
+                number=number,
+            )
+            fields_timing = measure(
+                lambda: parse_all_fields(
+                    parser_cls.create_parser(url=page.url, source=source)
+                ),
+                repeat=repeat,
+                number=number,
+            )
+            click.echo(f"[{page.site}] {page.url}")
+            click.echo(f"    soup           {soup_timing}")
+            click.echo(f"    pruned soup    {pruned_soup_timing}")
+            click.echo(f"    cached soup    {cached_soup_timing}")
+            click.echo(f"    create_parser  {create_timing}")
+            click.echo(f"    all fields     {fields_timing}")
+            click.echo(f"    fields/s       {1 / fields_timing.median:10.1f} pages/s")
+
+            parse_page(page)
+            click.echo(f"    heap           {measure_heap(lambda: parse_page(page))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Fuzz the regular expressions of parsers and pipes with adversarial inputs.
+
+The patterns are collected statically:
+
+* literals passed to `re.*` calls (directly or through a local variable),
+* templates (`str.format` / f-string) which are rendered with hostile values,
+  patterns interpolating unescaped text show up as compile errors,
+* strings with regex syntax in the site data (yaml).
+
+Each pattern is run with `findall` over long inputs made of its own literal
+characters, the worst-case time and the growth between the two largest sizes
+(1.0 is linear, 2.0 is quadratic) are reported.
+A case is interrupted by :func:`figure_parser.regex.regex_budget`.
+
+Usage::
+
+    python -m benchmarks.regex_audit --sizes 500,2000,8000 --timeout 2
+"""
+import ast
+import math
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import click
+
+from figure_parser import regex
+from figure_parser.exceptions import RegexBudgetExceeded
+from figure_parser.parsers.site_data import load_site_data
+
+from .harness import ROOT_DIR
+
+PACKAGE_DIR = ROOT_DIR.joinpath("figure_parser")
+SOURCE_DIRS = (PACKAGE_DIR.joinpath("parsers"), PACKAGE_DIR.joinpath("pipes"))
+RE_FUNCTIONS = frozenset(
+    {
+        "compile",
+        "search",
+        "match",
+        "fullmatch",
+        "sub",
+        "subn",
+        "split",
+        "findall",
+        "finditer",
+    }
+)
+HOSTILE_VALUES = ("シリーズ", "a(b", "[", "(?<=", "\\")
+"""
+The values interpolated into pattern templates,
+the rendered templates are compiled only since their inputs are unknown.
+"""
+FILLERS = (" ", "a", "1", "・", "：", "(", "年", "\n")
+_REGEX_SYNTAX = re.compile(r"[\\\[\](){}|*+?^$]")
+_MAX_ALPHABET = 16
+
+
+@dataclass
+class PatternCase:
+    pattern: str
+    location: str
+    templated: bool = False
+
+
+@dataclass
+class AuditResult:
+    case: PatternCase
+    worst_seconds: float = 0.0
+    worst_input: str = ""
+    growth: Optional[float] = None
+    error: Optional[str] = None
+    timings: List[Tuple[str, int, float]] = field(default_factory=list)
+
+    @property
+    def status(self) -> str:
+        if self.error:
+            return self.error
+        if self.case.templated:
+            return "compiled"
+        if self.growth is not None and self.growth > 1.5:
+            return "superlinear"
+        return "ok"
+
+
+def collect_source_patterns(
+    source_dirs: Sequence[Path] = SOURCE_DIRS,
+) -> List[PatternCase]:
+    cases: List[PatternCase] = []
+    for source_dir in source_dirs:
+        for path in sorted(source_dir.rglob("*.py")):
+            source = path.read_text("utf-8")
+            location = str(path.relative_to(ROOT_DIR))
+            cases.extend(_collect_from_module(ast.parse(source), source, location))
+    return cases
+
+
+def collect_data_patterns(package_dir: Path = PACKAGE_DIR) -> List[PatternCase]:
+    cases = []
+    for path in sorted(package_dir.rglob("*.yml")):
+        location = str(path.relative_to(ROOT_DIR))
+        for key, value in _iter_leaves(load_site_data(path)):
+            if isinstance(value, re.Pattern):
+                cases.append(PatternCase(value.pattern, f"{location}:{key}"))
+            elif isinstance(value, str) and _REGEX_SYNTAX.search(value):
+                cases.append(PatternCase(value, f"{location}:{key}"))
+    return cases
+
+
+def audit_pattern(
+    case: PatternCase, sizes: Sequence[int], timeout: float
+) -> AuditResult:
+    result = AuditResult(case)
+    try:
+        compiled = re.compile(case.pattern)
+    except re.error as e:
+        result.error = f"compile error: {e}"
+        return result
+    if case.templated:
+        return result
+
+    growth_points: dict = {}
+    for name, unit in _adversarial_units(case.pattern):
+        for size in sizes:
+            text = unit * max(size // len(unit), 1) + "\x00"
+            start = time.perf_counter()
+            try:
+                with regex.regex_budget(timeout):
+                    regex.findall(compiled, text)
+            except RegexBudgetExceeded:
+                result.error = f"timeout ({timeout}s) on {name} x {size}"
+                result.worst_seconds = timeout
+                result.worst_input = f"{name} x {size}"
+                return result
+            elapsed = time.perf_counter() - start
+            result.timings.append((name, size, elapsed))
+            if elapsed > result.worst_seconds:
+                result.worst_seconds = elapsed
+                result.worst_input = f"{name} x {size}"
+            growth_points.setdefault(name, []).append((size, elapsed))
+
+    result.growth = _worst_growth(growth_points.values())
+    return result
+
+
+def _collect_from_module(
+    module: ast.Module, source: str, location: str
+) -> Iterator[PatternCase]:
+    for node in ast.walk(module):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        assigned = _local_assignments(node)
+        for call in ast.walk(node):
+            pattern_node = _pattern_argument(call)
+            if isinstance(pattern_node, ast.Name):
+                pattern_node = assigned.get(pattern_node.id)
+            if not isinstance(pattern_node, ast.expr):
+                continue
+            yield from _pattern_cases(
+                pattern_node, source, f"{location}:{pattern_node.lineno}"
+            )
+
+
+def _local_assignments(function: ast.AST) -> Dict[str, ast.expr]:
+    assigned: Dict[str, ast.expr] = {}
+    for node in ast.walk(function):
+        if (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+        ):
+            assigned[node.targets[0].id] = node.value
+    return assigned
+
+
+def _pattern_argument(node: ast.AST) -> Optional[ast.AST]:
+    if not (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and isinstance(node.func.value, ast.Name)
+        and node.func.value.id == "re"
+        and node.func.attr in RE_FUNCTIONS
+    ):
+        return None
+    if node.args:
+        return node.args[0]
+    for keyword in node.keywords:
+        if keyword.arg == "pattern":
+            return keyword.value
+    return None
+
+
+def _pattern_cases(node: ast.AST, source: str, location: str) -> Iterator[PatternCase]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        yield PatternCase(node.value, location)
+        return
+
+    # "...{}...".format(value)
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr == "format"
+        and isinstance(node.func.value, ast.Constant)
+        and isinstance(node.func.value.value, str)
+    ):
+        template = node.func.value.value
+        for value in HOSTILE_VALUES:
+            yield PatternCase(_format(template, value, node), location, templated=True)
+        return
+
+    # f"...{value}..."
+    if isinstance(node, ast.JoinedStr):
+        for value in HOSTILE_VALUES:
+            rendered = "".join(
+                str(part.value) if isinstance(part, ast.Constant) else value
+                for part in node.values
+            )
+            yield PatternCase(rendered, location, templated=True)
+
+
+def _format(template: str, value: str, node: ast.Call) -> str:
+    if "re.escape" in ast.unparse(node):
+        value = re.escape(value)
+    return template.replace("{}", value)
+
+
+def _iter_leaves(data: Any, prefix: str = "") -> Iterator[Tuple[str, Any]]:
+    if hasattr(data, "items"):
+        for key, value in data.items():
+            yield from _iter_leaves(value, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(data, (list, tuple)):
+        for index, value in enumerate(data):
+            yield from _iter_leaves(value, f"{prefix}[{index}]")
+    else:
+        yield prefix, data
+
+
+def _adversarial_units(pattern: str) -> List[Tuple[str, str]]:
+    """Repeated units built from the literal characters of the pattern."""
+    literals = [
+        char
+        for char in dict.fromkeys(
+            re.sub(r"\\[a-zA-Z]|\(\?P<\w+>|[\\\[\](){}|*+?^$.]", "", pattern)
+        )
+        if not char.isspace()
+    ][:_MAX_ALPHABET]
+    alphabet = list(dict.fromkeys(literals + list(FILLERS)))
+    units = [(repr(char), char) for char in alphabet]
+    units.append(("literals", "".join(literals) or "a"))
+    units.append(("literals+fillers", "".join(literals) + "".join(FILLERS)))
+    return units
+
+
+def _worst_growth(series) -> Optional[float]:
+    growth = None
+    for points in series:
+        if len(points) < 2:
+            continue
+        (small_size, small_time), (large_size, large_time) = points[-2:]
+        if small_time <= 0 or large_time < 1e-3:
+            # Too fast to tell.
+            continue
+        exponent = math.log(large_time / small_time) / math.log(large_size / small_size)
+        growth = exponent if growth is None else max(growth, exponent)
+    return growth
+
+
+@click.command()
+@click.option(
+    "--sizes", default="500,2000,8000", show_default=True, help="Input lengths."
+)
+@click.option(
+    "--timeout", default=2.0, show_default=True, help="Seconds per pattern input."
+)
+@click.option("--top", default=20, show_default=True, help="Show the slowest N.")
+def main(sizes: str, timeout: float, top: int):
+    input_sizes = sorted(int(size) for size in sizes.split(","))
+    cases = collect_source_patterns() + collect_data_patterns()
+    click.echo(f"{len(cases)} patterns collected.", err=True)
+
+    results = [audit_pattern(case, input_sizes, timeout) for case in cases]
+    results.sort(key=lambda r: (r.error is None, -r.worst_seconds))
+    for result in results[:top]:
+        growth = f"{result.growth:.2f}" if result.growth is not None else "-"
+        click.echo(
+            f"{result.worst_seconds * 1000:9.2f} ms  growth {growth:>5}  "
+            f"{result.status:<12} {result.case.location}"
+        )
+        click.echo(f"    {result.case.pattern!r}  worst input: {result.worst_input}")
+
+    failed = [r for r in results if r.status not in ("ok", "compiled")]
+    click.echo(f"{len(failed)} of {len(results)} patterns need attention.", err=True)
+
+
+if __name__ == "__main__":
+    main()
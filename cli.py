@@ -1,15 +1,19 @@
 import os
+from functools import partial
 from pathlib import Path
 from shutil import rmtree
+from typing import Dict, Optional
 
 import click
 import inflection
+import yaml
 from mako.template import Template
 
 Here = Path(os.path.dirname(__file__)).resolve()
 Parser_Test_Dir = Here.joinpath("tests", "test_parsers")
 Parser_Test_Case_Dir = Parser_Test_Dir.joinpath("product_case")
 Parser_Dir = Here.joinpath("figure_parser", "parsers")
+Parser_Manifest_File = Parser_Dir.joinpath("manifest.yml")
 Template_Dir = Here.joinpath("templates")
 
 site_parser_init_template = Template(
@@ -39,6 +43,10 @@ class Target:
     def site_parser_init_file(self):
         return self.parser_dir.joinpath("__init__.py")
 
+    @property
+    def parser_path(self):
+        return f"figure_parser.parsers.{self.snake_name}:{self.camel_name}ProductParser"
+
     @property
     def test_case_file(self):
         return Parser_Test_Case_Dir.joinpath(f"{self.snake_name}.yml")
@@ -68,7 +76,7 @@ class Target:
             with open(path, "w", encoding="utf-8") as f:
                 f.write(str(template.render(**kwargs)))
 
-    def generate(self):
+    def generate(self, domain: Optional[str] = None):
         self.parser_dir.mkdir(exist_ok=True)
         self.generate_file(
             self.site_parser_init_file,
@@ -91,13 +99,35 @@ class Target:
             test_case_template,
             name=self.camel_name,
         )
+        if domain:
+            self.register(domain)
         self.post_process()
 
+    def register(self, domain: str):
+        manifest = load_manifest()
+        if manifest.get(domain) == self.parser_path:
+            return
+        click.echo(f"Register {domain} -> {self.parser_path} ({Parser_Manifest_File})")
+        manifest[domain] = self.parser_path
+        dump_manifest(manifest)
+
+    def unregister(self):
+        manifest = load_manifest()
+        remaining = {
+            domain: parser
+            for domain, parser in manifest.items()
+            if parser != self.parser_path
+        }
+        if remaining != manifest:
+            click.echo(f"Unregister {self.parser_path} ({Parser_Manifest_File})")
+            dump_manifest(remaining)
+
     def remove(self):
         self._rm(self.parser_dir)
         self._rm(self.parser_test_file)
         self._rm(self.test_case_file)
         self._rm(self.site_parser_init_file)
+        self.unregister()
         self.post_process()
 
     def post_process(self):
@@ -116,6 +146,17 @@ class Target:
         )
 
 
+def load_manifest() -> Dict[str, str]:
+    with open(Parser_Manifest_File, "r", encoding="utf-8") as stream:
+        return yaml.safe_load(stream) or {}
+
+
+def dump_manifest(manifest: Dict[str, str]):
+    with open(Parser_Manifest_File, "w", encoding="utf-8") as stream:
+        stream.write("# domain: import path of the parser (package.module:ClassName)\n")
+        yaml.safe_dump(dict(sorted(manifest.items())), stream, allow_unicode=True)
+
+
 def get_existing_sites():
     return sorted(
         [
@@ -143,10 +184,11 @@ def _list():
 
 @main.command()
 @click.argument("name")
-def generate(name):
+@click.option("--domain", help="Register the parser for DOMAIN in the manifest.")
+def generate(name, domain):
     "Generate new parser files with NAME (snakecase)"
     target = Target(name=name)
-    target.generate()
+    target.generate(domain=domain)
 
 
 @main.command()
@@ -157,5 +199,195 @@ def remove(name):
     target.remove()
 
 
+@main.command()
+@click.argument("source", type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "-o",
+    "--output",
+    default="-",
+    show_default=True,
+    help="The output file, `-` for stdout.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["jsonl", "parquet"]),
+    help="The output format, inferred from the suffix of output by default.",
+)
+@click.option("--workers", type=int, help="The number of workers.")
+@click.option(
+    "--chunk-size",
+    default=16,
+    show_default=True,
+    help="Pages sent to a worker at once.",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(["process", "thread", "async"]),
+    default="process",
+    show_default=True,
+)
+@click.option(
+    "--encoding", help="The encoding of pages if it's not declared in records."
+)
+@click.option(
+    "--no-prune", is_flag=True, help="Build the whole page instead of the regions."
+)
+@click.option("--time-budget", type=float, help="The wall-time budget of a page (s).")
+@click.option("--memory-budget", type=int, help="The memory budget of a page (MB).")
+@click.option(
+    "--hard-budget",
+    is_flag=True,
+    help="Interrupt the parsing of a page on overrun (process backend only).",
+)
+@click.option(
+    "--source-cache",
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Cache the region snapshots of pages in the directory for repeated runs.",
+)
+def parse(
+    source,
+    output,
+    output_format,
+    workers,
+    chunk_size,
+    backend,
+    encoding,
+    no_prune,
+    time_budget,
+    memory_budget,
+    hard_budget,
+    source_cache,
+):
+    """
+    Parse the pages in SOURCE and write the products.
+
+    SOURCE is a JSON Lines file of {"url", "html"} records, a spool or WARC file,
+    a page store, or a directory of them.
+    """
+    from figure_parser.archive import is_archive, iter_records
+    from figure_parser.batch import BatchRunner, BatchStats
+    from figure_parser.factories import GeneralBs4ProductFactory
+    from figure_parser.sinks import open_sink
+
+    factory_builder = partial(
+        GeneralBs4ProductFactory.create_factory,
+        time_budget=time_budget,
+        memory_budget=memory_budget * 2**20 if memory_budget else None,
+        source_cache=source_cache,
+    )
+    runner = BatchRunner(
+        factory_builder=factory_builder,
+        workers=workers,
+        chunk_size=chunk_size,
+        prune=not no_prune,
+        backend=backend,
+        hard_budget=hard_budget or None,
+    )
+    if is_archive(source) and not encoding:
+        results = runner.run_archive(source)
+    else:
+        results = runner.run(iter_records(source), encoding=encoding)
+
+    stats = BatchStats()
+    try:
+        sink = open_sink(output, output_format)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    with sink:
+        for result in results:
+            sink.write(result)
+            stats.add(result)
+    stats.finish()
+    click.echo(stats.summary(), err=True)
+
+
+@main.command("profile")
+@click.argument("source", type=click.Path(exists=True, path_type=Path))
+@click.option("--top", default=20, show_default=True, help="Show the slowest N.")
+@click.option(
+    "--collapsed",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write the collapsed stacks (for flamegraph.pl or speedscope) to the file.",
+)
+@click.option("--limit", type=int, help="Profile the first N pages only.")
+@click.option(
+    "--no-prune", is_flag=True, help="Build the whole page instead of the regions."
+)
+def _profile(source, top, collapsed, limit, no_prune):
+    """
+    Profile the parsing of pages in SOURCE (see `parse`).
+
+    The time is aggregated by site, field, pipe and selector/regex call site.
+    """
+    from itertools import islice
+
+    from figure_parser.archive import iter_records
+    from figure_parser.profiling import profile_pages
+
+    report = profile_pages(islice(iter_records(source), limit), prune=not no_prune)
+    click.echo(report.format_top(top))
+    if collapsed:
+        with open(collapsed, "w", encoding="utf-8") as stream:
+            report.write_collapsed(stream)
+        click.echo(f"Collapsed stacks are written to {collapsed}", err=True)
+
+
+@main.command()
+@click.argument("source", type=click.Path(exists=True, path_type=Path))
+@click.argument("golden_dir", type=click.Path(file_okay=False, path_type=Path))
+@click.option("--update", is_flag=True, help="Write the changed and missing files.")
+@click.option("--workers", type=int, help="The number of workers.")
+@click.option(
+    "--backend",
+    type=click.Choice(["process", "thread", "async"]),
+    default="process",
+    show_default=True,
+)
+def golden(source, golden_dir, update, workers, backend):
+    """
+    Check the products of pages in SOURCE (see `parse`) against GOLDEN_DIR.
+
+    Only the mismatches are reported, the exit code is 1 if there is any.
+    """
+    from figure_parser.archive import iter_records
+    from figure_parser.batch import BatchRunner
+    from figure_parser.golden import check_golden
+
+    runner = BatchRunner(workers=workers, backend=backend)
+    report = check_golden(runner.run(iter_records(source)), golden_dir, update=update)
+    click.echo(report.format())
+    if not report.ok:
+        raise SystemExit(1)
+
+
+@main.command()
+@click.argument("source", type=click.Path(exists=True, path_type=Path))
+@click.option("--baseline", default="whole", show_default=True)
+@click.option("--candidate", default="pruned", show_default=True)
+@click.option("--limit", type=int, help="Compare the first N pages only.")
+def diff(source, baseline, candidate, limit):
+    """
+    Compare the products of pages in SOURCE (see `parse`) by two configurations.
+
+    A configuration is a preset (pruned, whole or concurrent-fields) or the
+    import path of a factory builder (`package.module:callable`).
+    The exit code is 1 if any product diverges.
+    """
+    from itertools import islice
+
+    from figure_parser.archive import iter_records
+    from figure_parser.differential import resolve_config, run_differential
+
+    try:
+        configs = resolve_config(baseline), resolve_config(candidate)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    report = run_differential(islice(iter_records(source), limit), *configs)
+    click.echo(report.format())
+    if report.divergences:
+        raise SystemExit(1)
+
+
 if __name__ == "__main__":
     main()
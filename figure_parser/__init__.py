@@ -1,5 +1,10 @@
-from .core import OrderPeriod, PriceTag, ProductBase, Release
-from .factories import Bs4ProductFactory, GeneralBs4ProductFactory
+from typing import TYPE_CHECKING
+
+from ._lazy import lazy_module
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .core import OrderPeriod, PriceTag, ProductBase, Release
+    from .factories import Bs4ProductFactory, GeneralBs4ProductFactory
 
 __all__ = (
     "OrderPeriod",
@@ -9,3 +14,15 @@ __all__ = (
     "Bs4ProductFactory",
     "GeneralBs4ProductFactory",
 )
+
+# Attributes are imported on first access (PEP 562) to keep `import figure_parser` cheap.
+_lazy_attributes = {
+    "OrderPeriod": ".core",
+    "ProductBase": ".core",
+    "Release": ".core",
+    "PriceTag": ".core",
+    "Bs4ProductFactory": ".factories",
+    "GeneralBs4ProductFactory": ".factories",
+}
+
+__getattr__, __dir__ = lazy_module(__name__, _lazy_attributes)
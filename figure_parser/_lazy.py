@@ -0,0 +1,29 @@
+import sys
+from importlib import import_module
+from typing import Any, Callable, List, Mapping, Tuple
+
+
+def lazy_module(
+    module_name: str, attributes: Mapping[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Make the `__getattr__` and `__dir__` of module (PEP 562),
+    the attributes are imported from their (relative) modules on first access.
+
+    .. code-block:: python
+
+        __getattr__, __dir__ = lazy_module(__name__, {"ProductBase": ".models"})
+    """
+
+    def __getattr__(name: str) -> Any:
+        source = attributes.get(name)
+        if source is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        value = getattr(import_module(source, module_name), name)
+        setattr(sys.modules[module_name], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted({*vars(sys.modules[module_name]), *attributes})
+
+    return __getattr__, __dir__
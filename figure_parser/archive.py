@@ -0,0 +1,182 @@
+"""
+Offline ingestion of archived crawls.
+
+Two archive formats are supported, both are read in place through `mmap`:
+
+* the spool file written by :class:`figure_parser.spool.SpoolWriter`
+* uncompressed WARC files, `response` records with http 2xx are indexed,
+  the references point to the http payload.
+
+JSON Lines files of `{"url": ..., "html": ...}` records and page stores
+(:mod:`figure_parser.store`) are read by :func:`iter_records` as well.
+
+.. code-block:: python
+
+    refs = index_archive("crawl.warc")
+    for shard in shard_by_offset(refs, 4):
+        ...
+"""
+import json
+import mmap
+import os
+import re
+from math import ceil
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .spool import SPOOL_MAGIC, PageRef, index_spool, map_file, map_spool, read_page
+from .store import PageStore, is_page_store
+
+WARC_MAGIC = b"WARC/"
+_HEADER_END = b"\r\n\r\n"
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+_CHARSET_PATTERN = re.compile(r"charset=[\"']?([\w\-]+)", re.IGNORECASE)
+
+
+def index_archive(path: Union[str, Path]) -> List[PageRef]:
+    """Index the records of spool or WARC file by its magic."""
+    with open(path, "rb") as f:
+        magic = f.read(len(SPOOL_MAGIC))
+
+    if magic == SPOOL_MAGIC:
+        with map_spool(path) as mapped:
+            return index_spool(mapped, path)
+    if magic.startswith(WARC_MAGIC):
+        with map_file(path) as mapped:
+            return index_warc(mapped, path)
+    raise ValueError(f"{path} is neither a spool nor a WARC file.")
+
+
+def index_warc(mapped: mmap.mmap, path: Union[str, Path]) -> List[PageRef]:
+    """
+    Index the http payloads of WARC `response` records.
+
+    Payloads with `Content-Encoding` or `Transfer-Encoding` can't be read
+    in place and are skipped, as well as non-2xx responses.
+    """
+    refs = []
+    offset = 0
+    size = len(mapped)
+    while offset < size:
+        if mapped[offset : offset + len(WARC_MAGIC)] != WARC_MAGIC:
+            raise ValueError(f"Invalid WARC record at {offset} in {path}.")
+        header_end = mapped.find(_HEADER_END, offset)
+        if header_end == -1:
+            raise ValueError(f"Truncated WARC header at {offset} in {path}.")
+        headers = _parse_headers(mapped[offset:header_end])
+        block_offset = header_end + len(_HEADER_END)
+        content_length = headers.get("content-length")
+        if content_length is None or not content_length.isdigit():
+            raise ValueError(f"Invalid WARC Content-Length at {offset} in {path}.")
+        block_length = int(content_length)
+        block_end = block_offset + block_length
+        if block_end > size:
+            raise ValueError(f"Truncated WARC record at {offset} in {path}.")
+
+        if headers.get("warc-type") == "response":
+            ref = _index_http_payload(
+                mapped, path, block_offset, block_end, headers["warc-target-uri"]
+            )
+            if ref:
+                refs.append(ref)
+
+        # The block is followed by two CRLFs.
+        offset = block_end + len(_HEADER_END)
+    return refs
+
+
+def shard_by_offset(refs: List[PageRef], shards: int) -> List[List[PageRef]]:
+    """
+    Split the references into contiguous offset ranges,
+    each shard is read sequentially from its file.
+    """
+    ordered = sorted(refs, key=lambda ref: (ref.path, ref.offset))
+    if not ordered:
+        return []
+    size = ceil(len(ordered) / max(shards, 1))
+    return [ordered[i : i + size] for i in range(0, len(ordered), size)]
+
+
+def iter_archive(path: Union[str, Path]) -> Iterator[Tuple[str, Union[str, bytes]]]:
+    """Stream `(url, body)` of the archive."""
+    refs = index_archive(path)
+    with map_file(path) as mapped:
+        for ref in refs:
+            yield ref.url, read_page(mapped, ref)
+
+
+def iter_records(path: Union[str, Path]) -> Iterator[Tuple[str, Union[str, bytes]]]:
+    """
+    Stream `(url, body)` of a JSON Lines, spool or WARC file, or a page store.
+    The files of a directory are read recursively in name order.
+    """
+    path = Path(path)
+    if is_page_store(path):
+        yield from PageStore(path).iter_pages()
+        return
+
+    if path.is_dir():
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if not name.startswith("."):
+                    yield from iter_records(Path(root, name))
+        return
+
+    if path.suffix in JSONL_SUFFIXES:
+        with open(path, "r", encoding="utf-8") as stream:
+            for line in stream:
+                if line.strip():
+                    record = json.loads(line)
+                    yield record["url"], record["html"]
+        return
+
+    yield from iter_archive(path)
+
+
+def is_archive(path: Union[str, Path]) -> bool:
+    """Check the file is a spool or WARC file which could be indexed in place."""
+    if not os.path.isfile(path):
+        return False
+    with open(path, "rb") as f:
+        magic = f.read(len(SPOOL_MAGIC))
+    return magic == SPOOL_MAGIC or magic.startswith(WARC_MAGIC)
+
+
+def _index_http_payload(
+    mapped: mmap.mmap,
+    path: Union[str, Path],
+    block_offset: int,
+    block_end: int,
+    url: str,
+) -> Optional[PageRef]:
+    header_end = mapped.find(_HEADER_END, block_offset, block_end)
+    if header_end == -1:
+        return None
+
+    status_line, _, raw_headers = mapped[block_offset:header_end].partition(b"\r\n")
+    status = status_line.split(b" ", 2)
+    if len(status) < 2 or not status[1].startswith(b"2"):
+        return None
+    headers = _parse_headers(raw_headers)
+    if "content-encoding" in headers or "transfer-encoding" in headers:
+        return None
+
+    charset = _CHARSET_PATTERN.search(headers.get("content-type", ""))
+    payload_offset = header_end + len(_HEADER_END)
+    return PageRef(
+        path=str(path),
+        offset=payload_offset,
+        length=block_end - payload_offset,
+        url=url,
+        encoding=charset.group(1) if charset else None,
+    )
+
+
+def _parse_headers(raw: bytes) -> Dict[str, str]:
+    headers = {}
+    for line in raw.decode("latin-1").split("\r\n"):
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return headers
@@ -0,0 +1,348 @@
+"""
+Parse pages in batch.
+
+With the process backend, pages are written into a spool file
+(in `/dev/shm` if it's available) and workers receive
+:class:`figure_parser.spool.PageRef` descriptors only,
+the bodies are read from the memory-mapped spool instead of being pickled.
+"""
+import asyncio
+import mmap
+import os
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .archive import index_archive, iter_archive
+from .core.factory_base import GenericProductFactory
+from .core.models import ProductBase
+from .exceptions import BudgetExceeded
+from .spool import PageRef, SpoolWriter, map_file, read_page
+
+FactoryBuilder = Callable[[], GenericProductFactory]
+Page_T = Tuple[str, Union[bytes, str]]
+
+BACKENDS = ("process", "thread", "async")
+
+_SHM_DIR = "/dev/shm"
+
+
+class BatchResult(NamedTuple):
+    url: str
+    product: Optional[ProductBase] = None
+    error: Optional[str] = None
+    error_info: Optional[Dict[str, Any]] = None
+    """The details of budget overruns, see :meth:`BudgetExceeded.to_dict`."""
+
+    @property
+    def error_type(self) -> Optional[str]:
+        return self.error.split(":", 1)[0] if self.error else None
+
+
+@dataclass
+class BatchStats:
+    """Throughput and error statistics of a batch."""
+
+    total: int = 0
+    failed: int = 0
+    errors: Counter = field(default_factory=Counter)
+    started_at: float = field(default_factory=time.perf_counter)
+    finished_at: Optional[float] = None
+
+    def add(self, result: BatchResult):
+        self.total += 1
+        if result.error:
+            self.failed += 1
+            self.errors[result.error_type] += 1
+
+    def finish(self):
+        self.finished_at = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Pages per second."""
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.total} pages in {self.elapsed:.2f}s "
+            f"({self.throughput:.1f} pages/s), {self.failed} failed"
+        ]
+        for error_type, count in self.errors.most_common():
+            lines.append(f"  {error_type}: {count}")
+        return "\n".join(lines)
+
+
+def _default_factory_builder() -> GenericProductFactory:
+    from .factories import GeneralBs4ProductFactory
+
+    return GeneralBs4ProductFactory.create_factory()
+
+
+class BatchRunner:
+    """
+    Parse pages with a pool of workers.
+
+    .. code-block:: python
+
+        runner = BatchRunner(workers=4)
+        for result in runner.run(pages, encoding="utf-8"):
+            ...
+
+    :param factory_builder: Picklable callable which creates the factory in workers.
+    :param workers: The number of workers.
+    :param chunk_size: The number of pages sent to a worker at once.
+    :param spool_pages: The number of pages in a spool file,
+        it bounds the memory used by spool.
+    :param spool_dir: The directory of spool files,
+        `/dev/shm` is used if it's available.
+    :param prune: See :meth:`GenericProductFactory.create_product_from_html`.
+    :param backend: One of :data:`BACKENDS`.
+        `process` parses in a process pool through spool files,
+        `thread` and `async` share one factory in a thread pool of current process
+        (see :meth:`run_async`).
+    :param hard_budget: Override :attr:`GenericProductFactory.hard_budget` of
+        the factories in process workers, the setting of `factory_builder` is
+        kept by default. The budgets are never hard in threads.
+    """
+
+    def __init__(
+        self,
+        factory_builder: FactoryBuilder = _default_factory_builder,
+        workers: Optional[int] = None,
+        chunk_size: int = 16,
+        spool_pages: int = 1024,
+        spool_dir: Optional[Union[str, Path]] = None,
+        prune: bool = True,
+        backend: str = "process",
+        hard_budget: Optional[bool] = None,
+    ) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"backend should be one of {BACKENDS}, got {backend!r}.")
+        self.factory_builder = factory_builder
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.spool_pages = spool_pages
+        self.spool_dir = str(spool_dir) if spool_dir else _get_spool_dir()
+        self.prune = prune
+        self.backend = backend
+        self.hard_budget = hard_budget
+
+    def run(
+        self, pages: Iterable[Page_T], encoding: Optional[str] = None
+    ) -> Iterator[BatchResult]:
+        """
+        Parse the pages of `(url, body)`, the results are in the same order.
+
+        :param encoding: The encoding of bytes bodies, the bodies are decoded
+            in workers directly from the mapped spool if it's given.
+        """
+        if self.backend == "thread":
+            yield from self._run_threads(pages, encoding)
+            return
+        if self.backend == "async":
+            yield from _iterate_async(self.run_async(pages, encoding))  # type: ignore
+            return
+
+        with self._create_executor() as executor:
+            for refs in self._spool(pages, encoding):
+                try:
+                    yield from executor.map(
+                        _parse_page, refs, chunksize=self.chunk_size
+                    )
+                finally:
+                    os.unlink(refs[0].path)
+
+    def run_refs(self, refs: Iterable[PageRef]) -> Iterator[BatchResult]:
+        """Parse the pages which are in spool or archive files already."""
+        with self._create_executor() as executor:
+            yield from executor.map(_parse_page, refs, chunksize=self.chunk_size)
+
+    def run_archive(self, path: Union[str, Path]) -> Iterator[BatchResult]:
+        """
+        Parse the pages of a spool or WARC file,
+        see :func:`figure_parser.archive.index_archive`.
+
+        The records are sent to workers in offset order, `chunk_size` records
+        at once, so a worker reads a contiguous range of the file sequentially
+        and the results are yielded as the chunks are done.
+        """
+        if self.backend != "process":
+            yield from self.run(iter_archive(path))
+            return
+
+        refs = sorted(index_archive(path), key=lambda ref: (ref.path, ref.offset))
+        yield from self.run_refs(refs)
+
+    async def run_async(
+        self, pages: Iterable[Page_T], encoding: Optional[str] = None
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Parse the pages in a thread pool without blocking the event loop,
+        the results are yielded in order.
+        """
+        loop = asyncio.get_running_loop()
+        with self.factory_builder() as factory, ThreadPoolExecutor(
+            max_workers=self.workers
+        ) as executor:
+            for batch in self._windows(pages):
+                results = await asyncio.gather(
+                    *(
+                        loop.run_in_executor(
+                            executor,
+                            parse_page,
+                            factory,
+                            url,
+                            _decode(body, encoding),
+                            self.prune,
+                        )
+                        for url, body in batch
+                    )
+                )
+                for result in results:
+                    yield result
+
+    def _run_threads(
+        self, pages: Iterable[Page_T], encoding: Optional[str]
+    ) -> Iterator[BatchResult]:
+        with self.factory_builder() as factory, ThreadPoolExecutor(
+            max_workers=self.workers
+        ) as executor:
+            for batch in self._windows(pages):
+                yield from executor.map(
+                    lambda page: parse_page(
+                        factory, page[0], _decode(page[1], encoding), self.prune
+                    ),
+                    batch,
+                )
+
+    def _windows(self, pages: Iterable[Page_T]) -> Iterator[List[Page_T]]:
+        """Split the pages to bound the number of pages in flight."""
+        window = (self.workers or os.cpu_count() or 1) * self.chunk_size
+        page_iter = iter(pages)
+        while True:
+            batch = list(islice(page_iter, window))
+            if not batch:
+                return
+            yield batch
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.factory_builder, self.prune, self.hard_budget),
+        )
+
+    def _spool(
+        self, pages: Iterable[Page_T], encoding: Optional[str]
+    ) -> Iterator[List[PageRef]]:
+        page_iter = iter(pages)
+        while True:
+            batch = list(islice(page_iter, self.spool_pages))
+            if not batch:
+                return
+            fd, path = tempfile.mkstemp(
+                prefix="figure_parser-", suffix=".spool", dir=self.spool_dir
+            )
+            os.close(fd)
+            with SpoolWriter(path) as writer:
+                refs = [
+                    writer.write(url, body, encoding=encoding) for url, body in batch
+                ]
+            yield refs
+
+
+def _decode(body: Union[bytes, str], encoding: Optional[str]) -> Union[bytes, str]:
+    if encoding and isinstance(body, bytes):
+        return body.decode(encoding)
+    return body
+
+
+def _iterate_async(results: AsyncGenerator[BatchResult, None]) -> Iterator[BatchResult]:
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(results.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(results.aclose())
+        loop.close()
+
+
+def parse_page(
+    factory: GenericProductFactory, url: str, html: Union[str, bytes], prune: bool
+) -> BatchResult:
+    """Parse the page into a result, the errors are reported in the result."""
+    try:
+        product = factory.create_product_from_html(url, html, prune=prune)
+    except BudgetExceeded as e:
+        return BatchResult(
+            url=url, error=f"{e.__class__.__name__}: {e}", error_info=e.to_dict()
+        )
+    except Exception as e:
+        # A broken page shouldn't abort the batch, it's reported in the result.
+        return BatchResult(url=url, error=f"{e.__class__.__name__}: {e}")
+    return BatchResult(url=url, product=product)
+
+
+def _get_spool_dir() -> str:
+    if os.path.isdir(_SHM_DIR) and os.access(_SHM_DIR, os.W_OK):
+        return _SHM_DIR
+    return tempfile.gettempdir()  # pragma: no cover
+
+
+# Worker states
+_factory: Optional[GenericProductFactory] = None
+_prune: bool = True
+_mapped_spools: Dict[str, mmap.mmap] = {}
+
+
+def _init_worker(
+    factory_builder: FactoryBuilder, prune: bool, hard_budget: Optional[bool]
+):
+    global _factory, _prune
+    _factory = factory_builder()
+    if hard_budget is not None:
+        _factory.hard_budget = hard_budget
+    _prune = prune
+
+
+def _get_mapped_spool(path: str) -> mmap.mmap:
+    mapped = _mapped_spools.get(path)
+    if mapped is None:
+        # The previous spool is done.
+        for old_path in list(_mapped_spools):
+            _mapped_spools.pop(old_path).close()
+        mapped = map_file(path)
+        _mapped_spools[path] = mapped
+    return mapped
+
+
+def _parse_page(ref: PageRef) -> BatchResult:
+    assert _factory
+    html = read_page(_get_mapped_spool(ref.path), ref)
+    return parse_page(_factory, ref.url, html, _prune)
@@ -1,12 +1,37 @@
-from .factory_base import GenericProductFactory
-from .models import OrderPeriod, PriceTag, ProductBase, Release
-from .parser_base import AbstractProductParser
+from typing import TYPE_CHECKING
+
+from .._lazy import lazy_module
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .factory_base import GenericProductFactory
+    from .models import MultiLocaleProduct, OrderPeriod, PriceTag, ProductBase, Release
+    from .parser_base import AbstractProductParser, ParserVariants
+    from .pipeline import FieldPipe, declare_fields
 
 __all__ = (
     "OrderPeriod",
     "PriceTag",
     "ProductBase",
+    "MultiLocaleProduct",
     "Release",
     "GenericProductFactory",
     "AbstractProductParser",
+    "ParserVariants",
+    "FieldPipe",
+    "declare_fields",
 )
+
+_lazy_attributes = {
+    "OrderPeriod": ".models",
+    "PriceTag": ".models",
+    "ProductBase": ".models",
+    "MultiLocaleProduct": ".models",
+    "Release": ".models",
+    "GenericProductFactory": ".factory_base",
+    "AbstractProductParser": ".parser_base",
+    "ParserVariants": ".parser_base",
+    "FieldPipe": ".pipeline",
+    "declare_fields": ".pipeline",
+}
+
+__getattr__, __dir__ = lazy_module(__name__, _lazy_attributes)
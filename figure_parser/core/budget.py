@@ -0,0 +1,209 @@
+"""
+Wall-time and memory budgets of creating a product.
+
+The budgets are checked cooperatively between the steps (building the source,
+each field and each pipe) by :class:`BudgetMeter`.
+With `hard=True` the budgets are enforced in the middle of a step as well:
+the time by an interval timer (`SIGALRM`) and the memory by the address space
+limit (`RLIMIT_AS`). Both are process-wide, so the hard enforcement is meant for
+the main thread of pool workers, it's skipped elsewhere.
+The timer is shared with the regex budget by :func:`interrupt_after`.
+"""
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional, Tuple
+
+from .exceptions import MemoryBudgetExceeded, ProductTimeout
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+_active_meter: ContextVar[Optional["BudgetMeter"]] = ContextVar(
+    "budget_meter", default=None
+)
+
+
+class BudgetMeter:
+    """
+    Track the budgets of a product.
+
+    :param seconds: The wall-time budget.
+    :param memory: The budget of resident memory growth in bytes,
+        it's measured on Linux only.
+    """
+
+    def __init__(
+        self, url: str, seconds: Optional[float] = None, memory: Optional[int] = None
+    ):
+        self.url = url
+        self.seconds = seconds
+        self.memory = memory
+        self.step = "start"
+        self._started_at = time.perf_counter()
+        self._rss_at_start = _memory_usage()[1] if memory is not None else None
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started_at
+
+    def check(self, step: str, stage: bool = True):
+        """
+        Check the budgets before `step`.
+
+        :param stage: The step starts a stage (building the source, parsing
+            the fields or a pipe), the memory is only sampled at the stages
+            instead of before every field.
+        """
+        if self.seconds is not None and self.elapsed > self.seconds:
+            raise self.timeout()
+
+        if stage and self.memory is not None and self._rss_at_start is not None:
+            rss = _memory_usage()[1]
+            if rss is not None and rss - self._rss_at_start > self.memory:
+                raise MemoryBudgetExceeded(
+                    f"The memory budget ({self.memory} bytes) of {self.url} "
+                    f"is exceeded before {step}.",
+                    url=self.url,
+                    step=step,
+                    limit=self.memory,
+                    used=rss - self._rss_at_start,
+                )
+        self.step = step
+
+    def timeout(self) -> ProductTimeout:
+        return ProductTimeout(
+            f"The time budget ({self.seconds}s) of {self.url} "
+            f"is exceeded in {self.step}.",
+            url=self.url,
+            step=self.step,
+            limit=self.seconds,
+            used=self.elapsed,
+        )
+
+
+@contextmanager
+def enforce_budget(meter: Optional[BudgetMeter], hard: bool = False) -> Iterator:
+    """
+    Enforce the budgets of `meter` in the context.
+
+    :param hard: Interrupt the running step once the budget is exceeded.
+    """
+    token = _active_meter.set(meter)
+    try:
+        if meter is None or not hard or not _can_enforce_hard():
+            yield meter
+        else:
+            with _time_limit(meter), _memory_limit(meter):
+                yield meter
+    finally:
+        _active_meter.reset(token)
+
+
+def get_active_meter() -> Optional[BudgetMeter]:
+    return _active_meter.get()
+
+
+def _can_enforce_hard() -> bool:
+    return (
+        hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+
+
+@contextmanager
+def interrupt_after(seconds: float, exceeded: Callable[[], BaseException]):
+    """
+    Raise `exceeded()` in the context once `seconds` passed,
+    by the interval timer of the main thread.
+
+    The timer is shared by nesting: the earlier of its own and the outer
+    deadline is armed, the outer deadline is handled by the outer handler,
+    and the outer timer is re-armed with its remaining time on exit.
+    It's skipped if the timer is unavailable or armed by others.
+    """
+    if not _can_enforce_hard():
+        yield
+        return
+
+    outer_handler = signal.getsignal(signal.SIGALRM)
+    outer_remaining = signal.getitimer(signal.ITIMER_REAL)[0]
+    if outer_remaining and not callable(outer_handler):
+        # The timer is armed by others.
+        yield
+        return
+
+    outer_first = bool(outer_remaining) and outer_remaining < seconds
+
+    def interrupt(signum, frame):
+        if outer_first:
+            outer_handler(signum, frame)  # type: ignore
+        raise exceeded()
+
+    started = time.perf_counter()
+    signal.signal(signal.SIGALRM, interrupt)
+    signal.setitimer(signal.ITIMER_REAL, min(seconds, outer_remaining or seconds))
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(
+            signal.SIGALRM,
+            signal.SIG_DFL if outer_handler is None else outer_handler,
+        )
+        left = outer_remaining - (time.perf_counter() - started)
+        if outer_remaining and left > 0:
+            signal.setitimer(signal.ITIMER_REAL, left)
+
+
+@contextmanager
+def _time_limit(meter: BudgetMeter):
+    if meter.seconds is None:
+        yield
+        return
+
+    with interrupt_after(meter.seconds, meter.timeout):
+        yield
+
+
+@contextmanager
+def _memory_limit(meter: BudgetMeter):
+    address_space = _memory_usage()[0]
+    if meter.memory is None or resource is None or address_space is None:
+        yield
+        return
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = address_space + meter.memory
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    try:
+        yield
+    except MemoryError:
+        raise MemoryBudgetExceeded(
+            f"The memory budget ({meter.memory} bytes) of {meter.url} "
+            f"is exceeded in {meter.step}.",
+            url=meter.url,
+            step=meter.step,
+            limit=meter.memory,
+        )
+    finally:
+        resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+def _memory_usage() -> Tuple[Optional[int], Optional[int]]:
+    """The address space and resident memory of current process in bytes."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            size, resident = f.read().split()[:2]
+    except (OSError, ValueError):
+        return None, None
+    return int(size) * _PAGE_SIZE, int(resident) * _PAGE_SIZE
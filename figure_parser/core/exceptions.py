@@ -1,3 +1,6 @@
+from typing import Any, Dict, Optional
+
+
 class FigureParserException(Exception):
     """
     Base exception for figure_parser
@@ -47,3 +50,57 @@ class FailedToProcessProduct(FigureParserException):
     """
     Exception thrown when faild to process product with pipe.
     """
+
+
+class BudgetExceeded(FigureParserException):
+    """
+    Exception thrown when creating a product exceeds its budget.
+
+    :param url: The url of the product.
+    :param step: The step (e.g. `build_source`, `parse_name`) which exceeded the budget.
+    :param limit: The budget.
+    :param used: The measured usage if it's known.
+    """
+
+    def __init__(
+        self,
+        message: str = "",
+        *,
+        url: Optional[str] = None,
+        step: Optional[str] = None,
+        limit: Optional[float] = None,
+        used: Optional[float] = None,
+    ):
+        super().__init__(message)
+        self.url = url
+        self.step = step
+        self.limit = limit
+        self.used = used
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self.__class__.__name__,
+            "message": str(self),
+            "url": self.url,
+            "step": self.step,
+            "limit": self.limit,
+            "used": self.used,
+        }
+
+
+class ProductTimeout(BudgetExceeded):
+    """
+    Exception thrown when creating a product exceeds the time budget.
+    """
+
+
+class MemoryBudgetExceeded(BudgetExceeded):
+    """
+    Exception thrown when creating a product exceeds the memory budget.
+    """
+
+
+class RegexBudgetExceeded(BudgetExceeded):
+    """
+    Exception thrown when the regex calls of a page exceed the regex budget.
+    """
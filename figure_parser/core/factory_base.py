@@ -1,7 +1,17 @@
+import threading
 from abc import ABC
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import copy_context
+from copy import deepcopy
+from importlib import import_module
 from typing import (
+    Any,
     Callable,
+    Dict,
     Generic,
+    Iterable,
+    Iterator,
     List,
     Mapping,
     MutableMapping,
@@ -9,47 +19,124 @@ from typing import (
     Tuple,
     Type,
     TypeVar,
+    Union,
 )
 from urllib.parse import urlparse
 
-import validators
-
+from ..regex import regex_budget
+from .budget import BudgetMeter, enforce_budget, get_active_meter
 from .exceptions import (
+    BudgetExceeded,
     DomainInvalid,
     DuplicatedDomainRegistration,
     FailedToCreateProduct,
     FailedToProcessProduct,
     UnregisteredDomain,
 )
-from .models.product import ProductBase
-from .parser_base import AbstractProductParser
+from .models.product import MultiLocaleProduct, ProductBase
+from .parser_base import AbstractProductParser, ParserVariants, plan_field_levels
+from .pipeline import ProductPipe, compile_pipes
 
 Source_T = TypeVar("Source_T")
 
+ParserType = Union[
+    Type[AbstractProductParser[Source_T]], Type[ParserVariants[Source_T]]
+]
+"""A parser class or the variants of parser (see :class:`ParserVariants`)."""
+
+ParserRegistration = Union[ParserType[Source_T], str]
+"""
+A parser type or the import path of it (`package.module:ClassName`).
+The import path would be imported on the first time the domain is requested.
+"""
+
+
+PRODUCT_FIELD_PARSERS: Tuple[Tuple[str, str], ...] = (
+    ("name", "parse_name"),
+    ("series", "parse_series"),
+    ("manufacturer", "parse_manufacturer"),
+    ("category", "parse_category"),
+    ("releases", "parse_releases"),
+    ("order_period", "parse_order_period"),
+    ("size", "parse_size"),
+    ("scale", "parse_scale"),
+    ("sculptors", "parse_sculptors"),
+    ("paintworks", "parse_paintworks"),
+    ("rerelease", "parse_rerelease"),
+    ("adult", "parse_adult"),
+    ("copyright", "parse_copyright"),
+    ("releaser", "parse_releaser"),
+    ("distributer", "parse_distributer"),
+    ("jan", "parse_JAN"),
+    ("images", "parse_images"),
+    ("thumbnail", "parse_thumbnail"),
+    ("og_image", "parse_og_image"),
+)
+"""The product fields and the parser methods, in the order of parsing."""
+
 
 class GenericProductFactory(Generic[Source_T], ABC):
     _is_pipes_sorted: bool
-    _parser_registration: MutableMapping[str, Type[AbstractProductParser[Source_T]]]
+    _parser_registration: MutableMapping[str, ParserRegistration[Source_T]]
     _pipes: List[Tuple[Callable[[ProductBase], ProductBase], int]]
+    _pipe_stages: Optional[List[ProductPipe]]
 
     def __init__(
         self,
         *,
         parser_registrations: Optional[
-            Mapping[str, Type[AbstractProductParser[Source_T]]]
+            Mapping[str, ParserRegistration[Source_T]]
         ] = None,
         pipes: Optional[List[Tuple[Callable[[ProductBase], ProductBase], int]]] = None,
+        regex_budget: Optional[float] = None,
+        time_budget: Optional[float] = None,
+        memory_budget: Optional[int] = None,
+        hard_budget: bool = False,
+        field_workers: Optional[int] = None,
     ) -> None:
+        """
+        :param regex_budget: The regex time budget of a product in seconds,
+            see :mod:`figure_parser.regex`.
+        :param time_budget: The wall-time budget of a product in seconds,
+            :class:`ProductTimeout` is raised on overrun.
+        :param memory_budget: The memory budget of a product in bytes,
+            :class:`MemoryBudgetExceeded` is raised on overrun.
+        :param hard_budget: Interrupt the running step on overrun instead of
+            checking between the steps, see :mod:`figure_parser.core.budget`.
+        :param field_workers: Parse the independent fields of a product concurrently
+            by a thread pool of the size, see :func:`depends_on`.
+            The pool is shut down by :meth:`close` (or leaving the factory's context).
+        """
+        self.regex_budget = regex_budget
+        self.time_budget = time_budget
+        self.memory_budget = memory_budget
+        self.hard_budget = hard_budget
+        self.field_workers = field_workers
+        self._field_executor: Optional[ThreadPoolExecutor] = None
+        self._field_executor_lock = threading.Lock()
         self._is_pipes_sorted = False
         self._parser_registration = {}
         self._pipes = pipes if pipes else []
+        self._pipe_stages = None
 
         if parser_registrations:
-            for domain, parser in parser_registrations.items():
-                self.register_parser(domain=domain, parser=parser)
+            self.register_parsers(parser_registrations)
 
         self._sort_pipes()
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shut down the thread pool of fields, it's recreated if it's needed again."""
+        with self._field_executor_lock:
+            executor, self._field_executor = self._field_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
     @property
     def parser_registration(self):
         return self._parser_registration
@@ -59,54 +146,208 @@ class GenericProductFactory(Generic[Source_T], ABC):
         self._sort_pipes()
         return self._pipes
 
+    @property
+    def pipe_stages(self) -> List[ProductPipe]:
+        """The pipes compiled into stages, see :func:`compile_pipes`."""
+        self._sort_pipes()
+        if self._pipe_stages is None:
+            self._pipe_stages = compile_pipes([pipe for pipe, _ in self._pipes])
+        return self._pipe_stages
+
     def _create_product_by_parser(
-        self, url: str, parser: AbstractProductParser[Source_T]
+        self,
+        url: str,
+        parser: AbstractProductParser[Source_T],
+        meter: Optional[BudgetMeter] = None,
+        parsed: Optional[Mapping[str, Any]] = None,
     ) -> ProductBase:
+        """:param parsed: The fields parsed already, they are not parsed again."""
+        values = dict(parsed) if parsed else {}
         try:
-            return ProductBase(
-                url=url,
-                name=parser.parse_name(),
-                series=parser.parse_series(),
-                manufacturer=parser.parse_manufacturer(),
-                category=parser.parse_category(),
-                releases=parser.parse_releases(),
-                order_period=parser.parse_order_period(),
-                size=parser.parse_size(),
-                scale=parser.parse_scale(),
-                sculptors=parser.parse_sculptors(),
-                paintworks=parser.parse_paintworks(),
-                rerelease=parser.parse_rerelease(),
-                adult=parser.parse_adult(),
-                copyright=parser.parse_copyright(),
-                releaser=parser.parse_releaser(),
-                distributer=parser.parse_distributer(),
-                jan=parser.parse_JAN(),
-                images=parser.parse_images(),
-                thumbnail=parser.parse_thumbnail(),
-                og_image=parser.parse_og_image(),
-            )
+            if self.field_workers:
+                values.update(self._parse_fields_concurrently(parser, meter, values))
+            else:
+                for field, method in PRODUCT_FIELD_PARSERS:
+                    if field in values:
+                        continue
+                    if meter:
+                        meter.check(method, stage=False)
+                    values[field] = getattr(parser, method)()
+            return ProductBase(url=url, **values)
+        except (BudgetExceeded, MemoryError):
+            raise
         except Exception:
             raise FailedToCreateProduct(
                 f"{parser.__class__} failed to parse the product. (url: {url})"
             )
 
+    def _parse_fields_concurrently(
+        self,
+        parser: AbstractProductParser[Source_T],
+        meter: Optional[BudgetMeter] = None,
+        skipped: Iterable[str] = (),
+    ) -> Dict[str, Any]:
+        executor = self._get_field_executor()
+        fields = {
+            method: field
+            for field, method in PRODUCT_FIELD_PARSERS
+            if field not in skipped
+        }
+        values = {}
+        for level in plan_field_levels(type(parser), tuple(fields)):
+            if meter:
+                meter.check("+".join(level), stage=False)
+            # Each field runs in a copy of the context to keep the budgets.
+            futures = {
+                method: executor.submit(copy_context().run, getattr(parser, method))
+                for method in level
+            }
+            for method, future in futures.items():
+                result = future.result()
+                if method in fields:
+                    values[fields[method]] = result
+        return values
+
+    def _get_field_executor(self) -> ThreadPoolExecutor:
+        with self._field_executor_lock:
+            if self._field_executor is None:
+                self._field_executor = ThreadPoolExecutor(
+                    self.field_workers, thread_name_prefix="field"
+                )
+            return self._field_executor
+
     def create_product(self, url: str, source: Source_T) -> ProductBase:
-        parser_cls = self.get_parser_by_url(url)
-        if not parser_cls:
-            raise UnregisteredDomain(
-                f"The domain of url is unregistered. (url: '{url}')"
+        parser_cls = self._get_registered_parser(url)
+        with self._enforce_budget(url) as meter, regex_budget(self.regex_budget):
+            if meter:
+                meter.check("create_parser")
+            parser = self.select_parser(parser_cls, source).create_parser(
+                url=url, source=source
             )
-
-        parser = parser_cls.create_parser(url=url, source=source)
-        product = self._create_product_by_parser(url=url, parser=parser)
-        product = self.process_product_with_pipes(product)
+            product = self._create_product_by_parser(
+                url=url, parser=parser, meter=meter
+            )
+            product = self.process_product_with_pipes(product, meter=meter)
         return product
 
-    def process_product_with_pipes(self, product: ProductBase) -> ProductBase:
-        self._sort_pipes()
-        for process, _ in self._pipes:
+    def create_multi_locale_product(
+        self, pages: Mapping[str, Tuple[str, Source_T]]
+    ) -> MultiLocaleProduct:
+        """
+        Create the product from its locale versions.
+
+        The fields of :attr:`AbstractProductParser.locale_independent_fields`
+        are parsed from the first version only, the other versions share them.
+
+        :param pages: The url and source of each locale version.
+        """
+        if not pages:
+            raise ValueError("No locale version of the product is given.")
+
+        first_url = next(iter(pages.values()))[0]
+        products: Dict[str, ProductBase] = {}
+        shared: Dict[str, Any] = {}
+        shared_fields: Tuple[str, ...] = ()
+        with self._enforce_budget(first_url) as meter, regex_budget(self.regex_budget):
+            for locale, (url, source) in pages.items():
+                parser_cls = self._get_registered_parser(url)
+                if meter:
+                    meter.check("create_parser")
+                parser = self.select_parser(parser_cls, source).create_parser(
+                    url=url, source=source
+                )
+                product = self._create_product_by_parser(
+                    url=url, parser=parser, meter=meter, parsed=deepcopy(shared)
+                )
+                if not products:
+                    shared_fields = parser.locale_independent_fields
+                    # Copied before the pipes, they may modify the values in place.
+                    shared = {
+                        field: deepcopy(getattr(product, field))
+                        for field in shared_fields
+                    }
+                products[locale] = self.process_product_with_pipes(product, meter=meter)
+        return MultiLocaleProduct(products=products, shared_fields=shared_fields)
+
+    def create_multi_locale_product_from_html(
+        self, pages: Mapping[str, Tuple[str, Union[str, bytes]]], prune: bool = True
+    ) -> MultiLocaleProduct:
+        """
+        Create the product from the html of its locale versions,
+        see :meth:`create_multi_locale_product`.
+        """
+        sources: Dict[str, Tuple[str, Source_T]] = {}
+        first_url = next(iter(pages.values()))[0] if pages else ""
+        with self._enforce_budget(first_url) as meter:
+            for locale, (url, html) in pages.items():
+                parser_cls = self._get_registered_parser(url)
+                if meter:
+                    meter.check("build_source")
+                sources[locale] = (
+                    url,
+                    self.build_source(html, parser_cls, prune=prune),
+                )
+            return self.create_multi_locale_product(sources)
+
+    def create_product_from_html(
+        self, url: str, html: Union[str, bytes], prune: bool = True
+    ) -> ProductBase:
+        """
+        Create the product from html, the source is built by :meth:`build_source`.
+
+        :param prune: Let the source contain the parts used by the parser only.
+        """
+        parser_cls = self._get_registered_parser(url)
+        with self._enforce_budget(url) as meter:
+            if meter:
+                meter.check("build_source")
+            source = self.build_source(html, parser_cls, prune=prune)
+            return self.create_product(url=url, source=source)
+
+    @contextmanager
+    def _enforce_budget(self, url: str) -> Iterator[Optional[BudgetMeter]]:
+        """Enforce the budgets of product, the budgets of outer call are reused."""
+        meter = get_active_meter()
+        if meter is not None or (
+            self.time_budget is None and self.memory_budget is None
+        ):
+            yield meter
+            return
+
+        meter = BudgetMeter(url, seconds=self.time_budget, memory=self.memory_budget)
+        with enforce_budget(meter, hard=self.hard_budget):
+            yield meter
+
+    def select_parser(
+        self, parser_cls: ParserType[Source_T], source: Source_T
+    ) -> Type[AbstractProductParser[Source_T]]:
+        """Select the parser of the page if the domain has several variants."""
+        if isinstance(parser_cls, type) and issubclass(parser_cls, ParserVariants):
+            return parser_cls.select_parser(source)
+        return parser_cls
+
+    def build_source(
+        self,
+        html: Union[str, bytes],
+        parser_cls: ParserType[Source_T],
+        prune: bool = True,
+    ) -> Source_T:
+        """Build the source of parser from html."""
+        raise NotImplementedError(
+            f"{type(self).__name__} can't build the source from html, "
+            "override build_source to parse pages."
+        )
+
+    def process_product_with_pipes(
+        self, product: ProductBase, meter: Optional[BudgetMeter] = None
+    ) -> ProductBase:
+        for process in self.pipe_stages:
+            if meter:
+                meter.check(process.__qualname__)
             try:
                 product = process(product)
+            except (BudgetExceeded, MemoryError):
+                raise
             except Exception:
                 raise FailedToProcessProduct(
                     f"Error occured when {process.__qualname__} is processing the product. (product_url: {product.url})"
@@ -114,6 +355,18 @@ class GenericProductFactory(Generic[Source_T], ABC):
 
         return product
 
+    def process_products_with_pipes(
+        self, products: Iterable[ProductBase], executor: Optional[Executor] = None
+    ) -> List[ProductBase]:
+        """
+        Process a batch of products with pipes.
+
+        :param executor: Process the products concurrently by the executor.
+        """
+        if executor is None:
+            return [self.process_product_with_pipes(product) for product in products]
+        return list(executor.map(self.process_product_with_pipes, products))
+
     def validate_url(self, url: str) -> str:
         """
         If the url is valid, return the matched domain or ''.
@@ -127,16 +380,24 @@ class GenericProductFactory(Generic[Source_T], ABC):
     def add_pipe(self, pipe: Callable[[ProductBase], ProductBase], order: int):
         self._pipes.append((pipe, order))
         self._is_pipes_sorted = False
+        self._pipe_stages = None
         return self
 
     def add_pipes(self, *pipes: Tuple[Callable[[ProductBase], ProductBase], int]):
         self._pipes.extend(pipes)
         self._is_pipes_sorted = False
+        self._pipe_stages = None
         return self
 
-    def register_parser(
-        self, domain: str, parser: Type[AbstractProductParser[Source_T]]
-    ):
+    def register_parser(self, domain: str, parser: ParserRegistration[Source_T]):
+        """
+        Register the parser for the domain.
+
+        :param parser: The parser class or the import path of the parser class
+            (`package.module:ClassName`). The import path is resolved lazily.
+        """
+        import validators
+
         domain = domain.strip()
         if not validators.domain(domain):  # type: ignore
             raise DomainInvalid(f"{domain} is invalid.")
@@ -147,16 +408,31 @@ class GenericProductFactory(Generic[Source_T], ABC):
         self._parser_registration.setdefault(domain, parser)
         return self
 
-    def get_parser_by_domain(
-        self, domain: str
-    ) -> Optional[Type[AbstractProductParser[Source_T]]]:
-        return self._parser_registration.get(domain)
+    def register_parsers(
+        self, parser_registrations: Mapping[str, ParserRegistration[Source_T]]
+    ):
+        for domain, parser in parser_registrations.items():
+            self.register_parser(domain=domain, parser=parser)
+        return self
+
+    def get_parser_by_domain(self, domain: str) -> Optional[ParserType[Source_T]]:
+        parser = self._parser_registration.get(domain)
+        if isinstance(parser, str):
+            parser = _import_parser(parser)
+            self._parser_registration[domain] = parser
+        return parser
 
-    def get_parser_by_url(
-        self, url: str
-    ) -> Optional[Type[AbstractProductParser[Source_T]]]:
+    def get_parser_by_url(self, url: str) -> Optional[ParserType[Source_T]]:
         domain = self.validate_url(url)
-        return self._parser_registration.get(domain)
+        return self.get_parser_by_domain(domain)
+
+    def _get_registered_parser(self, url: str) -> ParserType[Source_T]:
+        parser_cls = self.get_parser_by_url(url)
+        if not parser_cls:
+            raise UnregisteredDomain(
+                f"The domain of url is unregistered. (url: '{url}')"
+            )
+        return parser_cls
 
     def _sort_pipes(self):
         if not self._is_pipes_sorted:
@@ -166,3 +442,11 @@ class GenericProductFactory(Generic[Source_T], ABC):
 
 def _extract_domain_from_url(url: str) -> str:
     return urlparse(url).netloc
+
+
+def _import_parser(path: str):
+    module_name, _, qualname = path.partition(":")
+    target = import_module(module_name)
+    for attr in qualname.split("."):
+        target = getattr(target, attr)
+    return target
@@ -1,5 +1,5 @@
 from .order_period import OrderPeriod
-from .product import ProductBase
+from .product import MultiLocaleProduct, ProductBase
 from .release import PriceTag, Release
 
-__all__ = ("OrderPeriod", "ProductBase", "Release", "PriceTag")
+__all__ = ("OrderPeriod", "ProductBase", "MultiLocaleProduct", "Release", "PriceTag")
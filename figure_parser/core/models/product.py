@@ -1,4 +1,4 @@
-from typing import ClassVar, List, Optional
+from typing import ClassVar, Dict, List, Optional, Tuple
 
 from pydantic import BaseModel
 
@@ -49,3 +49,20 @@ class ProductBase(BaseModel):
     @classmethod
     def worker_fields(cls):
         return cls.__worker_fields__
+
+
+class MultiLocaleProduct(BaseModel):
+    """
+    The locale versions of a product.
+    The fields of `shared_fields` are parsed once and shared by the versions.
+    """
+
+    products: Dict[str, ProductBase]
+    shared_fields: Tuple[str, ...] = ()
+
+    @property
+    def locales(self) -> List[str]:
+        return list(self.products)
+
+    def __getitem__(self, locale: str) -> ProductBase:
+        return self.products[locale]
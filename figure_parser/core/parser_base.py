@@ -1,15 +1,119 @@
 from abc import ABC, abstractmethod
-from typing import Generic, List, Optional, Type, TypeVar
+from functools import lru_cache, wraps
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
+from .exceptions import ParserInitializationFailed
 from .models import OrderPeriod, Release
 
 Source_T = TypeVar("Source_T")
 Parser_T = TypeVar("Parser_T")
+Method_T = TypeVar("Method_T", bound=Callable[..., Any])
+
+
+def depends_on(*methods: str) -> Callable[[Method_T], Method_T]:
+    """
+    Declare the parser methods called by the method.
+
+    When the fields are parsed concurrently, the :func:`shared_field` methods
+    among them are evaluated before the method.
+    """
+
+    def decorator(method: Method_T) -> Method_T:
+        setattr(method, "__field_dependencies__", tuple(methods))
+        return method
+
+    return decorator
+
+
+def shared_field(method: Method_T) -> Method_T:
+    """
+    Cache the result of the parser method which is used by other fields,
+    so it's evaluated once per parser.
+    The result is shared by the callers, it shouldn't be mutated.
+    """
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self):
+        cache: Dict[str, Any] = self.__dict__.setdefault("_shared_fields", {})
+        if name not in cache:
+            cache[name] = method(self)
+        return cache[name]
+
+    setattr(wrapper, "__shared_field__", True)
+    return wrapper  # type: ignore
+
+
+@lru_cache(maxsize=None)
+def plan_field_levels(
+    parser_cls: Type["AbstractProductParser"], methods: Tuple[str, ...]
+) -> Tuple[Tuple[str, ...], ...]:
+    """
+    Group the methods and their shared dependencies into levels,
+    the methods of a level depend on the previous levels only.
+    """
+    levels: Dict[str, int] = {}
+
+    def dependencies(method: str, inline: Set[str]) -> Set[str]:
+        found = set()
+        declared = getattr(getattr(parser_cls, method), "__field_dependencies__", ())
+        for dependency in declared:
+            if dependency in methods or _is_shared(parser_cls, dependency):
+                found.add(dependency)
+            elif dependency not in inline:
+                # The dependency is computed inline, its dependencies are inherited.
+                found |= dependencies(dependency, inline | {dependency})
+        return found
+
+    def level_of(method: str, path: Tuple[str, ...]) -> int:
+        if method in path:
+            raise ValueError(
+                f"Circular field dependencies: {' -> '.join((*path, method))}"
+            )
+        if method not in levels:
+            levels[method] = 1 + max(
+                (
+                    level_of(dependency, (*path, method))
+                    for dependency in dependencies(method, {method})
+                ),
+                default=-1,
+            )
+        return levels[method]
+
+    for method in methods:
+        level_of(method, ())
+
+    grouped: List[List[str]] = [[] for _ in range(max(levels.values(), default=-1) + 1)]
+    for method, level in levels.items():
+        grouped[level].append(method)
+    return tuple(tuple(group) for group in grouped)
+
+
+def _is_shared(parser_cls: type, method: str) -> bool:
+    return getattr(getattr(parser_cls, method, None), "__shared_field__", False)
 
 
 class AbstractProductParser(ABC, Generic[Source_T]):
     """Abstract product parser class"""
 
+    locale_independent_fields: ClassVar[Tuple[str, ...]] = ()
+    """
+    The product fields which are the same in every locale version of the page,
+    see :meth:`GenericProductFactory.create_multi_locale_product`.
+    """
+
     _source: Source_T
 
     def __init__(self, source: Source_T) -> None:
@@ -147,3 +251,42 @@ class AbstractProductParser(ABC, Generic[Source_T]):
     def parse_og_image(self) -> Optional[str]:
         """Parse open graph image from meta tag."""
         raise NotImplementedError
+
+
+Probe = Callable[[Any], bool]
+"""A cheap check of the page shape, e.g. the existence of an element."""
+
+
+class ParserVariants(Generic[Source_T]):
+    """
+    The parsers of a site which has several generations of page.
+
+    The variants are probed in order, the parser of the first matched probe
+    is used, a `None` probe matches any page.
+    The parser is returned as is, the variants are not a parser themselves.
+
+    .. code-block:: python
+
+        class FooProductParser(ParserVariants[BeautifulSoup]):
+            variants = (
+                (lambda source: source.find(class_="new") is not None, FooNewParser),
+                (None, FooOldParser),
+            )
+    """
+
+    variants: Tuple[Tuple[Optional[Probe], Type[AbstractProductParser[Source_T]]], ...]
+
+    @classmethod
+    def select_parser(cls, source: Source_T) -> Type[AbstractProductParser[Source_T]]:
+        for probe, parser_cls in cls.variants:
+            if probe is None or probe(source):
+                return parser_cls
+        raise ParserInitializationFailed(
+            f"The page matches none of the variants of {cls.__name__}."
+        )
+
+    @classmethod
+    def create_parser(
+        cls, url: str, source: Source_T
+    ) -> AbstractProductParser[Source_T]:
+        return cls.select_parser(source).create_parser(url=url, source=source)
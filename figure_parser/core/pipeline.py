@@ -0,0 +1,175 @@
+"""
+Pipes with declared fields and the execution plan of them.
+
+A pipe is a callable processing the product. A pipe could declare the fields it
+reads and writes by :func:`declare_fields`, and :class:`FieldPipe` maps the
+values of its fields independently (e.g. normalizing the strings).
+
+:func:`compile_pipes` fuses the field pipes into stages which visit each field
+once, a field pipe is moved across the pipes between them only if they don't
+touch its fields. Pipes without declarations are kept in place as barriers.
+
+.. code-block:: python
+
+    normalize_names = FieldPipe(str.strip, ["name", "series"])
+
+    @declare_fields(reads=["releases"], writes=["releases"])
+    def sort_releases(product: ProductBase) -> ProductBase:
+        ...
+"""
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .models.product import ProductBase
+
+ProductPipe = Callable[[ProductBase], ProductBase]
+ValueTransform = Callable[[str], str]
+
+
+def declare_fields(*, reads: Iterable[str] = (), writes: Iterable[str] = ()):
+    """Declare the fields read and written by the pipe."""
+
+    def decorator(pipe: ProductPipe) -> ProductPipe:
+        setattr(pipe, "__pipe_reads__", frozenset(reads))
+        setattr(pipe, "__pipe_writes__", frozenset(writes))
+        return pipe
+
+    return decorator
+
+
+def get_declared_fields(
+    pipe: ProductPipe,
+) -> Optional[Tuple[FrozenSet[str], FrozenSet[str]]]:
+    """The fields read and written by the pipe, `None` if they're undeclared."""
+    reads = getattr(pipe, "__pipe_reads__", None)
+    writes = getattr(pipe, "__pipe_writes__", None)
+    if reads is None or writes is None:
+        return None
+    return reads, writes
+
+
+def map_field_value(value: Any, transform: ValueTransform) -> Any:
+    """Transform a string or a list of strings, other values are left untouched."""
+    if isinstance(value, str):
+        return transform(value)
+    if isinstance(value, list):
+        if all(type(v) is str for v in value):
+            return [transform(v) for v in value]
+    return value
+
+
+class FieldPipe:
+    """
+    A pipe which transforms the string values of the fields independently.
+
+    :param transform: The function transforming a string.
+    :param fields: The fields to be transformed.
+    :param name: The name of pipe shown in errors, the name of `transform` by default.
+    """
+
+    def __init__(
+        self,
+        transform: ValueTransform,
+        fields: Iterable[str],
+        name: Optional[str] = None,
+    ):
+        self.transform = transform
+        self.fields = tuple(fields)
+        self.__name__ = self.__qualname__ = name or transform.__qualname__
+        self.__pipe_reads__ = self.__pipe_writes__ = frozenset(self.fields)
+
+    def __call__(self, product: ProductBase) -> ProductBase:
+        for field in self.fields:
+            value = map_field_value(getattr(product, field), self.transform)
+            setattr(product, field, value)
+        return product
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.__qualname__} {self.fields}>"
+
+
+class FusedFieldPipe:
+    """Field pipes fused into a pass which visits each field once."""
+
+    def __init__(self, pipes: Sequence[FieldPipe]):
+        self.pipes = tuple(pipes)
+        transforms: Dict[str, List[ValueTransform]] = {}
+        for pipe in self.pipes:
+            for field in pipe.fields:
+                transforms.setdefault(field, []).append(pipe.transform)
+        self.transforms = {
+            field: _compose(functions) for field, functions in transforms.items()
+        }
+        self.__name__ = self.__qualname__ = "+".join(
+            pipe.__qualname__ for pipe in self.pipes
+        )
+
+    def __call__(self, product: ProductBase) -> ProductBase:
+        for field, transform in self.transforms.items():
+            value = map_field_value(getattr(product, field), transform)
+            setattr(product, field, value)
+        return product
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.__qualname__}>"
+
+
+def compile_pipes(pipes: Sequence[ProductPipe]) -> List[ProductPipe]:
+    """
+    Compile the ordered pipes into the stages to be executed in order.
+
+    The result is equivalent to running `pipes` one by one.
+    """
+    stages: List[Union[ProductPipe, List[FieldPipe]]] = []
+    fused: Optional[List[FieldPipe]] = None
+    # The fields touched by the pipes after the latest fused stage.
+    touched: Set[str] = set()
+    blocked = False
+
+    for pipe in pipes:
+        if isinstance(pipe, FieldPipe):
+            if fused is not None and not blocked and touched.isdisjoint(pipe.fields):
+                fused.append(pipe)
+                continue
+            fused = [pipe]
+            stages.append(fused)
+            touched, blocked = set(), False
+            continue
+
+        stages.append(pipe)
+        declared = get_declared_fields(pipe)
+        if declared is None:
+            blocked = True
+        else:
+            reads, writes = declared
+            touched.update(reads, writes)
+
+    return [
+        (FusedFieldPipe(stage) if len(stage) > 1 else stage[0])
+        if isinstance(stage, list)
+        else stage
+        for stage in stages
+    ]
+
+
+def _compose(functions: Sequence[ValueTransform]) -> ValueTransform:
+    if len(functions) == 1:
+        return functions[0]
+
+    def composed(value: str) -> str:
+        for function in functions:
+            value = function(value)
+        return value
+
+    return composed
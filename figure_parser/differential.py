@@ -0,0 +1,155 @@
+"""
+Differential runs of two factory configurations.
+
+The pages are replayed through both configurations in the same process,
+the canonical results (see :func:`figure_parser.golden.canonical_result`)
+are compared field by field and the latency of each page is measured.
+The configurations take turns to go first on each page, so neither of them
+benefits from warm caches consistently.
+
+.. code-block:: python
+
+    report = run_differential(
+        iter_records("pages"),
+        FactoryConfig("pruned", GeneralBs4ProductFactory.create_factory),
+        FactoryConfig("whole", GeneralBs4ProductFactory.create_factory, prune=False),
+    )
+    print(report.format())
+"""
+import statistics
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple, Union
+
+from .batch import FactoryBuilder, parse_page
+from .core.factory_base import _import_parser
+from .golden import Mismatch, canonical_result, diff_records
+
+PRESET_CONFIGS = ("pruned", "whole", "concurrent-fields")
+
+
+class FactoryConfig(NamedTuple):
+    name: str
+    factory_builder: FactoryBuilder
+    prune: bool = True
+
+
+@dataclass
+class Timing:
+    name: str
+    latencies: List[float] = field(default_factory=list)
+    """The seconds of each page."""
+    failed: int = 0
+
+    @property
+    def total(self) -> float:
+        return sum(self.latencies)
+
+    @property
+    def throughput(self) -> float:
+        """Pages per second."""
+        return len(self.latencies) / self.total if self.total else 0.0
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.latencies) if self.latencies else 0.0
+
+    @property
+    def p95(self) -> float:
+        if len(self.latencies) < 2:
+            return self.median
+        return statistics.quantiles(self.latencies, n=20)[-1]
+
+
+@dataclass
+class DifferentialReport:
+    baseline: Timing
+    candidate: Timing
+    divergences: List[Mismatch] = field(default_factory=list)
+
+    @property
+    def checked(self) -> int:
+        return len(self.baseline.latencies)
+
+    @property
+    def speedup(self) -> float:
+        """The throughput of candidate relative to baseline."""
+        return (
+            self.baseline.total / self.candidate.total if self.candidate.total else 0.0
+        )
+
+    def format(self) -> str:
+        lines = []
+        for divergence in self.divergences:
+            lines.append(f"DIVERGED {divergence.url}")
+            for name, (expected, actual) in divergence.fields.items():
+                lines.append(f"    {name}: {expected!r} -> {actual!r}")
+        lines.append(
+            f"{'':<20} {'pages/s':>10} {'median ms':>10} {'p95 ms':>10} {'failed':>7}"
+        )
+        for timing in (self.baseline, self.candidate):
+            lines.append(
+                f"{timing.name:<20} {timing.throughput:10.1f} "
+                f"{timing.median * 1000:10.3f} {timing.p95 * 1000:10.3f} "
+                f"{timing.failed:7d}"
+            )
+        lines.append(
+            f"{self.checked} pages, {len(self.divergences)} diverged, "
+            f"{self.candidate.name} is {self.speedup:.2f}x of {self.baseline.name}."
+        )
+        return "\n".join(lines)
+
+
+def run_differential(
+    pages: Iterable[Tuple[str, Union[str, bytes]]],
+    baseline: FactoryConfig,
+    candidate: FactoryConfig,
+) -> DifferentialReport:
+    factories = [
+        (config, config.factory_builder(), Timing(config.name))
+        for config in (baseline, candidate)
+    ]
+    report = DifferentialReport(baseline=factories[0][2], candidate=factories[1][2])
+    try:
+        for index, (url, html) in enumerate(pages):
+            records: Dict[str, Dict[str, Any]] = {}
+            # Take turns to go first.
+            for config, factory, timing in factories[:: 1 if index % 2 == 0 else -1]:
+                start = time.perf_counter()
+                result = parse_page(factory, url, html, config.prune)
+                timing.latencies.append(time.perf_counter() - start)
+                if result.error:
+                    timing.failed += 1
+                records[config.name] = canonical_result(result)
+
+            fields = diff_records(records[baseline.name], records[candidate.name])
+            if fields:
+                report.divergences.append(Mismatch(url, fields))
+    finally:
+        for _, factory, _ in factories:
+            factory.close()
+    return report
+
+
+def resolve_config(spec: str) -> FactoryConfig:
+    """
+    Resolve the config by a preset name (see :data:`PRESET_CONFIGS`)
+    or the import path of a factory builder (`package.module:callable`).
+    """
+    from .factories import GeneralBs4ProductFactory
+
+    if spec == "pruned":
+        return FactoryConfig(spec, GeneralBs4ProductFactory.create_factory)
+    if spec == "whole":
+        return FactoryConfig(spec, GeneralBs4ProductFactory.create_factory, prune=False)
+    if spec == "concurrent-fields":
+        return FactoryConfig(
+            spec, partial(GeneralBs4ProductFactory.create_factory, field_workers=4)
+        )
+    if ":" in spec:
+        return FactoryConfig(spec, _import_parser(spec))
+    raise ValueError(
+        f"Unknown config {spec!r}, expected one of {PRESET_CONFIGS} "
+        "or `package.module:callable`."
+    )
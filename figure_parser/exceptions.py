@@ -1,21 +1,29 @@
 from .core.exceptions import (
+    BudgetExceeded,
     DomainException,
     DomainInvalid,
     DuplicatedDomainRegistration,
     FailedToCreateProduct,
     FailedToProcessProduct,
     FigureParserException,
+    MemoryBudgetExceeded,
     ParserInitializationFailed,
+    ProductTimeout,
+    RegexBudgetExceeded,
     UnregisteredDomain,
 )
 
 __all__ = (
+    "BudgetExceeded",
     "DomainException",
     "DomainInvalid",
     "DuplicatedDomainRegistration",
     "FailedToCreateProduct",
     "FailedToProcessProduct",
     "FigureParserException",
+    "MemoryBudgetExceeded",
     "ParserInitializationFailed",
+    "ProductTimeout",
+    "RegexBudgetExceeded",
     "UnregisteredDomain",
 )
@@ -1,29 +1,114 @@
-from bs4 import BeautifulSoup
-
-from .core.factory_base import GenericProductFactory
-from .parsers import (
-    AlterProductParser,
-    AmakuniProductParser,
-    GscProductParser,
-    NativeProductParser,
-)
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional, Union
+
+from .core.factory_base import GenericProductFactory, ParserType
+from .core.models import ProductBase
 from .pipes import normalize_general_fields, normalize_worker_fields, sort_releases
+from .registry import (
+    BUILTIN_MANIFEST_PATH,
+    ENTRY_POINT_GROUP,
+    collect_parser_registrations,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from bs4 import BeautifulSoup
+
+    from .parsers.source_cache import SourceCache
+
+
+class Bs4ProductFactory(GenericProductFactory["BeautifulSoup"]):
+    source_cache: Optional["SourceCache"] = None
+    """Reuse the region snapshots of pages on disk, see :class:`SourceCache`."""
+
+    def build_source(
+        self,
+        html: Union[str, bytes],
+        parser_cls: ParserType["BeautifulSoup"],
+        prune: bool = True,
+    ) -> "BeautifulSoup":
+        """
+        Build the soup for the parser.
 
+        :param prune: Only build the regions declared by the parser
+            (:attr:`AbstractBs4ProductParser.regions`) into the soup,
+            the regions of variants are the union of the parsers'.
+        """
+        from .parsers.regions import make_source
 
-class Bs4ProductFactory(GenericProductFactory[BeautifulSoup]):
-    pass
+        regions = getattr(parser_cls, "regions", None) if prune else None
+        if self.source_cache is not None:
+            return self.source_cache.make_source(html, regions)
+        return make_source(html, regions)
+
+    def create_product_from_stream(
+        self,
+        url: str,
+        chunks: Iterable[Union[str, bytes]],
+        encoding: Optional[str] = None,
+    ) -> ProductBase:
+        """
+        Create the product from html chunks which are arriving from network.
+
+        Only the regions declared by the parser are kept, `chunks` is not
+        consumed anymore once the terminal and required regions are closed.
+
+        :param encoding: The encoding of bytes chunks.
+        """
+        from .parsers.streaming import stream_source
+
+        parser_cls = self._get_registered_parser(url)
+        regions = getattr(parser_cls, "regions", None)
+        with self._enforce_budget(url) as meter:
+            if meter:
+                meter.check("build_source")
+            source = stream_source(chunks, regions=regions, encoding=encoding)
+            return self.create_product(url=url, source=source)
 
 
 class GeneralBs4ProductFactory(Bs4ProductFactory):
     @classmethod
-    def create_factory(cls):
-        factory = cls()
+    def create_factory(
+        cls,
+        manifests: Iterable[Union[str, Path]] = (BUILTIN_MANIFEST_PATH,),
+        entry_point_group: Optional[str] = ENTRY_POINT_GROUP,
+        regex_budget: Optional[float] = None,
+        time_budget: Optional[float] = None,
+        memory_budget: Optional[int] = None,
+        field_workers: Optional[int] = None,
+        source_cache: Optional[Union[str, Path]] = None,
+    ):
+        """
+        Create the factory with the parsers in manifests and entry points.
+
+        The parsers are registered with import paths,
+        the parser module is imported when its domain is requested at first time.
+
+        :param manifests: The manifests which map domain to parser path.
+        :param entry_point_group: The entry point group of third-party parsers,
+            `None` to disable the discovery.
+            Parsers from entry points override the ones from manifests.
+        :param regex_budget: The regex time budget of a product in seconds.
+        :param time_budget: The wall-time budget of a product in seconds.
+        :param memory_budget: The memory budget of a product in bytes.
+        :param field_workers: Parse the fields of a product concurrently.
+        :param source_cache: The directory to cache the region snapshots of pages.
+        """
+        factory = cls(
+            regex_budget=regex_budget,
+            time_budget=time_budget,
+            memory_budget=memory_budget,
+            field_workers=field_workers,
+        )
+        if source_cache is not None:
+            from .parsers.source_cache import SourceCache
+
+            factory.source_cache = SourceCache(source_cache)
         (
-            factory.register_parser("alter-web.jp", AlterProductParser)
-            .register_parser("amakuni.info", AmakuniProductParser)
-            .register_parser("goodsmile.info", GscProductParser)
-            .register_parser("native-web.jp", NativeProductParser)
-            .add_pipes(
+            factory.register_parsers(
+                collect_parser_registrations(
+                    manifests=manifests, entry_point_group=entry_point_group
+                )
+            ).add_pipes(
                 (normalize_general_fields, 1),
                 (normalize_worker_fields, 2),
                 (sort_releases, 3),
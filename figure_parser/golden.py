@@ -0,0 +1,141 @@
+"""
+Golden outputs of the recorded corpus.
+
+Each page's result is serialized to a canonical form (JSON with sorted keys,
+errors by their types) and compared with its golden file in a directory,
+only the mismatches are reported.
+
+.. code-block:: python
+
+    results = BatchRunner(workers=8).run(iter_records("pages"))
+    report = check_golden(results, "golden")
+    print(report.format())
+"""
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set, Tuple, Union
+
+from pydantic.json import pydantic_encoder
+
+from .batch import BatchResult
+from .store import write_atomic
+
+GOLDEN_SUFFIX = ".json"
+
+
+@dataclass
+class Mismatch:
+    url: str
+    fields: Dict[str, Tuple[Any, Any]]
+    """The expected and actual values of the mismatched fields."""
+
+
+@dataclass
+class GoldenReport:
+    checked: int = 0
+    mismatches: List[Mismatch] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+    """The urls without golden files."""
+    stale: List[Path] = field(default_factory=list)
+    """The golden files of pages which are not checked."""
+    updated: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches and not self.missing
+
+    def format(self) -> str:
+        lines = []
+        for mismatch in self.mismatches:
+            lines.append(f"CHANGED {mismatch.url}")
+            for name, (expected, actual) in mismatch.fields.items():
+                lines.append(f"    {name}: {expected!r} -> {actual!r}")
+        for url in self.missing:
+            lines.append(f"MISSING {url}")
+        for path in self.stale:
+            lines.append(f"STALE   {path}")
+        lines.append(
+            f"{self.checked} pages checked, {len(self.mismatches)} changed, "
+            f"{len(self.missing)} missing, {len(self.stale)} stale, "
+            f"{self.updated} updated."
+        )
+        return "\n".join(lines)
+
+
+def canonical_result(result: BatchResult) -> Dict[str, Any]:
+    """
+    The canonical form of result, it's stable across runs.
+    The error messages are reduced to their types.
+    """
+    record: Dict[str, Any] = {"url": result.url, "error": result.error_type}
+    if result.product is not None:
+        record["product"] = result.product.dict(exclude={"url"})
+    return json.loads(json.dumps(record, default=pydantic_encoder))
+
+
+def golden_path(golden_dir: Union[str, Path], url: str) -> Path:
+    digest = hashlib.sha256(url.encode("utf-8")).hexdigest()[:24]
+    return Path(golden_dir).joinpath(digest + GOLDEN_SUFFIX)
+
+
+def check_golden(
+    results: Iterable[BatchResult],
+    golden_dir: Union[str, Path],
+    update: bool = False,
+) -> GoldenReport:
+    """
+    Compare the results with the golden files.
+
+    :param update: Write the changed and missing golden files instead of
+        reporting them.
+    """
+    golden_dir = Path(golden_dir)
+    report = GoldenReport()
+    seen: Set[Path] = set()
+    for result in results:
+        report.checked += 1
+        path = golden_path(golden_dir, result.url)
+        seen.add(path)
+        actual = canonical_result(result)
+        try:
+            expected = json.loads(path.read_text("utf-8"))
+        except FileNotFoundError:
+            expected = None
+
+        if expected == actual:
+            continue
+        if update:
+            write_atomic(path, _dump(actual))
+            report.updated += 1
+        elif expected is None:
+            report.missing.append(result.url)
+        else:
+            report.mismatches.append(
+                Mismatch(result.url, diff_records(expected, actual))
+            )
+
+    if golden_dir.is_dir():
+        report.stale = sorted(
+            path for path in golden_dir.glob(f"*{GOLDEN_SUFFIX}") if path not in seen
+        )
+    return report
+
+
+def diff_records(expected: Dict[str, Any], actual: Dict[str, Any]) -> Dict[str, Tuple]:
+    """The mismatched fields of canonical results, see :func:`canonical_result`."""
+    fields = {}
+    if expected.get("error") != actual.get("error"):
+        fields["error"] = (expected.get("error"), actual.get("error"))
+    expected_product = expected.get("product") or {}
+    actual_product = actual.get("product") or {}
+    for name in sorted(expected_product.keys() | actual_product.keys()):
+        if expected_product.get(name) != actual_product.get(name):
+            fields[name] = (expected_product.get(name), actual_product.get(name))
+    return fields
+
+
+def _dump(record: Dict[str, Any]) -> bytes:
+    text = json.dumps(record, ensure_ascii=False, indent=2, sort_keys=True)
+    return (text + "\n").encode("utf-8")
@@ -1,7 +1,12 @@
-from .alter import AlterProductParser
-from .amakuni import AmakuniProductParser
-from .gsc import GscProductParser
-from .native import NativeProductParser
+from typing import TYPE_CHECKING
+
+from .._lazy import lazy_module
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .alter import AlterProductParser
+    from .amakuni import AmakuniProductParser
+    from .gsc import GscProductParser
+    from .native import NativeProductParser
 
 __all__ = (
     "AlterProductParser",
@@ -9,3 +14,13 @@ __all__ = (
     "GscProductParser",
     "NativeProductParser",
 )
+
+# Site parser modules are imported on first access (PEP 562).
+_lazy_attributes = {
+    "AlterProductParser": ".alter",
+    "AmakuniProductParser": ".amakuni",
+    "GscProductParser": ".gsc",
+    "NativeProductParser": ".native",
+}
+
+__getattr__, __dir__ = lazy_module(__name__, _lazy_attributes)
@@ -1,71 +1,183 @@
-import re
+from dataclasses import dataclass, field
 from datetime import date, datetime
-from typing import Dict, List, Mapping, Optional, Union
-from urllib.parse import ParseResult, urlparse, urlunparse
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
+from urllib.parse import ParseResult, urlparse
 
 from bs4 import BeautifulSoup, Tag
 
 from figure_parser import OrderPeriod, PriceTag
+from figure_parser import regex as re
 from figure_parser.parsers.base import AbstractBs4ProductParser
+from figure_parser.parsers.images import canonicalize_image_urls
+from figure_parser.parsers.regions import HEAD_META_REGIONS, Region
 
 from ..utils import price_parse, scale_parse, size_parse
 
 
-def _parse_detail(source: BeautifulSoup):
-    detail = source.select_one("#contents")
+@dataclass
+class AlterPage:
+    """
+    The snapshot of nodes which are used by :class:`AlterProductParser`,
+    it is collected by one traversal of the page.
+    """
+
+    detail: Tag
+    spec: Mapping[str, Any]
+    name: Optional[Tag] = None
+    breadcrumb: List[Tag] = field(default_factory=list)
+    gallery: List[Tag] = field(default_factory=list)
+    copyright: Optional[Tag] = None
+    releaser_label: Optional[Tag] = None
+    distributer_label: Optional[Tag] = None
+    is_resale: bool = False
+
+
+def _index_page(source: BeautifulSoup) -> AlterPage:
+    detail: Optional[Tag] = None
+    name: Optional[Tag] = None
+    copyright_: Optional[Tag] = None
+    releaser_label: Optional[Tag] = None
+    distributer_label: Optional[Tag] = None
+    is_resale = False
+    breadcrumb: List[Tag] = []
+    gallery: List[Tag] = []
+    detail_tables: List[_TableCells] = []
+    all_tables: List[_TableCells] = []
+
+    # (tag, is in #contents, is in #topicpath, cells of the closest table)
+    stack: List[Tuple[Tag, bool, bool, Optional[_TableCells]]] = [
+        (source, False, False, None)
+    ]
+    while stack:
+        tag, in_detail, in_topicpath, cells = stack.pop()
+        tag_name = tag.name
+        classes = tag.get("class") or ()
+
+        if detail is None and tag.get("id") == "contents":
+            detail = tag
+            in_detail = True
+        elif tag.get("id") == "topicpath":
+            in_topicpath = True
+
+        if "resale" in classes:
+            is_resale = True
+
+        if tag_name == "table":
+            cells = _TableCells([], [])
+            all_tables.append(cells)
+            if in_detail:
+                detail_tables.append(cells)
+        elif tag_name == "th" and cells is not None:
+            cells.heads.append(tag)
+        elif tag_name == "td" and cells is not None:
+            cells.values.append(tag)
+
+        if in_topicpath and tag_name == "a" and _parent_name(tag) == "li":
+            breadcrumb.append(tag)
+
+        if in_detail:
+            if tag_name == "h1" and name is None:
+                name = tag
+            elif tag_name == "img" and _is_gallery_image(tag):
+                gallery.append(tag)
+            elif tag_name == "span" and tag.string:
+                if releaser_label is None and "発売元" in tag.string:
+                    releaser_label = tag
+                if distributer_label is None and "販売元" in tag.string:
+                    distributer_label = tag
+            if copyright_ is None and "copyright" in classes:
+                copyright_ = tag
+
+        for child in reversed(tag.contents):
+            if isinstance(child, Tag):
+                stack.append((child, in_detail, in_topicpath, cells))
+
     assert detail
-    return detail
+    return AlterPage(
+        detail=detail,
+        spec=_parse_spec(detail_tables or all_tables),
+        name=name,
+        breadcrumb=breadcrumb,
+        gallery=gallery,
+        copyright=copyright_,
+        releaser_label=releaser_label,
+        distributer_label=distributer_label,
+        is_resale=is_resale,
+    )
+
+
+class _TableCells(NamedTuple):
+    heads: List[Tag]
+    values: List[Tag]
+
+
+def _parent_name(tag: Tag) -> Optional[str]:
+    return tag.parent.name if tag.parent else None
 
 
-def _parse_spec(source: BeautifulSoup):
-    tables = [*source.select("table")]
-    heads = []
-    values = []
+def _is_gallery_image(img: Tag) -> bool:
+    """`.bxslider > li > img`"""
+    li = img.parent
+    if not li or li.name != "li" or not li.parent:
+        return False
+    return "bxslider" in (li.parent.get("class") or ())
+
+
+def _parse_spec(tables: List[_TableCells]) -> Dict[str, Any]:
+    spec: Dict[str, Any] = {}
 
     # FIXME: This is too magic...
     for table in tables:
-        for th, td in zip(table.select("th"), table.select("td")):
+        for th, td in zip(table.heads, table.values):
             key = "".join(th.text.split())
-            heads.append(key)
-            value = td.text
+            value: Any = td.text
             if key in ["原型", "彩色"]:
                 value = [
                     content
                     for content in td.contents
                     if content.name != "br"  # type: ignore
                 ]
-            values.append(value)
+            spec[key] = value
 
-    spec: Dict[str, str] = dict(zip(heads, values))
     return spec
 
 
 class AlterProductParser(AbstractBs4ProductParser):
-    spec: Mapping[str, str]
-    detail: Tag
+    regions = (
+        Region(id="topicpath"),
+        Region(id="contents"),
+        Region(class_="resale", optional=True),
+        *HEAD_META_REGIONS,
+    )
+    page: AlterPage
     parsed_url: ParseResult
 
     def __init__(
         self,
         source: BeautifulSoup,
-        detail: Tag,
-        spec: Mapping[str, str],
+        page: AlterPage,
         parsed_url: ParseResult,
     ):
-        self.detail = detail
-        self.spec = spec
+        self.page = page
         self.parsed_url = parsed_url
         super().__init__(source)
 
     @classmethod
     def create_parser(cls, url: str, source: BeautifulSoup):
-        detail = _parse_detail(source)
-        spec = _parse_spec(source)
+        page = _index_page(source)
         parsed_url = urlparse(url)
-        return cls(source=source, spec=spec, detail=detail, parsed_url=parsed_url)
+        return cls(source=source, page=page, parsed_url=parsed_url)
+
+    @property
+    def detail(self) -> Tag:
+        return self.page.detail
+
+    @property
+    def spec(self) -> Mapping[str, Any]:
+        return self.page.spec
 
     def parse_name(self) -> str:
-        name_ele = self.source.select_one("#contents h1")
+        name_ele = self.page.name
         assert name_ele
         name = name_ele.text.strip()
         return name
@@ -73,7 +185,7 @@ class AlterProductParser(AbstractBs4ProductParser):
     def parse_category(self) -> str:
         default_category = "フィギュア"
         transform_list = ["コラボ", "アルタイル", default_category]
-        category = self.source.select("#topicpath li > a")[1].text.strip()
+        category = self.page.breadcrumb[1].text.strip()
 
         if category in transform_list:
             return default_category
@@ -144,7 +256,7 @@ class AlterProductParser(AbstractBs4ProductParser):
     def parse_releaser(self) -> Union[str, None]:
         pattern = r"：(\S.+)"
 
-        the_other_releaser = self.detail.find("span", string=re.compile("発売元"))
+        the_other_releaser = self.page.releaser_label
 
         if not the_other_releaser:
             return "アルター"
@@ -160,7 +272,7 @@ class AlterProductParser(AbstractBs4ProductParser):
     def parse_distributer(self) -> Union[str, None]:
         pattern = r"：(\S.+)"
 
-        the_other_releaser = self.detail.find("span", string=re.compile("販売元"))
+        the_other_releaser = self.page.distributer_label
 
         if not the_other_releaser:
             return None
@@ -173,34 +285,25 @@ class AlterProductParser(AbstractBs4ProductParser):
         return distributer
 
     def parse_rerelease(self) -> bool:
-        is_resale = bool(self.source.find(class_="resale"))
-        return is_resale
+        return self.page.is_resale
 
     def parse_images(self) -> List[str]:
-        images_item = self.detail.select(".bxslider > li > img")
-        images = []
-        for img in images_item:
+        image_sources = []
+        for img in self.page.gallery:
             image_source = img["src"]
             if not type(image_source) is str:
                 image_source = image_source[0]
 
             assert type(image_source) is str
-            url_components = (
-                self.parsed_url.scheme,
-                self.parsed_url.netloc,
-                image_source,
-                None,
-                None,
-                None,
-            )
-            url = urlunparse(url_components)
-            images.append(url)
-
-        return images
+            image_sources.append(image_source)
+
+        # The sources are paths from the root of site.
+        site_url = f"{self.parsed_url.scheme}://{self.parsed_url.netloc}/"
+        return canonicalize_image_urls(image_sources, site_url)
 
     def parse_copyright(self) -> Union[str, None]:
         pattern = r"(©.*)※"
-        copyright_ele = self.detail.select_one(".copyright")
+        copyright_ele = self.page.copyright
         assert copyright_ele
         copyright_info = copyright_ele.text
         matched_copyright = re.search(pattern, copyright_info)
@@ -1,15 +1,18 @@
-import re
 from datetime import date, datetime
-from functools import cache
-from typing import List, Mapping, Optional
-from urllib.parse import urljoin
+from pathlib import Path
+from typing import List, Mapping, Match, Optional, Pattern, Sequence
 
 from bs4 import BeautifulSoup
 from pydantic import BaseModel
 
 from figure_parser import OrderPeriod, PriceTag
+from figure_parser import regex as re
+from figure_parser.core.parser_base import depends_on, shared_field
 from figure_parser.exceptions import ParserInitializationFailed
-from figure_parser.parsers.base import AbstractBs4ProductParser
+from figure_parser.parsers.base import AbstractBs4ProductParser, Bs4ParserVariants
+from figure_parser.parsers.images import canonicalize_image_urls
+from figure_parser.parsers.regions import HEAD_META_REGIONS, Region
+from figure_parser.parsers.site_data import load_site_data
 from figure_parser.parsers.utils import price_parse, scale_parse, size_parse
 
 
@@ -57,47 +60,19 @@ def parse_legacy_title(source: BeautifulSoup) -> str:
     raise ParserInitializationFailed  # pragma: no cover
 
 
-series_mapping: Mapping[str, str] = {
-    "魔王黙示録": "七つの大罪 魔王黙示録",
-    "クイーンズブレイド リベリオン": "クイーンズブレイド リベリオン",
-    "『七つの大罪』編特別付録": "七つの大罪",
-    "朧村正": "朧村正",
-    "Fate/kaleid liner プリズマ☆イリヤ": "Fate/kaleid liner プリズマ☆イリヤ",
-    "艦隊これくしょん -艦これ- ": "艦隊これくしょん -艦これ- ",
-    "モーレツ宇宙海賊": "モーレツ宇宙海賊",
-    "新次元ゲイム": "新次元ゲイム",
-    "閃乱カグラ NewWave Gバースト": "閃乱カグラ NewWave Gバースト",
-    "まおゆう魔王勇者": "まおゆう魔王勇者",
-    "地獄先生ぬ～べ～": "地獄先生ぬ～べ～",
-    "WIXOSS-ウィクロス-": "WIXOSS-ウィクロス-",
-    "ＴＶアニメ『ダンジョンに出会いを求めるのは間違っているだろうか』": "ＴＶアニメ『ダンジョンに出会いを求めるのは間違っているだろうか』",
-    "遊☆戯☆王": "遊☆戯☆王",
-    "『中二病でも恋がしたい！ 戀』": "『中二病でも恋がしたい！ 戀』",
-    "『君のいる町』": "『君のいる町』",
-    "東方Project": "東方Project",
-    "真･三國無双７": "真･三國無双７",
-    "ヱヴァンゲリヲン新劇場版：Q": "ヱヴァンゲリヲン新劇場版：Q",
-    "Ｄｉｓｔｏｒｔｉｏｎ　Ｄｒｉｖｅ": "BlazeBlue",
-    "キルラキル": "キルラキル",
-    "ペルソナ５": "ペルソナ５",
-    "えんどろ～！": "えんどろ～！",
-    "Fate/Grand Order": "Fate/Grand Order",
-    "スーパーロボット大戦X-Ω": "スーパーロボット大戦X-Ω",
-    "ガールズ&パンツァー 最終章": "ガールズ&パンツァー 最終章",
-    "PHANTASY STAR ONLINE 2 es": "PHANTASY STAR ONLINE 2 es",
-}
-
-
-legacy_title_is_lack_of_series: Mapping[str, str] = {
-    "三世村正　オアシスVer.": "装甲悪鬼村正",
-    "魔王黙示録　傲慢ノ章 ～スイカ割りノ節": "七つの大罪",
-    "魔王黙示録 憤怒の章 羞恥サタンクロースノ節": "七つの大罪",
-    "レーシングミク2017Ver.": "初音ミク GTプロジェクト",
-    "三世村正　ウェディングＶｅｒ．": "装甲悪鬼村正",
-}
+series_data_path = Path(__file__).parent.joinpath("data", "series.yml")
+
+
+def get_series_mapping() -> Mapping[str, str]:
+    return load_site_data(series_data_path)["series_mapping"]
+
+
+def get_legacy_title_is_lack_of_series() -> Mapping[str, str]:
+    return load_site_data(series_data_path)["legacy_title_is_lack_of_series"]
 
 
 def append_the_lack_series(title: str) -> str:
+    legacy_title_is_lack_of_series = get_legacy_title_is_lack_of_series()
     if title in legacy_title_is_lack_of_series:
         series = legacy_title_is_lack_of_series[title]
         title = title.replace("\u3000", " ")
@@ -106,6 +81,7 @@ def append_the_lack_series(title: str) -> str:
 
 
 def legacy_get_series_by_keyword(keyword: str) -> Optional[str]:
+    series_mapping = get_series_mapping()
     for key in series_mapping:
         if key in keyword:
             return series_mapping.get(key)
@@ -113,7 +89,7 @@ def legacy_get_series_by_keyword(keyword: str) -> Optional[str]:
 
 
 def remove_series(series: str, name: str) -> str:
-    series_pattern = r"^.+(?<={})(?:』?)".format(series)
+    series_pattern = r"^.+(?<={})(?:』?)".format(re.escape(series))
     name = re.sub(series_pattern, "", name)
     if series in name:
         name = remove_series(series, name.strip())
@@ -125,20 +101,55 @@ def parse_workers(workers_text: str) -> List[str]:
     return re.split(pattern=pattern, string=workers_text)
 
 
+_ORDER_PERIOD_PATTERN = re.compile(
+    r"●?受注期間／(?P<start_year>\d+)年(?P<start_month>\d+)月(?P<start_day>\d+)日"
+    r"\uff5e(?:(?P<end_year>\d+)年)?(?P<end_month>\d+)月(?P<end_day>\d+)日"
+)
+_PRICE_PATTERN = re.compile(r"●?価格(.+?)税(抜|込)")
+_RELEASE_DATE_PATTERN = re.compile(r"●?(発送予定|発売|発送)\uff0f(\d+)年(\d+)月")
+_COPYRIGHT_PATTERN = re.compile(r"((?:©|\(C\)|\(c\)|\（c\）).+)")
+_LEGACY_PAINTWORK_PATTERN = re.compile(r"彩色見本製作／(.+?)(●|$)")
+_LEGACY_SCULPTOR_PATTERN = re.compile(r"●?原型製作／(.+?)(●|$)")
+_LEGACY_SCALE_PATTERNS = (
+    re.compile(r"●?フィギュア仕様／(.+?)(●|$)"),
+    re.compile(r"●?仕様／(.+?)●"),
+    re.compile(r"スケール／(.+?)／"),
+)
+_LEGACY_SIZE_PATTERNS = (
+    re.compile(r"●?フィギュア仕様／(.+?)●"),
+    re.compile(r"●?仕様／(.+?)●"),
+    re.compile(r"サイズ／(.+?)／"),
+)
+_FORMAL_PAINTWORK_PATTERN = re.compile(r"彩色見本(?:製作)?／(.+)")
+_FORMAL_SCULPTOR_PATTERN = re.compile(r"●原型製作／(.+)")
+_FORMAL_SCALE_PATTERN = re.compile(r"●仕様／(.+)")
+_FORMAL_SIZE_PATTERN = re.compile(r"仕様／(?:.+)高約(\d+\.?\d+.{1,4})")
+_FORMAL_RELEASER_PATTERN = re.compile(r"●発売元／(.+)")
+_FORMAL_DISTRIBUTER_PATTERN = re.compile(r"●販売元／(.+)")
+
+
+def _search_first(patterns: Sequence[Pattern[str]], text: str) -> Optional[Match[str]]:
+    for pattern in patterns:
+        matched = re.search(pattern, text)
+        if matched:
+            return matched
+    return None
+
+
 def _parse_order_period(text: str) -> OrderPeriod:
-    pattern = (
-        r"●?受注期間／(?P<start>(\d+)年(\d+)月(\d+)日)\uff5e(?P<end>((\d+)年)?(\d+)月(\d+)日)"
-    )
-    date_format = "%Y年%m月%d日"
-    matched = re.search(pattern, text)
+    matched = re.search(_ORDER_PERIOD_PATTERN, text)
     if matched:
-        start_str = matched.group("start")
-        end_str = matched.group("end")
-        start_date = datetime.strptime(start_str, date_format)
-        try:
-            end_date = datetime.strptime(end_str, date_format)
-        except ValueError:
-            end_date = datetime.strptime(f"{start_date.year}年" + end_str, date_format)
+        # Building the dates from the groups is much cheaper than `strptime`.
+        start_date = datetime(
+            int(matched.group("start_year")),
+            int(matched.group("start_month")),
+            int(matched.group("start_day")),
+        )
+        end_date = datetime(
+            int(matched.group("end_year") or start_date.year),
+            int(matched.group("end_month")),
+            int(matched.group("end_day")),
+        )
         end_year = end_date.year
         if end_year == start_date.year and end_date.month < start_date.month:
             end_year += 1
@@ -151,8 +162,7 @@ def _parse_order_period(text: str) -> OrderPeriod:
 
 def _parse_prices(text: str) -> List[PriceTag]:
     prices = []
-    price_pattern = r"●?価格(.+?)税(抜|込)"
-    matched = re.search(price_pattern, text)
+    matched = re.search(_PRICE_PATTERN, text)
     if matched:
         price = price_parse(matched.group(0))
         tax_including = "税込" in matched.group(0)
@@ -163,8 +173,7 @@ def _parse_prices(text: str) -> List[PriceTag]:
 
 
 def _parse_release_dates(text: str) -> List[date]:
-    date_pattern = r"●?(発送予定|発売|発送)\uff0f(\d+)年(\d+)月"
-    date_matched = re.search(date_pattern, text)
+    date_matched = re.search(_RELEASE_DATE_PATTERN, text)
     if date_matched:
         release_date = date(int(date_matched.group(2)), int(date_matched.group(3)), 1)
         return [release_date]
@@ -172,6 +181,14 @@ def _parse_release_dates(text: str) -> List[date]:
 
 
 class AmakuniLegacyParser(AbstractBs4ProductParser):
+    # Legacy and formal pages share no region, none of them is awaited by streaming.
+    regions = (
+        Region("title", optional=True),
+        Region(id="contents_right", optional=True),
+        Region(id="item_midashi", optional=True),
+        Region(id="garrely_sum", optional=True),
+        *HEAD_META_REGIONS,
+    )
     _info: LegacyProductInfo
     _name: Optional[str]
     _series: Optional[str]
@@ -191,6 +208,7 @@ class AmakuniLegacyParser(AbstractBs4ProductParser):
         product_info = LegacyProductInfo(title_text=title_text, info_text=info_text)
         return cls(url=url, source=source, info=product_info)
 
+    @depends_on("parse_series")
     def parse_name(self) -> str:
         name = self._info.title_text
         # pattern = r"(【|\u3000).+"
@@ -225,7 +243,7 @@ class AmakuniLegacyParser(AbstractBs4ProductParser):
     def parse_release_dates(self) -> List[date]:
         return _parse_release_dates(self._info.info_text)
 
-    @cache
+    @shared_field
     def parse_series(self) -> Optional[str]:
         series = legacy_get_series_by_keyword(self._info.title_text)
 
@@ -240,50 +258,29 @@ class AmakuniLegacyParser(AbstractBs4ProductParser):
     def parse_paintworks(self) -> List[str]:
         if "2015/008" in self._source_url:
             return ["ピンポイント"]
-        pattern = r"彩色見本製作／(.+?)(●|$)"
-        matched = re.search(pattern, self._info.info_text)
+        matched = re.search(_LEGACY_PAINTWORK_PATTERN, self._info.info_text)
         return parse_workers(matched.group(1).strip()) if matched else []
 
     def parse_sculptors(self) -> List[str]:
         if "2015/008" in self._source_url:
             return ["まんぞくマモル(Knead)"]
-        pattern = r"●?原型製作／(.+?)(●|$)"
-        matched = re.search(pattern, self._info.info_text)
+        matched = re.search(_LEGACY_SCULPTOR_PATTERN, self._info.info_text)
         return parse_workers(matched.group(1).strip()) if matched else []
 
     def parse_scale(self) -> Optional[int]:
-        pattern = r"●?フィギュア仕様／(.+?)(●|$)"
-        matched = re.search(pattern, self._info.info_text)
-        if matched:
-            return scale_parse(matched.group(1))
-        pattern = r"●?仕様／(.+?)●"
-        matched = re.search(pattern, self._info.info_text)
-        if matched:
-            return scale_parse(matched.group(1))
-        pattern = r"スケール／(.+?)／"
-        matched = re.search(pattern, self._info.info_text)
+        matched = _search_first(_LEGACY_SCALE_PATTERNS, self._info.info_text)
         if matched:
             return scale_parse(matched.group(1))
         return None
 
     def parse_size(self) -> Optional[int]:
-        pattern = r"●?フィギュア仕様／(.+?)●"
-        matched = re.search(pattern, self._info.info_text)
-        if matched:
-            return size_parse(matched.group(1))
-        pattern = r"●?仕様／(.+?)●"
-        matched = re.search(pattern, self._info.info_text)
-        if matched:
-            return size_parse(matched.group(1))
-        pattern = r"サイズ／(.+?)／"
-        matched = re.search(pattern, self._info.info_text)
+        matched = _search_first(_LEGACY_SIZE_PATTERNS, self._info.info_text)
         if matched:
             return size_parse(matched.group(1))
         return None
 
     def parse_copyright(self) -> Optional[str]:
-        pattern = r"((?:©|\(C\)|\(c\)|\（c\）).+)"
-        matched = re.search(pattern, self._info.info_text)
+        matched = re.search(_COPYRIGHT_PATTERN, self._info.info_text)
         if matched:
             return matched.group(0)
         return None
@@ -298,16 +295,13 @@ class AmakuniLegacyParser(AbstractBs4ProductParser):
         return False
 
     def parse_images(self) -> List[str]:
-        images: List[str] = []
         image_anchors = self.source.select("#garrely_sum > a") or self.source.select(
             "#contents_right .item_right a"
         )
-        if image_anchors:
-            for anchor in image_anchors:
-                image_src = anchor.get("href")
-                if type(image_src) is str:
-                    images.append(urljoin(self._source_url, image_src))
-        return images
+        image_srcs = (anchor.get("href") for anchor in image_anchors)
+        return canonicalize_image_urls(
+            (src for src in image_srcs if type(src) is str), self._source_url
+        )
 
     def parse_thumbnail(self) -> Optional[str]:
         return None
@@ -320,6 +314,16 @@ class AmakuniLegacyParser(AbstractBs4ProductParser):
 
 
 class AmakuniFormalParser(AbstractBs4ProductParser):
+    regions = (
+        Region("title", optional=True),
+        Region(class_="name_waku", optional=True),
+        Region(class_="product_name", optional=True),
+        Region(class_="sakuhin_mei", optional=True),
+        Region(class_="product_details", optional=True),
+        Region("a", attrs=(("rel", "lightbox[01]"),), optional=True),
+        Region(class_="copyright", optional=True),
+        *HEAD_META_REGIONS,
+    )
     _detail_text: str
     _source_url: str
 
@@ -336,6 +340,7 @@ class AmakuniFormalParser(AbstractBs4ProductParser):
         detail_text = detail_ele.text.strip()
         return cls(url=url, source=source, detail_text=detail_text)
 
+    @depends_on("parse_series")
     def parse_name(self) -> str:
         name_ele = self.source.select_one(
             ".product_name > span:nth-last-child(1)"
@@ -379,7 +384,7 @@ class AmakuniFormalParser(AbstractBs4ProductParser):
     def parse_release_dates(self) -> List[date]:
         return _parse_release_dates(self._detail_text)
 
-    @cache
+    @shared_field
     def parse_series(self) -> Optional[str]:
         # FIXME: Need to refactor.
         series_ele = self.source.select_one(
@@ -405,47 +410,41 @@ class AmakuniFormalParser(AbstractBs4ProductParser):
         return None
 
     def parse_paintworks(self) -> List[str]:
-        pattern = r"彩色見本(?:製作)?／(.+)"
-        matched = re.search(pattern, self._detail_text)
+        matched = re.search(_FORMAL_PAINTWORK_PATTERN, self._detail_text)
         return parse_workers(matched.group(1).strip()) if matched else []
 
     def parse_sculptors(self) -> List[str]:
-        pattern = r"●原型製作／(.+)"
-        matched = re.search(pattern, self._detail_text)
+        matched = re.search(_FORMAL_SCULPTOR_PATTERN, self._detail_text)
         workers = parse_workers(matched.group(1).strip()) if matched else []
         workers = [worker.strip() for worker in workers]
         return workers
 
     def parse_scale(self) -> Optional[int]:
-        pattern = r"●仕様／(.+)"
-        matched = re.search(pattern, self._detail_text)
+        matched = re.search(_FORMAL_SCALE_PATTERN, self._detail_text)
         if matched:
             return scale_parse(matched.group(1))
         return None
 
     def parse_size(self) -> Optional[int]:
-        pattern = r"仕様／(?:.+)高約(\d+\.?\d+.{1,4})"
-        matched = re.search(pattern, self._detail_text)
+        matched = re.search(_FORMAL_SIZE_PATTERN, self._detail_text)
         if matched:
             return size_parse(matched.group(1))
         return None
 
     def parse_copyright(self) -> Optional[str]:
-        copyright_ele = self.source.select_one(".copyright")
+        copyright_ele = self.source.find(class_="copyright")
         if copyright_ele:
             return copyright_ele.text.strip()
         return None
 
     def parse_releaser(self) -> Optional[str]:
-        pattern = r"●発売元／(.+)"
-        matched = re.search(pattern, self._detail_text)
+        matched = re.search(_FORMAL_RELEASER_PATTERN, self._detail_text)
         if matched:
             return matched.group(1).strip()
         return "ホビージャパン"
 
     def parse_distributer(self) -> Optional[str]:
-        pattern = r"●販売元／(.+)"
-        matched = re.search(pattern, self._detail_text)
+        matched = re.search(_FORMAL_DISTRIBUTER_PATTERN, self._detail_text)
         if matched:
             return matched.group(1).strip()
         return "ホビージャパン"
@@ -454,14 +453,11 @@ class AmakuniFormalParser(AbstractBs4ProductParser):
         return False
 
     def parse_images(self) -> List[str]:
-        images: List[str] = []
         image_anchors = self.source.select("[rel='lightbox[01]']")
-        for a in image_anchors:
-            image_src = a.get("href")
-            if type(image_src) is str:
-                image_src = urljoin(self._source_url, image_src)
-                images.append(image_src)
-        return images
+        image_srcs = (anchor.get("href") for anchor in image_anchors)
+        return canonicalize_image_urls(
+            (src for src in image_srcs if type(src) is str), self._source_url
+        )
 
     def parse_thumbnail(self) -> Optional[str]:
         ...
@@ -473,74 +469,12 @@ class AmakuniFormalParser(AbstractBs4ProductParser):
         ...
 
 
-class AmakuniProductParser(AbstractBs4ProductParser):
-    _parser: AbstractBs4ProductParser
-
-    def __init__(self, source: BeautifulSoup, parser: AbstractBs4ProductParser) -> None:
-        self._parser = parser
-        super().__init__(source)
-
-    @classmethod
-    def create_parser(cls, url: str, source: BeautifulSoup):
-        if source.select_one(".name_waku"):
-            parser = AmakuniFormalParser.create_parser(url=url, source=source)
-        else:
-            parser = AmakuniLegacyParser.create_parser(url=url, source=source)
-        return cls(source=source, parser=parser)
-
-    def parse_name(self) -> str:
-        return self._parser.parse_name()
-
-    def parse_adult(self) -> bool:
-        return self._parser.parse_adult()
+def _is_formal_page(source: BeautifulSoup) -> bool:
+    return source.find(class_="name_waku") is not None
 
-    def parse_manufacturer(self) -> str:
-        return self._parser.parse_manufacturer()
 
-    def parse_category(self) -> str:
-        return self._parser.parse_category()
-
-    def parse_prices(self) -> List[PriceTag]:
-        return self._parser.parse_prices()
-
-    def parse_release_dates(self) -> List[date]:
-        return self._parser.parse_release_dates()
-
-    def parse_series(self) -> Optional[str]:
-        return self._parser.parse_series()
-
-    def parse_paintworks(self) -> List[str]:
-        return self._parser.parse_paintworks()
-
-    def parse_sculptors(self) -> List[str]:
-        return self._parser.parse_sculptors()
-
-    def parse_scale(self) -> Optional[int]:
-        return self._parser.parse_scale()
-
-    def parse_size(self) -> Optional[int]:
-        return self._parser.parse_size()
-
-    def parse_copyright(self) -> Optional[str]:
-        return self._parser.parse_copyright()
-
-    def parse_releaser(self) -> Optional[str]:
-        return self._parser.parse_releaser()
-
-    def parse_distributer(self) -> Optional[str]:
-        return self._parser.parse_distributer()
-
-    def parse_rerelease(self) -> bool:
-        return self._parser.parse_rerelease()
-
-    def parse_images(self) -> List[str]:
-        return self._parser.parse_images()
-
-    def parse_thumbnail(self) -> Optional[str]:
-        return self._parser.parse_thumbnail()
-
-    def parse_order_period(self) -> OrderPeriod:
-        return self._parser.parse_order_period()
-
-    def parse_JAN(self) -> Optional[str]:
-        return self._parser.parse_JAN()
+class AmakuniProductParser(Bs4ParserVariants):
+    variants = (
+        (_is_formal_page, AmakuniFormalParser),
+        (None, AmakuniLegacyParser),
+    )
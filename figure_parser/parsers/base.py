@@ -1,16 +1,28 @@
 from abc import abstractmethod
 from datetime import date
-from typing import List, Optional
+from typing import ClassVar, List, Optional, Tuple
 
 from bs4 import BeautifulSoup
 
 from figure_parser.core.models import PriceTag, Release
-from figure_parser.core.parser_base import AbstractProductParser
+from figure_parser.core.parser_base import (
+    AbstractProductParser,
+    ParserVariants,
+    depends_on,
+)
 
+from .regions import Region
 from .utils import make_last_element_filler
 
 
 class AbstractBs4ProductParser(AbstractProductParser[BeautifulSoup]):
+    regions: ClassVar[Optional[Tuple[Region, ...]]] = None
+    """
+    The regions of page used by the parser.
+    The factory could build the soup with the regions only,
+    `None` means the whole page is needed.
+    """
+
     @abstractmethod
     def parse_release_dates(self) -> List[date]:
         raise NotImplementedError
@@ -19,6 +31,7 @@ class AbstractBs4ProductParser(AbstractProductParser[BeautifulSoup]):
     def parse_prices(self) -> List[PriceTag]:
         raise NotImplementedError
 
+    @depends_on("parse_release_dates", "parse_prices")
     def parse_releases(self) -> List[Release]:
         """
         Focus on release dates.
@@ -73,3 +86,24 @@ class AbstractBs4ProductParser(AbstractProductParser[BeautifulSoup]):
         )
 
         return og_image[0] if og_image else None
+
+
+class Bs4ParserVariants(ParserVariants[BeautifulSoup]):
+    regions: ClassVar[Optional[Tuple[Region, ...]]] = None
+    """
+    The union of the regions of variants, unless it's declared.
+    The probes should only look at these regions.
+    """
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if "regions" in cls.__dict__:
+            return
+        regions: List[Region] = []
+        for _, parser_cls in cls.variants:
+            parser_regions = getattr(parser_cls, "regions", None)
+            if parser_regions is None:
+                cls.regions = None
+                return
+            regions.extend(r for r in parser_regions if r not in regions)
+        cls.regions = tuple(regions)
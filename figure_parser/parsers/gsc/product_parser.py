@@ -1,22 +1,31 @@
-import re
 from datetime import date, datetime
 from pathlib import Path
-from typing import Any, List, Match, Optional, Pattern, Union
+from typing import Any, List, Mapping, Match, Optional, Pattern, Tuple, Union
 from urllib.parse import urlparse
 
-import yaml
 from bs4 import BeautifulSoup
-from bs4.element import ResultSet, Tag
+from bs4.element import Tag
 
 from figure_parser import OrderPeriod, PriceTag
+from figure_parser import regex as re
+from figure_parser.core.parser_base import depends_on, shared_field
 from figure_parser.exceptions import ParserInitializationFailed
 from figure_parser.parsers.base import AbstractBs4ProductParser
+from figure_parser.parsers.images import canonicalize_image_urls
+from figure_parser.parsers.regions import HEAD_META_REGIONS, Region
+from figure_parser.parsers.site_data import load_site_data
 from figure_parser.parsers.utils import price_parse, scale_parse, size_parse
 
 locale_file_path = Path(__file__).parent.joinpath("locale", "gsc_parse.yml")
 
-with open(locale_file_path, "r", encoding="utf-8") as stream:
-    locale_dict = yaml.safe_load(stream)
+_RESALE_PRICE_PATTERN = re.compile(r"販(\w|)価格")
+
+_IMAGE_BASE_URL = "https://www.goodsmile.info/"
+"""The images are protocol-relative urls, https is used."""
+
+
+def get_locale_dict() -> Mapping[str, Mapping[str, Any]]:
+    return load_site_data(locale_file_path)
 
 
 def _extract_locale_from_url(url: str) -> str:
@@ -27,19 +36,50 @@ def _extract_locale_from_url(url: str) -> str:
 
 
 def _extract_detail_from_source(source: BeautifulSoup) -> Tag:
-    detail = source.select_one(".itemDetail")
-    if not detail:
+    detail = source.find(class_="itemDetail")
+    if not isinstance(detail, Tag):
         raise ParserInitializationFailed("Extract details from source failed.")
     return detail
 
 
+def _index_detail_labels(detail: Tag) -> Tuple[Tuple[str, Tag], ...]:
+    """
+    The casefolded labels (`dt`) of details in document order.
+    Labels of several strings are skipped, as `find(string=...)` does.
+    """
+    return tuple(
+        (str(label.string).casefold(), label)
+        for label in detail.find_all("dt")
+        if label.string is not None
+    )
+
+
 class GscProductParser(AbstractBs4ProductParser):
+    regions = (
+        Region(class_="itemDetail"),
+        Region(class_="itemInfo"),
+        Region("h1", class_="title"),
+        Region(class_="itemImg", optional=True),
+        *HEAD_META_REGIONS,
+    )
+    locale_independent_fields = (
+        "order_period",
+        "size",
+        "scale",
+        "rerelease",
+        "jan",
+        "images",
+        "thumbnail",
+        "og_image",
+    )
     locale: str
     detail: Tag
+    _labels: Tuple[Tuple[str, Tag], ...]
 
     def __init__(self, source: BeautifulSoup, locale: str, detail: Tag):
         self.locale = locale
         self.detail = detail
+        self._labels = _index_detail_labels(detail)
         super().__init__(source)
 
     @classmethod
@@ -48,23 +88,22 @@ class GscProductParser(AbstractBs4ProductParser):
         detail = _extract_detail_from_source(source)
         return cls(source=source, locale=locale, detail=detail)
 
-    def _find_detail(self, name: str, text: str):
-        target = self.detail.find(name=name, string=re.compile(text))
-        return target
-
-    def _find_detail_all(self, name: str, text: str) -> ResultSet:
-        targets = self.detail.find_all(name=name, string=re.compile(text))
-        return targets
+    def _find_label(self, text: str, prefix: bool = False) -> Optional[Tag]:
+        """Find the first label contains (or starts with) the text, ignoring case."""
+        text = text.casefold()
+        for label_text, label in self._labels:
+            if label_text.startswith(text) if prefix else text in label_text:
+                return label
+        return None
 
     def _get_from_locale_dict(self, key: str) -> Any:
-        return locale_dict[self.locale][key.lower()]
+        return get_locale_dict()[self.locale][key.lower()]
 
     def _parse_rerelease_dates(self) -> List[date]:
         resale_tag = self._get_from_locale_dict("resale")
         date_style = self._get_from_locale_dict("release_date_format")
         date_pattern: Pattern = self._get_from_locale_dict("release_date_pattern")
-        resale_date_info_tag = r"{tag}".format(tag=resale_tag)
-        resale_dates = self._find_detail("dt", resale_date_info_tag)
+        resale_dates = self._find_label(resale_tag)
         assert resale_dates
 
         resale_ele = resale_dates.find_next("dd")
@@ -80,6 +119,7 @@ class GscProductParser(AbstractBs4ProductParser):
                 dates.append(found_date)
         return dates
 
+    @depends_on("parse_rerelease")
     def parse_release_dates(self) -> List[date]:
         """
         If the product is re-saled,
@@ -119,10 +159,16 @@ class GscProductParser(AbstractBs4ProductParser):
 
     def _parse_resale_prices(self) -> List[PriceTag]:
         price_slot: List[PriceTag] = []
-        price_items = self.detail.find_all(name="dt", string=re.compile(r"販(\w|)価格"))
+        price_items = [
+            label
+            for label_text, label in self._labels
+            if re.search(_RESALE_PRICE_PATTERN, label_text)
+        ]
 
         for price_item in price_items:
-            price_text: str = price_item.find_next("dd").text.strip()
+            price_ele = price_item.find_next("dd")
+            assert price_ele
+            price_text = price_ele.text.strip()
             tax_feature = self._get_from_locale_dict("tax")
             tax_including = bool(re.search(f"{tax_feature}", price_text))
             price = price_parse(price_text)
@@ -132,10 +178,11 @@ class GscProductParser(AbstractBs4ProductParser):
 
         return price_slot
 
+    @depends_on("parse_rerelease")
     def parse_prices(self) -> List[PriceTag]:
         price_slot = []
         tag = self._get_from_locale_dict("price")
-        last_price_target = self._find_detail("dt", f"^{tag}")
+        last_price_target = self._find_label(tag, prefix=True)
 
         if last_price_target:
             tax_feature = self._get_from_locale_dict("tax")
@@ -166,13 +213,13 @@ class GscProductParser(AbstractBs4ProductParser):
         return price_slot
 
     def parse_name(self) -> str:
-        name_ele = self.source.select_one("h1.title", {"itemprop": "price"})
+        name_ele = self.source.find("h1", class_="title")
         assert name_ele
         return name_ele.text.strip()
 
     def parse_series(self) -> Optional[str]:
         tag = self._get_from_locale_dict("series")
-        series_targets = self._find_detail("dt", tag)
+        series_targets = self._find_label(tag)
 
         if not series_targets:
             return None
@@ -181,9 +228,10 @@ class GscProductParser(AbstractBs4ProductParser):
         series = series_ele.text.strip()
         return series
 
+    @shared_field
     def parse_manufacturer(self) -> str:
         tag = self._get_from_locale_dict("manufacturer")
-        manufacturer_targets = self._find_detail("dt", tag)
+        manufacturer_targets = self._find_label(tag)
 
         if not manufacturer_targets:
             return self._get_from_locale_dict("default_manufacturer")
@@ -205,7 +253,7 @@ class GscProductParser(AbstractBs4ProductParser):
 
     def parse_sculptors(self) -> List[str]:
         tag = self._get_from_locale_dict("sculptor")
-        sculptor_info = self._find_detail("dt", tag)
+        sculptor_info = self._find_label(tag)
 
         if not sculptor_info:
             return []
@@ -218,7 +266,7 @@ class GscProductParser(AbstractBs4ProductParser):
 
     def parse_scale(self) -> Union[int, None]:
         tag = self._get_from_locale_dict("spec")
-        spec_target = self._find_detail("dt", tag)
+        spec_target = self._find_label(tag)
 
         if not spec_target:
             return None
@@ -231,7 +279,7 @@ class GscProductParser(AbstractBs4ProductParser):
 
     def parse_size(self) -> Union[int, None]:
         tag = self._get_from_locale_dict("spec")
-        spec_target = self._find_detail("dt", tag)
+        spec_target = self._find_label(tag)
 
         if not spec_target:
             return None
@@ -242,9 +290,10 @@ class GscProductParser(AbstractBs4ProductParser):
         size = size_parse(description)
         return size
 
+    @depends_on("parse_manufacturer")
     def parse_releaser(self) -> Optional[str]:
         tag = self._get_from_locale_dict("releaser")
-        detail_dd = self._find_detail("dt", tag)
+        detail_dd = self._find_label(tag)
 
         if not detail_dd:
             return self.parse_manufacturer()
@@ -254,9 +303,10 @@ class GscProductParser(AbstractBs4ProductParser):
         releaser = releaser_ele.text.strip()
         return releaser
 
+    @depends_on("parse_manufacturer")
     def parse_distributer(self) -> Optional[str]:
         tag = self._get_from_locale_dict("distributer")
-        detail_dd = self._find_detail("dt", tag)
+        detail_dd = self._find_label(tag)
 
         if not detail_dd:
             return self.parse_manufacturer()
@@ -267,7 +317,7 @@ class GscProductParser(AbstractBs4ProductParser):
         return distributer
 
     def parse_copyright(self) -> Optional[str]:
-        _copyright = self.detail.select_one(".itemCopy")
+        _copyright = self.detail.find(class_="itemCopy")
 
         if not _copyright:
             return None
@@ -280,13 +330,14 @@ class GscProductParser(AbstractBs4ProductParser):
 
         return the_copyright
 
+    @shared_field
     def parse_rerelease(self) -> bool:
         tag = self._get_from_locale_dict("resale")
-        resale = self._find_detail("dt", tag)
+        resale = self._find_label(tag)
         return bool(resale)
 
     def parse_order_period(self) -> OrderPeriod:
-        period = self.detail.select_one(".onlinedates")
+        period = self.detail.find(class_="onlinedates")
 
         if not period:
             return OrderPeriod(start=None, end=None)
@@ -306,17 +357,16 @@ class GscProductParser(AbstractBs4ProductParser):
         return OrderPeriod(start=start, end=end)
 
     def parse_adult(self) -> bool:
-        rq_pattern = self._get_from_locale_dict("adult")
-        keyword = re.compile(rq_pattern)
-        info = self.source.select_one(".itemInfo")
+        keywords: Pattern = self._get_from_locale_dict("adult_pattern")
+        info = self.source.find(class_="itemInfo")
         assert info
-        detaill_adult = info.find(string=keyword)
-
-        return bool(detaill_adult)
+        # Every string (comments as well) is searched on its own,
+        # the separator stops the keywords from matching across strings.
+        return bool(re.search(keywords, info.get_text("\0", types=None)))
 
     def parse_paintworks(self) -> List[str]:
         tag: str = self._get_from_locale_dict("paintwork")
-        paintwork_title = self._find_detail("dt", tag)
+        paintwork_title = self._find_label(tag)
 
         if not paintwork_title:
             return []
@@ -328,9 +378,10 @@ class GscProductParser(AbstractBs4ProductParser):
         return paintworks
 
     def parse_images(self) -> List[str]:
-        images_items = self.source.select(".itemImg")
-        images = [f'https://{item["src"][2:]}' for item in images_items]
-        return images
+        images_items = self.source.find_all(class_="itemImg")
+        return canonicalize_image_urls(
+            (item["src"] for item in images_items), _IMAGE_BASE_URL
+        )
 
     def parse_JAN(self) -> Optional[str]:
         return None
@@ -0,0 +1,85 @@
+"""
+Canonical image urls.
+
+The image urls parsed by different sites are resolved against the page,
+the hosts are normalized and the size variants of an image are collapsed,
+so the same asset isn't downloaded several times.
+
+.. code-block:: python
+
+    canonicalize_image_urls(
+        ["/img/large/a.jpg", "/img/medium/a.jpg", "//CDN.foo.bar:443/b.jpg#zoom"],
+        base_url="https://foo.bar/product/1",
+    )
+    # ['https://foo.bar/img/large/a.jpg', 'https://cdn.foo.bar/b.jpg']
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from figure_parser import regex as re
+
+_DEFAULT_PORTS = {"http": ":80", "https": ":443"}
+
+_NAMED_SIZE_RANKS = {"thumb": 0, "small": 1, "medium": 2, "large": 3, "original": 4}
+_NAMED_SIZE_PATTERN = re.compile(r"/(thumb|small|medium|large|original)/")
+"""The size directory of path, e.g. `/cgm/images/product/1/2/large/a.jpg`."""
+_DIMENSION_SIZE_PATTERN = re.compile(r"-(\d+)x(\d+)(?=\.\w+$)")
+"""The dimension suffix of file name, e.g. `a-300x200.jpg`."""
+
+
+@lru_cache(maxsize=4096)
+def canonicalize_image_url(url: str, base_url: Optional[str] = None) -> str:
+    """
+    Resolve the url against `base_url`, lowercase the scheme and host,
+    drop the default port and the fragment.
+    """
+    url = url.strip()
+    if base_url:
+        url = urljoin(base_url, url)
+    scheme, netloc, path, query, _ = urlsplit(url)
+    scheme = scheme.lower()
+    netloc = netloc.lower()
+    default_port = _DEFAULT_PORTS.get(scheme)
+    if default_port and netloc.endswith(default_port):
+        netloc = netloc[: -len(default_port)]
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def _size_variant_key(url: str) -> Tuple[str, float]:
+    """The url without size marks and the rank of size (larger is better)."""
+    named = re.search(_NAMED_SIZE_PATTERN, url)
+    if named:
+        key = url[: named.start()] + "/*/" + url[named.end() :]
+        return key, _NAMED_SIZE_RANKS[named.group(1)]
+
+    dimension = re.search(_DIMENSION_SIZE_PATTERN, url)
+    if dimension:
+        key = url[: dimension.start()] + url[dimension.end() :]
+        return key, int(dimension.group(1)) * int(dimension.group(2))
+
+    return url, float("inf")
+
+
+def canonicalize_image_urls(
+    urls: Iterable[str], base_url: Optional[str] = None
+) -> List[str]:
+    """
+    Canonicalize the urls (see :func:`canonicalize_image_url`) and remove
+    the duplicates in order.
+    The size variants of an image are collapsed into the largest one,
+    at the position of the first variant.
+    """
+    images: List[str] = []
+    slots: Dict[str, Tuple[int, float]] = {}
+    for url in urls:
+        url = canonicalize_image_url(url, base_url)
+        key, rank = _size_variant_key(url)
+        slot = slots.get(key)
+        if slot is None:
+            slots[key] = (len(images), rank)
+            images.append(url)
+        elif rank > slot[1]:
+            images[slot[0]] = url
+            slots[key] = (slot[0], rank)
+    return images
@@ -1,16 +1,25 @@
-import re
 from datetime import date, datetime
 from typing import Dict, List, Mapping, Optional, Union
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 
 from figure_parser import OrderPeriod, PriceTag
+from figure_parser import regex as re
 
 from ..base import AbstractBs4ProductParser
-from ..utils import price_parse, scale_parse, size_parse
+from ..images import canonicalize_image_urls
+from ..regions import HEAD_META_REGIONS, Region
+from ..utils import index_description_list, price_parse, scale_parse, size_parse
 
 
 class NativeProductParser(AbstractBs4ProductParser):
+    regions = (
+        Region("article"),
+        Region(class_="entryitem_detail"),
+        Region(class_="swiper-slide", optional=True),
+        Region(class_="copyright"),
+        *HEAD_META_REGIONS,
+    )
     _detail: Mapping[str, str]
 
     def __init__(self, source: BeautifulSoup, detail: Mapping[str, str]):
@@ -129,12 +138,7 @@ class NativeProductParser(AbstractBs4ProductParser):
 
     def parse_images(self) -> List[str]:
         slide_images = self.source.select(".swiper-slide > .img > img")
-
-        images = []
-        for image in slide_images:
-            images.append(image["src"])
-
-        return images
+        return canonicalize_image_urls(image["src"] for image in slide_images)
 
     def parse_thumbnail(self) -> Optional[str]:
         """
@@ -179,16 +183,13 @@ class NativeProductParser(AbstractBs4ProductParser):
 def parse_details(page: BeautifulSoup) -> Dict[str, str]:
     details: Dict[str, str] = {}
 
-    dts = page.select("dt")
-    dds = page.select("dd")
-
-    assert len(dts) == len(dds)
+    detail_block = page.find("article") or page
+    assert isinstance(detail_block, Tag)
 
-    for dt, dd in zip(dts, dds):
-        key = dt.text.strip()
+    for key, dd in index_description_list(detail_block).items():
         value = dd.text.strip()
         value = value.replace("\r", "")
         value = value.replace("\u3000", "\n")
-        details.setdefault(key, value)
+        details[key] = value
 
     return details
@@ -0,0 +1,134 @@
+from functools import lru_cache
+from typing import Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import lxml.html
+from bs4 import BeautifulSoup
+from bs4.dammit import UnicodeDammit
+from lxml.etree import ParserError, XPath, _Element
+
+
+class Region(NamedTuple):
+    """
+    A part of page which is needed by the parser,
+    the matched elements are kept with their whole subtrees.
+
+    .. code-block:: python
+
+        Region("div", class_="itemDetail")  # div.itemDetail
+        Region(id="contents")  # #contents
+        Region("meta", attrs=(("property", "og:image"),))  # meta[property='og:image']
+    """
+
+    tag: str = "*"
+    id: Optional[str] = None
+    class_: Optional[str] = None
+    attrs: Tuple[Tuple[str, str], ...] = ()
+    optional: bool = False
+    """The region may be absent or appear several times."""
+    terminal: bool = False
+    """
+    Nothing after the region is needed by the parser,
+    streaming ingestion stops once it's closed (see :class:`RegionStream`).
+    """
+
+    def match(self, tag: str, attrib: Mapping[str, str]) -> bool:
+        """Check the element with `tag` and `attrib` is matched by the region."""
+        if self.tag != "*" and self.tag != tag:
+            return False
+        if self.id is not None and attrib.get("id") != self.id:
+            return False
+        if (
+            self.class_ is not None
+            and self.class_ not in attrib.get("class", "").split()
+        ):
+            return False
+        return all(attrib.get(attr) == value for attr, value in self.attrs)
+
+    def to_xpath(self) -> str:
+        conditions = []
+        if self.id is not None:
+            conditions.append(f"@id={_quote(self.id)}")
+        if self.class_ is not None:
+            conditions.append(
+                "contains(concat(' ', normalize-space(@class), ' '), "
+                f"{_quote(f' {self.class_} ')})"
+            )
+        for attr, value in self.attrs:
+            conditions.append(f"@{attr}={_quote(value)}")
+
+        predicate = f"[{' and '.join(conditions)}]" if conditions else ""
+        return f"//{self.tag}{predicate}"
+
+
+HEAD_META_REGIONS: Tuple[Region, ...] = (
+    Region("meta", attrs=(("property", "og:image"),), optional=True),
+    Region("meta", attrs=(("name", "thumbnail"),), optional=True),
+)
+"""The meta tags read by `parse_og_image` and `parse_thumbnail`."""
+
+Html_T = Union[str, bytes]
+
+
+def make_source(
+    html: Html_T, regions: Optional[Sequence[Region]] = None
+) -> BeautifulSoup:
+    """
+    Build the soup for parser.
+
+    If `regions` is given, only the regions are kept in the soup.
+    The page is pre-parsed by lxml (which is much faster than building the whole soup),
+    and the soup is built from the extracted regions.
+    """
+    if not regions:
+        return BeautifulSoup(html, "lxml")
+
+    pruned_html = extract_regions(html, regions)
+    if pruned_html is None:
+        return BeautifulSoup(html, "lxml")
+    return BeautifulSoup(pruned_html, "lxml")
+
+
+def extract_regions(html: Html_T, regions: Sequence[Region]) -> Optional[str]:
+    """
+    Extract the html of regions in document order.
+    Return `None` if the page couldn't be parsed.
+    """
+    if isinstance(html, bytes):
+        html = UnicodeDammit(html, is_html=True).unicode_markup
+    try:
+        document = lxml.html.document_fromstring(html)
+    except (ParserError, ValueError):
+        return None
+
+    elements = select_regions(document, regions)
+    return "".join(
+        lxml.html.tostring(element, encoding="unicode", with_tail=False)
+        for element in elements
+    )
+
+
+def select_regions(document: _Element, regions: Iterable[Region]) -> List[_Element]:
+    """Select the outermost elements matched by `regions` in document order."""
+    xpath = _compile_xpath(tuple(regions))
+    selected = set()
+    outermost = []
+    for element in xpath(document):
+        if any(ancestor in selected for ancestor in element.iterancestors()):
+            continue
+        selected.add(element)
+        outermost.append(element)
+    return outermost
+
+
+@lru_cache(maxsize=None)
+def _compile_xpath(regions: Tuple[Region, ...]) -> XPath:
+    return XPath(" | ".join(region.to_xpath() for region in regions))
+
+
+def _quote(value: str) -> str:
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    parts = value.split("'")
+    return "concat(" + ', "\'", '.join(f"'{part}'" for part in parts) + ")"
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
+DATA_PACK_VERSION = 2
+"""Bump it when the cached layout changes, every cached pack would be rebuilt."""
+
+CACHE_DIR_ENV = "FIGURE_PARSER_CACHE_DIR"
+
+_PATTERN_KEY_SUFFIX = "_pattern"
+
+
+def get_cache_dir() -> Optional[Path]:
+    """
+    The directory of cached data packs.
+
+    `$FIGURE_PARSER_CACHE_DIR` has the highest priority,
+    otherwise `$XDG_CACHE_HOME/figure_parser` (`~/.cache/figure_parser`) is used.
+    Set `$FIGURE_PARSER_CACHE_DIR` to empty string to disable the cache.
+    """
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if cache_dir is not None:
+        return Path(cache_dir) if cache_dir else None
+
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home().joinpath(".cache")
+    return Path(xdg_cache_home).joinpath("figure_parser")
+
+
+@lru_cache(maxsize=None)
+def load_site_data(path: Path) -> Mapping[str, Any]:
+    """
+    Load the site data from yaml file.
+
+    The parsed yaml is cached as JSON (plain data only, nothing is executed
+    on loading it) in the cache directory on first use, values of keys end with
+    `_pattern` are compiled to :class:`re.Pattern` after loading.
+    The cache is keyed by the content hash of yaml file,
+    so editing the yaml invalidates it automatically.
+
+    :returns: A read-only mapping, nested mappings are read-only as well
+        and lists are converted to tuples.
+    """
+    path = Path(path)
+    content = path.read_bytes()
+    digest = _digest(content)
+
+    cache_path = _get_cache_path(path, digest)
+    data = _read_cache(cache_path) if cache_path else None
+    if data is None:
+        import yaml
+
+        data = yaml.safe_load(content)
+        if cache_path:
+            _write_cache(cache_path, data)
+
+    return freeze(compile_site_data(data))
+
+
+def compile_site_data(data: Any, key: Optional[str] = None) -> Any:
+    if isinstance(data, dict):
+        return {k: compile_site_data(v, key=str(k)) for k, v in data.items()}
+    if isinstance(data, list):
+        return [compile_site_data(v) for v in data]
+    if isinstance(data, str) and key and key.endswith(_PATTERN_KEY_SUFFIX):
+        return re.compile(data)
+    return data
+
+
+def freeze(data: Any) -> Any:
+    if isinstance(data, dict):
+        return MappingProxyType({k: freeze(v) for k, v in data.items()})
+    if isinstance(data, list):
+        return tuple(freeze(v) for v in data)
+    return data
+
+
+def _digest(content: bytes) -> str:
+    m = hashlib.sha256()
+    m.update(f"{DATA_PACK_VERSION}".encode("utf-8"))
+    m.update(content)
+    return m.hexdigest()
+
+
+def _get_cache_path(path: Path, digest: str) -> Optional[Path]:
+    cache_dir = get_cache_dir()
+    if not cache_dir:
+        return None
+    return cache_dir.joinpath(f"{path.stem}-{digest[:16]}.json")
+
+
+def _read_cache(cache_path: Path) -> Optional[Any]:
+    try:
+        with open(cache_path, "rb") as f:
+            return json.load(f)
+    except Exception:
+        # Missing or broken cache would be rebuilt.
+        return None
+
+
+def _write_cache(cache_path: Path, data: Any):
+    """Write the cache atomically, failure of writing cache is not an error."""
+    try:
+        content = json.dumps(data, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return
+    if json.loads(content) != data:
+        # e.g. non-string keys, they can't be kept by JSON.
+        return
+    from ..store import write_atomic
+
+    try:
+        write_atomic(cache_path, content.encode("utf-8"))
+    except OSError:
+        pass
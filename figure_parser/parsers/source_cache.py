@@ -0,0 +1,63 @@
+"""
+On-disk cache of region snapshots.
+
+Repeated runs over the same corpus (benchmarks, offline reprocessing,
+regenerating golden files) spend most of the time on building the soup.
+The cache keeps the html of the regions extracted by :func:`extract_regions`,
+keyed by the page content and the regions, so later runs skip tokenizing the
+whole page and only build the soup of the snapshot.
+
+Pickling the soup doesn't help, bs4 pickles a soup as its markup and parses it
+again on loading.
+
+.. code-block:: python
+
+    cache = SourceCache(".source_cache")
+    source = cache.make_source(html, GscProductParser.regions)
+"""
+import hashlib
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+from bs4 import BeautifulSoup
+from lxml.etree import LXML_VERSION
+
+from ..store import write_atomic
+from .regions import Html_T, Region, extract_regions, make_source
+
+SNAPSHOT_VERSION = 1
+"""Bump it when the way of extracting regions is changed."""
+
+
+class SourceCache:
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+
+    def make_source(
+        self, html: Html_T, regions: Optional[Sequence[Region]] = None
+    ) -> BeautifulSoup:
+        """The same as :func:`make_source`, the soup of whole page isn't cached."""
+        if not regions:
+            return make_source(html)
+
+        path = self.snapshot_path(html, regions)
+        try:
+            return BeautifulSoup(path.read_text("utf-8"), "lxml")
+        except FileNotFoundError:
+            pass
+
+        snapshot = extract_regions(html, regions)
+        if snapshot is None:
+            return BeautifulSoup(html, "lxml")
+        write_atomic(path, snapshot.encode("utf-8"))
+        return BeautifulSoup(snapshot, "lxml")
+
+    def snapshot_path(self, html: Html_T, regions: Sequence[Region]) -> Path:
+        content = html.encode("utf-8") if isinstance(html, str) else html
+        page_digest = hashlib.sha256(content).hexdigest()
+        regions_digest = hashlib.sha256(
+            repr((SNAPSHOT_VERSION, LXML_VERSION, tuple(regions))).encode("utf-8")
+        ).hexdigest()[:16]
+        return self.root.joinpath(
+            regions_digest, page_digest[:2], f"{page_digest}.html"
+        )
@@ -0,0 +1,139 @@
+from typing import Iterable, List, Optional, Sequence, Union
+
+from bs4 import BeautifulSoup
+from lxml.etree import HTMLPullParser, _Element, tostring
+
+from .regions import Region
+
+Chunk_T = Union[str, bytes]
+
+
+class RegionStream:
+    """
+    Incremental html ingestion which keeps the regions only.
+
+    Feed the chunks as they arrive, every match of the regions is kept as
+    :func:`make_source` does. :meth:`feed` returns `True` once a terminal region
+    (:attr:`Region.terminal`) and every required (non-optional) region have been
+    closed, the remaining of page doesn't need to be fetched or tokenized.
+    Optional regions may appear anywhere, so without a terminal region
+    the whole page is consumed.
+
+    .. code-block:: python
+
+        stream = RegionStream(parser_cls.regions)
+        for chunk in response.iter_content(chunk_size=16384):
+            if stream.feed(chunk):
+                break
+        source = stream.to_source()
+
+    :param encoding: The encoding of bytes chunks, e.g. the charset from
+        `Content-Type` header. libxml2 detects it if it's not given.
+    """
+
+    def __init__(self, regions: Sequence[Region], encoding: Optional[str] = None):
+        self._regions = tuple(regions)
+        self._pending = {region for region in self._regions if not region.optional}
+        self._terminated = False
+        self._parser = HTMLPullParser(events=("start", "end"), encoding=encoding)
+        self._chunks: List[str] = []
+        self._kept: Optional[_Element] = None
+        self._kept_region: Optional[Region] = None
+        self._done = False
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def feed(self, data: Chunk_T) -> bool:
+        if self._done:
+            return True
+        self._parser.feed(data)
+        self._consume_events()
+        return self._done
+
+    def close(self) -> str:
+        """Finish the ingestion and return the html of regions."""
+        if not self._done:
+            try:
+                self._parser.close()
+            except Exception:  # pragma: no cover
+                # The incomplete document is fine, the closed regions are kept.
+                pass
+            self._consume_events()
+            self._done = True
+        return "".join(self._chunks)
+
+    def to_source(self) -> BeautifulSoup:
+        return BeautifulSoup(self.close(), "lxml")
+
+    def _consume_events(self):
+        for event, element in self._parser.read_events():
+            if event == "start":
+                if self._kept is None:
+                    region = self._match(element)
+                    if region is not None:
+                        self._kept = element
+                        self._kept_region = region
+                continue
+
+            # end
+            if element is self._kept:
+                self._chunks.append(
+                    tostring(
+                        element, method="html", encoding="unicode", with_tail=False
+                    )
+                )
+                self._pending.discard(self._kept_region)  # type: ignore
+                self._terminated |= self._kept_region.terminal  # type: ignore
+                self._kept = None
+                self._kept_region = None
+                if self._terminated and not self._pending:
+                    self._done = True
+                    return
+
+            if self._kept is None:
+                # Free the parsed subtree, the regions in it are serialized already.
+                element.clear()
+
+    def _match(self, element: _Element) -> Optional[Region]:
+        tag = element.tag
+        if not isinstance(tag, str):
+            # comments and processing instructions
+            return None
+        attrib = element.attrib
+        for region in self._regions:
+            if region.match(tag, attrib):  # type: ignore
+                return region
+        return None
+
+
+def stream_source(
+    chunks: Iterable[Chunk_T],
+    regions: Optional[Sequence[Region]] = None,
+    encoding: Optional[str] = None,
+) -> BeautifulSoup:
+    """
+    Build the soup from chunks, stop consuming `chunks`
+    once the terminal and required regions are closed.
+    Without `regions` the whole page is built.
+    """
+    if not regions:
+        return BeautifulSoup(_join(chunks, encoding), "lxml")
+
+    stream = RegionStream(regions, encoding=encoding)
+    for chunk in chunks:
+        if stream.feed(chunk):
+            break
+    return stream.to_source()
+
+
+def _join(chunks: Iterable[Chunk_T], encoding: Optional[str]) -> Chunk_T:
+    collected = list(chunks)
+    if collected and all(isinstance(chunk, bytes) for chunk in collected):
+        joined = b"".join(collected)  # type: ignore
+        return joined.decode(encoding) if encoding else joined
+    return "".join(
+        chunk.decode(encoding or "utf-8") if isinstance(chunk, bytes) else chunk
+        for chunk in collected
+    )
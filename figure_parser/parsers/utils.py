@@ -1,7 +1,10 @@
-import re
 import unicodedata
 from itertools import repeat
-from typing import Iterable, List, TypeVar, Union
+from typing import Dict, Iterable, List, Optional, TypeVar, Union
+
+from bs4 import Tag
+
+from figure_parser import regex as re
 
 T = TypeVar("T")
 
@@ -57,3 +60,26 @@ def size_parse(text: str) -> Union[int, None]:
     #     return int(float(size) * 10)
 
     # return int(float(size))
+
+
+def index_description_list(root: Tag) -> Dict[str, Tag]:
+    """
+    Pair each `dt` under `root` with its following `dd` sibling.
+
+    The key is the stripped text of `dt`, the first pair wins if the key is duplicated.
+    A `dt` without `dd` right after it is ignored,
+    so stray `dd` elements can't shift the pairs.
+    """
+    index: Dict[str, Tag] = {}
+    for dt in root.find_all("dt"):
+        dd = _next_sibling_tag(dt)
+        if dd is not None and dd.name == "dd":
+            index.setdefault(dt.text.strip(), dd)
+    return index
+
+
+def _next_sibling_tag(tag: Tag) -> Optional[Tag]:
+    sibling = tag.next_sibling
+    while sibling is not None and not isinstance(sibling, Tag):
+        sibling = sibling.next_sibling
+    return sibling
@@ -1,27 +1,14 @@
-import re
 import unicodedata
 from typing import Any, Callable, TypeVar, overload
 
+from figure_parser import regex as re
 from figure_parser.core.models import ProductBase
+from figure_parser.core.pipeline import FieldPipe, map_field_value
 
 T = TypeVar("T")
 NormalizeFunc = Callable[[T], T]
 
 
-def normalize_general_fields(product_item: ProductBase) -> ProductBase:
-    for field in product_item.general_str_fields():
-        processed_value = _normalize(getattr(product_item, field), general_normalize)
-        setattr(product_item, field, processed_value)
-    return product_item
-
-
-def normalize_worker_fields(product_item: ProductBase) -> ProductBase:
-    for field in product_item.worker_fields():
-        processed_value = _normalize(getattr(product_item, field), worker_normalize)
-        setattr(product_item, field, processed_value)
-    return product_item
-
-
 @overload
 def _normalize(value: str, normalize_func: NormalizeFunc) -> str:
     ...
@@ -33,12 +20,7 @@ def _normalize(value: list[str], normalize_func: NormalizeFunc) -> list[str]:
 
 
 def _normalize(value: Any, normalize_func: NormalizeFunc[Any]) -> Any:
-    if isinstance(value, str):
-        return normalize_func(value)
-    if isinstance(value, list):
-        if all(type(v) is str for v in value):
-            return [normalize_func(v) for v in value]
-    return value
+    return map_field_value(value, normalize_func)
 
 
 def general_normalize(value: str) -> str:
@@ -60,3 +42,15 @@ def worker_normalize(value: str) -> str:
     value = re.sub(r"(?<![\s])\(", " (", value, 0)
 
     return value.strip()
+
+
+normalize_general_fields = FieldPipe(
+    general_normalize,
+    ProductBase.general_str_fields(),
+    name="normalize_general_fields",
+)
+normalize_worker_fields = FieldPipe(
+    worker_normalize,
+    ProductBase.worker_fields(),
+    name="normalize_worker_fields",
+)
@@ -2,6 +2,7 @@ from datetime import date
 from typing import TypeVar
 
 from figure_parser.core.models import ProductBase, Release
+from figure_parser.core.pipeline import declare_fields
 
 Release_T = TypeVar("Release_T", bound=Release)
 
@@ -10,6 +11,7 @@ def _sort_release(release: Release):
     return release.release_date or date.fromtimestamp(0)
 
 
+@declare_fields(reads=["releases"], writes=["releases"])
 def sort_releases(product_item: ProductBase) -> ProductBase:
     product_item.releases.sort(key=_sort_release)
     return product_item
@@ -0,0 +1,350 @@
+"""
+Profile the parsing of pages.
+
+The pages are parsed under a deterministic profiler (:func:`sys.setprofile`),
+the time is aggregated by site, `parse_*` field, pipe,
+and the call sites of CSS selectors / regular expressions.
+
+.. code-block:: python
+
+    report = profile_pages(pages)
+    print(report.format_top(20))
+    with open("parse.folded", "w") as stream:
+        report.write_collapsed(stream)  # for flamegraph.pl or speedscope
+
+The Python heap of parsing a page is measured by :func:`measure_heap`.
+"""
+import gc
+import re
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from types import CodeType, FrameType
+from typing import Any, Callable, Iterable, List, Optional, Set, TextIO, Tuple, Union
+
+from .core.factory_base import GenericProductFactory
+from .core.parser_base import AbstractProductParser
+
+SELECTOR_METHODS = frozenset(
+    {
+        "select",
+        "select_one",
+        "find",
+        "find_all",
+        "find_next",
+        "find_next_sibling",
+        "find_next_siblings",
+        "find_parent",
+        "find_parents",
+        "find_previous_sibling",
+        "find_previous_siblings",
+    }
+)
+"""The query methods of `bs4.Tag` which are reported by call site."""
+
+_BS4_MODULES = ("bs4", "soupsieve")
+_INTERNAL_MODULES = _BS4_MODULES + ("re.",)
+_REGEX_WRAPPER_MODULE = "figure_parser.regex"
+"""The metered regex calls are reported at the call sites of the wrapper."""
+_NS_PER_US = 1_000
+_NS_PER_MS = 1_000_000
+
+
+@dataclass
+class ProfileReport:
+    """
+    The aggregated time in nanoseconds.
+
+    The time of fields, pipes and call sites is inclusive,
+    the collapsed stacks carry the self time of each stack.
+    """
+
+    pages: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+    sites: Counter = field(default_factory=Counter)
+    fields: Counter = field(default_factory=Counter)
+    pipes: Counter = field(default_factory=Counter)
+    call_sites: Counter = field(default_factory=Counter)
+    call_counts: Counter = field(default_factory=Counter)
+    stacks: Counter = field(default_factory=Counter)
+
+    def write_collapsed(self, stream: TextIO):
+        """Write the stacks in collapsed format, the weights are in microseconds."""
+        for stack, ns in sorted(self.stacks.items()):
+            weight = ns // _NS_PER_US
+            if weight:
+                stream.write(f"{stack} {weight}\n")
+
+    def format_top(self, n: int = 20) -> str:
+        """Format the top-N tables of sites, fields, pipes and call sites."""
+        tables = [
+            _format_table(
+                ("site", "pages", "failed", "total ms", "ms/page"),
+                [
+                    (
+                        site,
+                        self.pages[site],
+                        self.errors[site],
+                        f"{ns / _NS_PER_MS:.2f}",
+                        f"{ns / _NS_PER_MS / self.pages[site]:.2f}",
+                    )
+                    for site, ns in self.sites.most_common()
+                ],
+            ),
+            _format_table(
+                ("field", "total ms"),
+                [
+                    (f"{site}.{name}", f"{ns / _NS_PER_MS:.2f}")
+                    for (site, name), ns in self.fields.most_common(n)
+                ],
+            ),
+            _format_table(
+                ("pipe", "total ms"),
+                [
+                    (name, f"{ns / _NS_PER_MS:.2f}")
+                    for name, ns in self.pipes.most_common(n)
+                ],
+            ),
+            _format_table(
+                ("call site", "calls", "total ms"),
+                [
+                    (call_site, self.call_counts[call_site], f"{ns / _NS_PER_MS:.2f}")
+                    for call_site, ns in self.call_sites.most_common(n)
+                ],
+            ),
+        ]
+        return "\n\n".join(tables)
+
+
+def _format_table(header: Tuple[str, ...], rows: List[Tuple[Any, ...]]) -> str:
+    """The first column is left-aligned, the others are right-aligned."""
+    cells = [header] + [tuple(str(cell) for cell in row) for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(header))]
+    return "\n".join(
+        "  ".join(
+            cell.ljust(width) if i == 0 else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(row, widths))
+        )
+        for row in cells
+    )
+
+
+_Buckets = Tuple[Tuple[Counter, Any], ...]
+"""The counters and keys which the inclusive time of a call is added to."""
+
+
+class _Entry:
+    __slots__ = ("label", "start", "child", "buckets", "is_field")
+
+    def __init__(self, label: str, start: int, buckets: _Buckets, is_field: bool):
+        self.label = label
+        self.start = start
+        self.child = 0
+        self.buckets = buckets
+        self.is_field = is_field
+
+
+class _Profiler:
+    def __init__(self, report: ProfileReport, pipe_codes: Set[CodeType]):
+        self.report = report
+        self.pipe_codes = pipe_codes
+        self.site = ""
+        self.field: Optional[str] = None
+        self.stack: List[_Entry] = []
+
+    def run(self, site: str, func):
+        self.site = site
+        self.field = None
+        self.stack = []
+        start = time.perf_counter_ns()
+        sys.setprofile(self._callback)
+        try:
+            return func()
+        finally:
+            sys.setprofile(None)
+            self.report.sites[site] += time.perf_counter_ns() - start
+
+    def _callback(self, frame: FrameType, event: str, arg: Any):
+        now = time.perf_counter_ns()
+        if event == "call":
+            is_field = self._is_field(frame)
+            if is_field:
+                self.field = frame.f_code.co_name
+                buckets: _Buckets = ((self.report.fields, (self.site, self.field)),)
+            else:
+                buckets = self._frame_buckets(frame)
+            self.stack.append(_Entry(_frame_label(frame), now, buckets, is_field))
+        elif event == "c_call":
+            buckets = self._c_buckets(frame, arg)
+            self.stack.append(_Entry(_c_label(arg), now, buckets, False))
+        elif self.stack:
+            # return, c_return, c_exception
+            self._pop(now)
+
+    def _pop(self, now: int):
+        entry = self.stack.pop()
+        elapsed = now - entry.start
+        labels = ";".join(e.label for e in self.stack)
+        stack = (
+            f"{self.site};{labels};{entry.label}"
+            if labels
+            else f"{self.site};{entry.label}"
+        )
+        self.report.stacks[stack] += elapsed - entry.child
+        for counter, key in entry.buckets:
+            counter[key] += elapsed
+        if entry.is_field:
+            self.field = None
+        if self.stack:
+            self.stack[-1].child += elapsed
+
+    def _is_field(self, frame: FrameType) -> bool:
+        """The outermost `parse_*` call of the parser is the field."""
+        return (
+            self.field is None
+            and frame.f_code.co_name.startswith("parse_")
+            and isinstance(frame.f_locals.get("self"), AbstractProductParser)
+        )
+
+    def _frame_buckets(self, frame: FrameType) -> _Buckets:
+        code = frame.f_code
+        name = code.co_name
+        module = frame.f_globals.get("__name__", "")
+        if code in self.pipe_codes:
+            return ((self.report.pipes, _pipe_name(frame)),)
+        if module == "re" or (
+            name in SELECTOR_METHODS and module.startswith(_BS4_MODULES)
+        ):
+            return self._call_site_buckets(frame.f_back, f"{module}.{name}")
+        return ()
+
+    def _c_buckets(self, frame: FrameType, func: Any) -> _Buckets:
+        if isinstance(getattr(func, "__self__", None), re.Pattern):
+            return self._call_site_buckets(frame, f"re.Pattern.{func.__name__}")
+        return ()
+
+    def _call_site_buckets(self, caller: Optional[FrameType], name: str) -> _Buckets:
+        while (
+            caller is not None
+            and caller.f_globals.get("__name__") == _REGEX_WRAPPER_MODULE
+        ):
+            caller = caller.f_back
+        if caller is None:
+            return ()
+        caller_module = caller.f_globals.get("__name__", "")
+        if caller_module == "re" or caller_module.startswith(_INTERNAL_MODULES):
+            # Inner calls of re and bs4 are counted in the outermost call.
+            return ()
+        call_site = (
+            f"{name} @ {_short_path(caller.f_code.co_filename)}:{caller.f_lineno}"
+        )
+        self.report.call_counts[call_site] += 1
+        return ((self.report.call_sites, call_site),)
+
+
+def profile_pages(
+    pages: Iterable[Tuple[str, Union[str, bytes]]],
+    factory: Optional[GenericProductFactory] = None,
+    prune: bool = True,
+) -> ProfileReport:
+    """
+    Parse the pages of `(url, html)` under the profiler.
+
+    :param factory: `GeneralBs4ProductFactory` is used by default.
+    """
+    if factory is None:
+        from .factories import GeneralBs4ProductFactory
+
+        factory = GeneralBs4ProductFactory.create_factory()
+
+    report = ProfileReport()
+    profiler = _Profiler(
+        report,
+        pipe_codes={
+            code for code in map(_pipe_code, factory.pipe_stages) if code is not None
+        },
+    )
+    for url, html in pages:
+        parser_cls = factory.get_parser_by_url(url)
+        site = parser_cls.__name__ if parser_cls else "<unregistered>"
+        report.pages[site] += 1
+        try:
+            profiler.run(
+                site, lambda: factory.create_product_from_html(url, html, prune=prune)
+            )
+        except Exception:
+            report.errors[site] += 1
+    return report
+
+
+@dataclass
+class HeapUsage:
+    peak: int
+    """The peak of heap allocated during the call in bytes."""
+    retained: int
+    """The heap still allocated after the call in bytes."""
+
+    def __str__(self) -> str:
+        return f"peak {self.peak / 2**20:8.3f} MB  retained {self.retained / 2**10:8.1f} KB"
+
+
+def measure_heap(func: Callable[[], Any]) -> HeapUsage:
+    """
+    Trace the Python heap of calling `func`, the buffers of lxml aren't traced.
+    Call it once before to leave out the caches which are filled by the first call.
+    """
+    gc.collect()
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        func()
+        gc.collect()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started:
+            tracemalloc.stop()
+    return HeapUsage(peak=peak - before, retained=max(after - before, 0))
+
+
+def _frame_label(frame: FrameType) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{_qualname(frame.f_code)}"
+
+
+def _pipe_code(pipe: Any) -> Optional[CodeType]:
+    if hasattr(pipe, "__code__"):
+        return pipe.__code__
+    # Callable objects, e.g. `FieldPipe`.
+    return getattr(type(pipe).__call__, "__code__", None)
+
+
+def _pipe_name(frame: FrameType) -> str:
+    name = getattr(frame.f_locals.get("self"), "__qualname__", None)
+    if frame.f_code.co_name == "__call__" and isinstance(name, str):
+        return name
+    return _qualname(frame.f_code)
+
+
+def _qualname(code: CodeType) -> str:
+    # co_qualname is available since python 3.11.
+    return getattr(code, "co_qualname", code.co_name)
+
+
+def _c_label(func: Any) -> str:
+    module = getattr(func, "__module__", None)
+    if module is None:
+        owner = getattr(func, "__self__", None)
+        module = type(owner).__module__ if owner is not None else "builtins"
+    return f"{module}:{getattr(func, '__qualname__', repr(func))}"
+
+
+def _short_path(filename: str) -> str:
+    for marker in ("/figure_parser/", "/site-packages/"):
+        index = filename.rfind(marker)
+        if index != -1:
+            return filename[index + 1 :]
+    return filename
@@ -0,0 +1,176 @@
+"""
+Regular expressions metered by the per-page budget.
+
+The module is a drop-in subset of :mod:`re` for parsers and pipes
+(`from figure_parser import regex as re`).
+Without an active budget the calls are passed to :mod:`re` directly.
+
+.. code-block:: python
+
+    with regex_budget(0.5):
+        product = factory.create_product(url, source)
+
+Inside :func:`regex_budget` the time of regex calls is accumulated,
+:class:`RegexBudgetExceeded` is raised once the budget is spent.
+In the main thread of POSIX the running call is interrupted by a timer as well,
+so a single catastrophic backtracking can't stall the process.
+The timer is shared with the hard time budget,
+see :func:`figure_parser.core.budget.interrupt_after`.
+Elsewhere the overrun is detected when the call returns.
+
+Patterns used through compiled objects' methods (e.g. by bs4 `string=` filters)
+are not metered.
+"""
+import re as _re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from re import (  # noqa: F401
+    ASCII,
+    DOTALL,
+    IGNORECASE,
+    MULTILINE,
+    UNICODE,
+    VERBOSE,
+    A,
+    I,
+    M,
+    Match,
+    Pattern,
+    S,
+    U,
+    X,
+    error,
+    escape,
+)
+from typing import Any, Callable, Iterator, List, Optional, Tuple, TypeVar, Union
+
+from .core.budget import interrupt_after
+from .core.exceptions import RegexBudgetExceeded
+
+T = TypeVar("T")
+Pattern_T = Union[str, Pattern[str]]
+
+_current_budget: ContextVar[Optional["RegexBudget"]] = ContextVar(
+    "regex_budget", default=None
+)
+
+
+class RegexBudget:
+    """
+    The regex time budget of a page in seconds,
+    it's shared by the threads of fields (see `field_workers` of factory).
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.spent = 0.0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> float:
+        return self.seconds - self.spent
+
+    def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        remaining = self.remaining
+        if remaining <= 0:
+            raise self._exceeded()
+
+        start = time.perf_counter()
+        try:
+            with interrupt_after(remaining, self._exceeded):
+                return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.spent += elapsed
+                self.calls += 1
+
+    def _exceeded(self) -> RegexBudgetExceeded:
+        return RegexBudgetExceeded(
+            f"The regex budget ({self.seconds}s) is exceeded "
+            f"after {self.calls + 1} calls.",
+            limit=self.seconds,
+            used=self.spent,
+        )
+
+
+@contextmanager
+def regex_budget(seconds: Optional[float]) -> Iterator[Optional[RegexBudget]]:
+    """Meter the regex calls in the context, `None` disables the budget."""
+    if seconds is None:
+        yield None
+        return
+
+    budget = RegexBudget(seconds)
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+
+def get_budget() -> Optional[RegexBudget]:
+    return _current_budget.get()
+
+
+def _call(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    budget = _current_budget.get()
+    if budget is None:
+        return func(*args, **kwargs)
+    return budget.run(func, *args, **kwargs)
+
+
+def compile(pattern: Pattern_T, flags: int = 0) -> Pattern[str]:
+    return _call(_re.compile, pattern, flags)
+
+
+def search(pattern: Pattern_T, string: str, flags: int = 0) -> Optional[Match[str]]:
+    return _call(_re.search, pattern, string, flags)
+
+
+def match(pattern: Pattern_T, string: str, flags: int = 0) -> Optional[Match[str]]:
+    return _call(_re.match, pattern, string, flags)
+
+
+def fullmatch(pattern: Pattern_T, string: str, flags: int = 0) -> Optional[Match[str]]:
+    return _call(_re.fullmatch, pattern, string, flags)
+
+
+def sub(
+    pattern: Pattern_T,
+    repl: Union[str, Callable[[Match[str]], str]],
+    string: str,
+    count: int = 0,
+    flags: int = 0,
+) -> str:
+    return _call(_re.sub, pattern, repl, string, count, flags)
+
+
+def subn(
+    pattern: Pattern_T,
+    repl: Union[str, Callable[[Match[str]], str]],
+    string: str,
+    count: int = 0,
+    flags: int = 0,
+) -> Tuple[str, int]:
+    return _call(_re.subn, pattern, repl, string, count, flags)
+
+
+def split(
+    pattern: Pattern_T, string: str, maxsplit: int = 0, flags: int = 0
+) -> List[Any]:
+    return _call(_re.split, pattern, string, maxsplit, flags)
+
+
+def findall(pattern: Pattern_T, string: str, flags: int = 0) -> List[Any]:
+    return _call(_re.findall, pattern, string, flags)
+
+
+def finditer(pattern: Pattern_T, string: str, flags: int = 0) -> Iterator[Match[str]]:
+    """The matches are collected eagerly when a budget is active."""
+    if _current_budget.get() is None:
+        return _re.finditer(pattern, string, flags)
+    return iter(_call(lambda: list(_re.finditer(pattern, string, flags))))
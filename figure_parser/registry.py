@@ -0,0 +1,73 @@
+import sys
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Optional, Tuple, Union
+
+from .parsers.site_data import load_site_data
+
+ENTRY_POINT_GROUP = "figure_parser.parsers"
+"""
+The entry point group of third-party parsers.
+The name of entry point is the domain and the value is the parser path, e.g.
+
+.. code-block:: toml
+
+    [tool.poetry.plugins."figure_parser.parsers"]
+    "example.com" = "my_package.parsers:ExampleProductParser"
+"""
+
+BUILTIN_MANIFEST_PATH = Path(__file__).parent.joinpath("parsers", "manifest.yml")
+
+
+def load_parser_manifest(path: Union[str, Path]) -> Dict[str, str]:
+    """
+    Load the manifest which maps the domain to the import path of parser.
+    The parser modules are not imported.
+    """
+    manifest = load_site_data(Path(path))
+    return {str(domain): str(parser) for domain, parser in manifest.items()}
+
+
+def discover_entry_point_parsers(group: str = ENTRY_POINT_GROUP) -> Dict[str, str]:
+    """
+    Collect the parsers declared by installed packages.
+    The parser modules are not imported.
+    """
+    return {ep.name: ep.value for ep in _entry_points(group)}
+
+
+def collect_parser_registrations(
+    manifests: Iterable[Union[str, Path]] = (BUILTIN_MANIFEST_PATH,),
+    entry_point_group: Union[str, None] = ENTRY_POINT_GROUP,
+) -> Dict[str, str]:
+    """
+    Collect the parsers of manifests and entry points.
+    The result is cached per manifests and group, so the installed packages are
+    scanned once per process, see :func:`clear_registration_cache`.
+    """
+    manifest_paths = tuple(str(Path(manifest)) for manifest in manifests)
+    return dict(_collect_parser_registrations(manifest_paths, entry_point_group))
+
+
+def clear_registration_cache():
+    """Discover the parsers again, e.g. after installing a package of parsers."""
+    _collect_parser_registrations.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def _collect_parser_registrations(
+    manifests: Tuple[str, ...], entry_point_group: Optional[str]
+) -> Mapping[str, str]:
+    registrations: Dict[str, str] = {}
+    for manifest in manifests:
+        registrations.update(load_parser_manifest(manifest))
+    if entry_point_group:
+        registrations.update(discover_entry_point_parsers(entry_point_group))
+    return registrations
+
+
+def _entry_points(group: str) -> Iterable[metadata.EntryPoint]:
+    if sys.version_info >= (3, 10):
+        return metadata.entry_points(group=group)
+    return metadata.entry_points().get(group, ())  # pragma: no cover
@@ -0,0 +1,160 @@
+"""
+Writers of batch results.
+
+Each result is written as a record of `url`, `error`, `error_info` and the fields
+of product (the fields are empty if the page failed).
+`error_info` is a JSON string in Parquet output.
+Parquet output requires `pyarrow`.
+"""
+import json
+import sys
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO, Union
+
+from pydantic.json import pydantic_encoder
+
+from .batch import BatchResult
+
+SINK_FORMATS = ("jsonl", "parquet")
+
+
+class ResultSink(ABC):
+    @abstractmethod
+    def write(self, result: BatchResult):
+        ...
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JsonLinesSink(ResultSink):
+    def __init__(self, stream: TextIO, close_stream: bool = False):
+        self._stream = stream
+        self._close_stream = close_stream
+
+    def write(self, result: BatchResult):
+        self._stream.write(
+            json.dumps(to_record(result), ensure_ascii=False, default=pydantic_encoder)
+        )
+        self._stream.write("\n")
+
+    def close(self):
+        if self._close_stream:
+            self._stream.close()
+        else:
+            self._stream.flush()
+
+
+class ParquetSink(ResultSink):
+    """Write the results in row groups of `row_group_size`."""
+
+    def __init__(self, path: Union[str, Path], row_group_size: int = 1024):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:  # pragma: no cover
+            raise ImportError("Parquet output requires `pyarrow`.") from e
+
+        self._schema = parquet_schema()
+        self._writer = pq.ParquetWriter(str(path), self._schema)
+        self._row_group_size = row_group_size
+        self._rows: List[Dict[str, Any]] = []
+
+    def write(self, result: BatchResult):
+        record = to_record(result)
+        if "error_info" in record:
+            record["error_info"] = json.dumps(record["error_info"], ensure_ascii=False)
+        self._rows.append(record)
+        if len(self._rows) >= self._row_group_size:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        import pyarrow as pa
+
+        self._writer.write_table(pa.Table.from_pylist(self._rows, schema=self._schema))
+        self._rows = []
+
+
+def to_record(result: BatchResult) -> Dict[str, Any]:
+    record: Dict[str, Any] = {"url": result.url, "error": result.error}
+    if result.error_info:
+        record["error_info"] = result.error_info
+    if result.product is not None:
+        product = result.product.dict()
+        product.pop("url")
+        record.update(product)
+    return record
+
+
+def parquet_schema():
+    import pyarrow as pa
+
+    release = pa.struct(
+        [
+            ("release_date", pa.date32()),
+            ("price", pa.int64()),
+            ("tax_including", pa.bool_()),
+            ("announced_at", pa.date32()),
+        ]
+    )
+    order_period = pa.struct(
+        [("start", pa.timestamp("us")), ("end", pa.timestamp("us"))]
+    )
+    return pa.schema(
+        [
+            ("url", pa.string()),
+            ("error", pa.string()),
+            ("error_info", pa.string()),
+            ("name", pa.string()),
+            ("manufacturer", pa.string()),
+            ("category", pa.string()),
+            ("rerelease", pa.bool_()),
+            ("adult", pa.bool_()),
+            ("images", pa.list_(pa.string())),
+            ("sculptors", pa.list_(pa.string())),
+            ("paintworks", pa.list_(pa.string())),
+            ("releases", pa.list_(release)),
+            ("size", pa.int64()),
+            ("scale", pa.int64()),
+            ("series", pa.string()),
+            ("copyright", pa.string()),
+            ("releaser", pa.string()),
+            ("distributer", pa.string()),
+            ("jan", pa.string()),
+            ("thumbnail", pa.string()),
+            ("og_image", pa.string()),
+            ("order_period", order_period),
+        ]
+    )
+
+
+def open_sink(output: Union[str, Path], format: Optional[str] = None) -> ResultSink:
+    """
+    Open the sink for `output` (`-` for stdout),
+    the format is inferred from the suffix if it's not given.
+    """
+    output = str(output)
+    if format is None:
+        format = "parquet" if output.endswith(".parquet") else "jsonl"
+    if format not in SINK_FORMATS:
+        raise ValueError(f"format should be one of {SINK_FORMATS}, got {format!r}.")
+
+    if format == "parquet":
+        if output == "-":
+            raise ValueError("Parquet output can't be written to stdout.")
+        return ParquetSink(output)
+    if output == "-":
+        return JsonLinesSink(sys.stdout)
+    return JsonLinesSink(open(output, "w", encoding="utf-8"), close_stream=True)
@@ -0,0 +1,135 @@
+"""
+The spool file of pages.
+
+The spool is a length-prefixed record file::
+
+    MAGIC
+    record: <url length: uint32 LE> <body length: uint64 LE> <url (utf-8)> <body>
+    record: ...
+
+Pages are written once and read in place through `mmap`,
+a record is addressed by :class:`PageRef` (the offset and length of the body).
+"""
+import mmap
+import struct
+from pathlib import Path
+from typing import BinaryIO, List, NamedTuple, Optional, Union
+
+SPOOL_MAGIC = b"FPSPOOL1"
+RECORD_HEADER = struct.Struct("<IQ")
+
+
+class PageRef(NamedTuple):
+    """The descriptor of page body in a spool file."""
+
+    path: str
+    offset: int
+    length: int
+    url: str
+    encoding: Optional[str] = None
+
+
+class SpoolWriter:
+    """
+    Append pages to a spool file.
+
+    .. code-block:: python
+
+        with SpoolWriter("pages.spool") as writer:
+            ref = writer.write(url, body)
+    """
+
+    _file: BinaryIO
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = str(path)
+        self._file = open(self.path, "wb")
+        self._file.write(SPOOL_MAGIC)
+        self._offset = len(SPOOL_MAGIC)
+
+    def write(
+        self, url: str, body: Union[bytes, str], encoding: Optional[str] = None
+    ) -> PageRef:
+        """
+        Append the page and return the reference of its body.
+        `str` body is encoded in `encoding` (utf-8 by default).
+        """
+        if isinstance(body, str):
+            encoding = encoding or "utf-8"
+            body = body.encode(encoding)
+        url_bytes = url.encode("utf-8")
+
+        self._file.write(RECORD_HEADER.pack(len(url_bytes), len(body)))
+        self._file.write(url_bytes)
+        self._file.write(body)
+
+        body_offset = self._offset + RECORD_HEADER.size + len(url_bytes)
+        self._offset = body_offset + len(body)
+        return PageRef(
+            path=self.path,
+            offset=body_offset,
+            length=len(body),
+            url=url,
+            encoding=encoding,
+        )
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def map_file(path: Union[str, Path]) -> mmap.mmap:
+    """Map the file read-only."""
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def map_spool(path: Union[str, Path]) -> mmap.mmap:
+    """Map the spool file read-only."""
+    mapped = map_file(path)
+    if mapped[: len(SPOOL_MAGIC)] != SPOOL_MAGIC:
+        mapped.close()
+        raise ValueError(f"{path} is not a spool file.")
+    return mapped
+
+
+def read_page(mapped: mmap.mmap, ref: PageRef) -> Union[str, bytes]:
+    """
+    Read the page body of `ref`.
+
+    If the encoding is known, the body is decoded from the mapped memory directly.
+    Otherwise the raw bytes are returned to let the parser detect the encoding.
+    """
+    with memoryview(mapped)[ref.offset : ref.offset + ref.length] as view:
+        if ref.encoding:
+            return str(view, ref.encoding)
+        return view.tobytes()
+
+
+def index_spool(mapped: mmap.mmap, path: Union[str, Path]) -> List[PageRef]:
+    """
+    Scan the record headers of a mapped spool and return the references of bodies.
+    Bodies are neither read nor copied, the encoding of records is unknown.
+    """
+    refs = []
+    offset = len(SPOOL_MAGIC)
+    size = len(mapped)
+    while offset < size:
+        if offset + RECORD_HEADER.size > size:
+            raise ValueError(f"Truncated record header at {offset} in {path}.")
+        url_length, body_length = RECORD_HEADER.unpack_from(mapped, offset)
+        url_offset = offset + RECORD_HEADER.size
+        body_offset = url_offset + url_length
+        if body_offset + body_length > size:
+            raise ValueError(f"Truncated record at {offset} in {path}.")
+        url = mapped[url_offset:body_offset].decode("utf-8")
+        refs.append(
+            PageRef(path=str(path), offset=body_offset, length=body_length, url=url)
+        )
+        offset = body_offset + body_length
+    return refs
@@ -0,0 +1,267 @@
+"""
+Content-addressed store of raw pages for offline parsing.
+
+The raw bytes of pages are compressed into `objects/` by their sha256, so the
+same content is stored once, and the fetch metadata is appended to
+`index.jsonl` (the latest entry of an url wins)::
+
+    store/
+        index.jsonl
+        objects/3f/3f2a...e1.gz
+
+Objects are written to temporary files and renamed into place, and index
+entries are appended by single writes, so concurrent writers (e.g. xdist
+workers) don't corrupt the store.
+
+.. code-block:: python
+
+    store = PageStore("pages")
+    page = store.fetch(url, cookies={"age_verification_ok": "true"})
+    soup = BeautifulSoup(store.read(page), "lxml")
+
+Set `FIGURE_PARSER_OFFLINE=1` to fail on missing pages instead of fetching them.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import urllib.request
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, Mapping, Optional, Tuple, Union
+
+INDEX_FILE = "index.jsonl"
+OBJECTS_DIR = "objects"
+OFFLINE_ENV = "FIGURE_PARSER_OFFLINE"
+CODECS = ("gzip", "zstd")
+_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+_CHARSET_PATTERN = re.compile(r"charset=[\"']?([\w\-]+)", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class StoredPage:
+    url: str
+    digest: str
+    """The sha256 of raw content."""
+    codec: str
+    size: int
+    fetched_at: str
+    status: Optional[int] = None
+    final_url: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def encoding(self) -> Optional[str]:
+        """The charset declared by `Content-Type`."""
+        for key, value in self.headers.items():
+            if key.lower() == "content-type":
+                matched = _CHARSET_PATTERN.search(value)
+                return matched.group(1) if matched else None
+        return None
+
+
+class PageStore:
+    """
+    :param codec: The compression of new objects, `gzip` or `zstd`
+        (requires `zstandard`).
+    """
+
+    def __init__(self, root: Union[str, Path], codec: str = "gzip"):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec {codec!r}, expected one of {CODECS}.")
+        self.root = Path(root)
+        self.codec = codec
+        self._index: Dict[str, StoredPage] = {}
+        self._index_size = 0
+
+    @property
+    def index_path(self) -> Path:
+        return self.root.joinpath(INDEX_FILE)
+
+    def __contains__(self, url: str) -> bool:
+        return self.get(url) is not None
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[StoredPage]:
+        self.refresh()
+        return iter(list(self._index.values()))
+
+    def get(self, url: str) -> Optional[StoredPage]:
+        page = self._index.get(url)
+        if page is None:
+            # The page might be stored by other processes.
+            self.refresh()
+            page = self._index.get(url)
+        return page
+
+    def read(self, page: Union[str, StoredPage]) -> bytes:
+        """Read the raw content of page or url."""
+        if isinstance(page, str):
+            stored = self.get(page)
+            if stored is None:
+                raise KeyError(f"{page} isn't stored in {self.root}.")
+            page = stored
+        with open(self._object_path(page.digest, page.codec), "rb") as f:
+            return _decompress(f.read(), page.codec)
+
+    def put(
+        self,
+        url: str,
+        content: bytes,
+        *,
+        status: Optional[int] = None,
+        final_url: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        fetched_at: Optional[datetime] = None,
+    ) -> StoredPage:
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object_path(digest, self.codec)
+        if not path.exists():
+            write_atomic(path, _compress(content, self.codec))
+
+        page = StoredPage(
+            url=url,
+            digest=digest,
+            codec=self.codec,
+            size=len(content),
+            fetched_at=(fetched_at or datetime.now(timezone.utc)).isoformat(),
+            status=status,
+            final_url=final_url,
+            headers=dict(headers or {}),
+        )
+        self._append_index(page)
+        self._index[url] = page
+        return page
+
+    def fetch(
+        self,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+        cookies: Optional[Mapping[str, str]] = None,
+        offline: Optional[bool] = None,
+    ) -> StoredPage:
+        """
+        Get the stored page, the page is fetched and stored if it's missing.
+
+        :param offline: Raise `KeyError` instead of fetching,
+            `FIGURE_PARSER_OFFLINE` is respected by default.
+        """
+        page = self.get(url)
+        if page is not None:
+            return page
+
+        if offline is None:
+            offline = bool(os.environ.get(OFFLINE_ENV))
+        if offline:
+            raise KeyError(f"{url} isn't stored in {self.root}.")
+
+        request = urllib.request.Request(url=url, headers=dict(headers or {}))
+        if cookies:
+            request.add_header(
+                "Cookie", "; ".join(f"{k}={v}" for k, v in cookies.items())
+            )
+        with urllib.request.urlopen(request) as response:
+            content = response.read()
+            return self.put(
+                url,
+                content,
+                status=response.status,
+                final_url=response.url,
+                headers=dict(response.headers.items()),
+            )
+
+    def iter_pages(self) -> Iterator[Tuple[str, bytes]]:
+        """Stream `(url, content)` of the stored pages."""
+        for page in self:
+            yield page.url, self.read(page)
+
+    def refresh(self):
+        """Load the index entries appended since the last load."""
+        try:
+            with open(self.index_path, "rb") as f:
+                if os.fstat(f.fileno()).st_size < self._index_size:
+                    # The index is compacted by others.
+                    self._index, self._index_size = {}, 0
+                f.seek(self._index_size)
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        # A partially written line is read on the next refresh.
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                page = StoredPage(**json.loads(line))
+            except (ValueError, TypeError):
+                continue
+            self._index[page.url] = page
+        self._index_size += end
+
+    def compact(self):
+        """
+        Rewrite the index with the latest entry of each url.
+        Entries appended by others during the compaction could be lost.
+        """
+        self.refresh()
+        lines = b"".join(_index_line(page) for page in self._index.values())
+        write_atomic(self.index_path, lines)
+        self._index_size = len(lines)
+
+    def _append_index(self, page: StoredPage):
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, _index_line(page))
+        finally:
+            os.close(fd)
+
+    def _object_path(self, digest: str, codec: str) -> Path:
+        return self.root.joinpath(OBJECTS_DIR, digest[:2], digest + _SUFFIXES[codec])
+
+
+def is_page_store(path: Union[str, Path]) -> bool:
+    return Path(path).joinpath(INDEX_FILE).is_file()
+
+
+def _index_line(page: StoredPage) -> bytes:
+    return json.dumps(asdict(page), ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def write_atomic(path: Path, data: bytes):
+    """Write the file by renaming a temporary file into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return _zstandard().ZstdCompressor().compress(data)
+    # mtime is fixed to keep the objects reproducible.
+    return gzip.compress(data, mtime=0)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return _zstandard().ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:  # pragma: no cover
+        raise ImportError("The zstd codec requires `zstandard`.") from e
+    return zstandard
@@ -1,9 +1,23 @@
-% for site, parser in site_parsers:
-from .${site} import ${parser}
-% endfor
+from typing import TYPE_CHECKING
+
+from .._lazy import lazy_module
+
+if TYPE_CHECKING:  # pragma: no cover
+    % for site, parser in site_parsers:
+    from .${site} import ${parser}
+    % endfor
 
 __all__ = (
     % for _, parser in site_parsers:
     "${parser}",
     % endfor
 )
+
+# Site parser modules are imported on first access (PEP 562).
+_lazy_attributes = {
+    % for site, parser in site_parsers:
+    "${parser}": ".${site}",
+    % endfor
+}
+
+__getattr__, __dir__ = lazy_module(__name__, _lazy_attributes)
@@ -2,6 +2,7 @@ import pytest
 
 from .test_product_parser import (
     TEST_CASE_DIR,
+    BaseBudgetTestCase,
     BaseTestCase,
     ParserTestTarget,
     get_html,
@@ -27,3 +28,8 @@ class Test${name}Parser(BaseTestCase):
             ),
             expected=request.param,
         )
+
+
+class Test${name}Budget(BaseBudgetTestCase):
+    site = "${test_case_name}"
+    parser_cls = ${name}ProductParser
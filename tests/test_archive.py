@@ -0,0 +1,134 @@
+import pytest
+
+from figure_parser.archive import (
+    index_archive,
+    is_archive,
+    iter_archive,
+    iter_records,
+    shard_by_offset,
+)
+from figure_parser.spool import SpoolWriter
+
+
+def make_warc_record(url: str, http: bytes, warc_type: str = "response") -> bytes:
+    return (
+        b"WARC/1.0\r\n"
+        + f"WARC-Type: {warc_type}\r\n".encode()
+        + f"WARC-Target-URI: {url}\r\n".encode()
+        + b"Content-Type: application/http; msgtype=response\r\n"
+        + f"Content-Length: {len(http)}\r\n".encode()
+        + b"\r\n"
+        + http
+        + b"\r\n\r\n"
+    )
+
+
+def make_http_response(body: bytes, status: str = "200 OK", headers=()) -> bytes:
+    lines = [f"HTTP/1.1 {status}", *headers, f"Content-Length: {len(body)}"]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+
+@pytest.fixture
+def warc_path(tmp_path):
+    path = tmp_path / "crawl.warc"
+    path.write_bytes(
+        make_warc_record("https://foo.bar/1", b"GET / HTTP/1.1\r\n\r\n", "request")
+        + make_warc_record(
+            "https://foo.bar/1",
+            make_http_response(
+                "<h1>フィギュア</h1>".encode("shift_jis"),
+                headers=["Content-Type: text/html; charset=Shift_JIS"],
+            ),
+        )
+        + make_warc_record(
+            "https://foo.bar/2", make_http_response(b"", status="404 Not Found")
+        )
+        + make_warc_record(
+            "https://foo.bar/3",
+            make_http_response(b"gzipped", headers=["Content-Encoding: gzip"]),
+        )
+        + make_warc_record("https://foo.bar/4", make_http_response(b"<h1>4</h1>"))
+    )
+    return path
+
+
+def test_index_warc(warc_path):
+    refs = index_archive(warc_path)
+
+    assert [ref.url for ref in refs] == ["https://foo.bar/1", "https://foo.bar/4"]
+    assert refs[0].encoding == "Shift_JIS"
+    assert refs[1].encoding is None
+    assert list(iter_archive(warc_path)) == [
+        ("https://foo.bar/1", "<h1>フィギュア</h1>"),
+        ("https://foo.bar/4", b"<h1>4</h1>"),
+    ]
+
+
+def test_index_spool(tmp_path):
+    path = tmp_path / "pages.spool"
+    with SpoolWriter(path) as writer:
+        written = [
+            writer.write(f"https://foo.bar/{i}", f"<h1>{i}</h1>") for i in range(3)
+        ]
+
+    refs = index_archive(path)
+    assert [(ref.offset, ref.length, ref.url) for ref in refs] == [
+        (ref.offset, ref.length, ref.url) for ref in written
+    ]
+    assert dict(iter_archive(path))["https://foo.bar/2"] == b"<h1>2</h1>"
+
+
+def test_index_archive_rejects_other_files(tmp_path):
+    path = tmp_path / "page.html"
+    path.write_bytes(b"<html></html>")
+
+    with pytest.raises(ValueError):
+        index_archive(path)
+
+
+def test_index_truncated_spool(tmp_path):
+    path = tmp_path / "pages.spool"
+    with SpoolWriter(path) as writer:
+        writer.write("https://foo.bar/1", "<h1>1</h1>")
+    path.write_bytes(path.read_bytes()[:-3])
+
+    with pytest.raises(ValueError):
+        index_archive(path)
+
+
+def test_index_warc_without_content_length(tmp_path):
+    path = tmp_path / "crawl.warc"
+    path.write_bytes(
+        make_warc_record("https://foo.bar/1", make_http_response(b"<h1>1</h1>"))
+        + b"WARC/1.0\r\nWARC-Type: response\r\n\r\n"
+    )
+
+    with pytest.raises(ValueError, match="Content-Length"):
+        index_archive(path)
+
+
+def test_shard_by_offset(tmp_path):
+    path = tmp_path / "pages.spool"
+    with SpoolWriter(path) as writer:
+        refs = [writer.write(f"https://foo.bar/{i}", "page") for i in range(10)]
+
+    shards = shard_by_offset(list(reversed(refs)), 3)
+    assert [len(shard) for shard in shards] == [4, 4, 2]
+    assert [ref for shard in shards for ref in shard] == refs
+    assert shard_by_offset([], 3) == []
+
+
+def test_iter_records(tmp_path, warc_path):
+    (tmp_path / "pages.jsonl").write_text(
+        '{"url": "https://foo.bar/5", "html": "<h1>5</h1>"}\n\n', encoding="utf-8"
+    )
+
+    records = list(iter_records(tmp_path))
+    assert [url for url, _ in records] == [
+        "https://foo.bar/1",
+        "https://foo.bar/4",
+        "https://foo.bar/5",
+    ]
+    assert is_archive(warc_path)
+    assert not is_archive(tmp_path / "pages.jsonl")
+    assert not is_archive(tmp_path)
@@ -0,0 +1,108 @@
+from typing import Union
+
+import pytest
+from bs4 import BeautifulSoup
+
+from figure_parser import batch
+from figure_parser.batch import BatchResult, BatchRunner, BatchStats
+from figure_parser.core.factory_base import GenericProductFactory
+from figure_parser.exceptions import ProductTimeout, UnregisteredDomain
+from figure_parser.spool import SpoolWriter
+
+
+class MockHtmlFactory(GenericProductFactory[str]):
+    def create_product_from_html(
+        self, url: str, html: Union[str, bytes], prune: bool = True
+    ):
+        if "foo.bar" not in url:
+            raise UnregisteredDomain(url)
+        if url.endswith("/slow"):
+            raise ProductTimeout("Too slow.", url=url, step="parse_name", limit=1)
+        return BeautifulSoup(html, "lxml").h1.text  # type: ignore
+
+
+def build_mock_factory() -> MockHtmlFactory:
+    return MockHtmlFactory()
+
+
+def test_batch_runner(tmp_path):
+    pages = [(f"https://foo.bar/{i}", f"<h1>{i}</h1>") for i in range(10)]
+    pages.append(("https://bar.foo/1", "<h1>unknown</h1>"))
+
+    runner = BatchRunner(
+        build_mock_factory,
+        workers=2,
+        chunk_size=2,
+        spool_pages=4,
+        spool_dir=tmp_path,
+    )
+    results = list(runner.run(pages))
+
+    assert [r.url for r in results] == [url for url, _ in pages]
+    assert [r.product for r in results[:-1]] == [str(i) for i in range(10)]
+    assert results[-1].product is None
+    assert results[-1].error and results[-1].error.startswith("UnregisteredDomain")
+    # spool files are removed after parsing.
+    assert not list(tmp_path.iterdir())
+
+
+def test_batch_runner_archive(tmp_path):
+    path = tmp_path / "pages.spool"
+    with SpoolWriter(path) as writer:
+        for i in range(5):
+            writer.write(f"https://foo.bar/{i}", f"<h1>{i}</h1>")
+
+    for backend in ("process", "thread"):
+        runner = BatchRunner(
+            build_mock_factory, workers=2, chunk_size=2, backend=backend
+        )
+        results = list(runner.run_archive(path))
+
+        assert [r.product for r in results] == [str(i) for i in range(5)]
+
+
+@pytest.mark.parametrize("backend", ["thread", "async"])
+def test_batch_runner_in_process_backends(backend):
+    pages = [(f"https://foo.bar/{i}", f"<h1>{i}</h1>".encode()) for i in range(10)]
+    pages.append(("https://bar.foo/1", b"<h1>unknown</h1>"))
+
+    runner = BatchRunner(build_mock_factory, workers=2, chunk_size=2, backend=backend)
+    results = list(runner.run(pages, encoding="utf-8"))
+
+    assert [r.product for r in results[:-1]] == [str(i) for i in range(10)]
+    assert results[-1].error_type == "UnregisteredDomain"
+
+
+def test_batch_runner_budget_error():
+    runner = BatchRunner(build_mock_factory, backend="thread")
+    (result,) = runner.run([("https://foo.bar/slow", "<h1>slow</h1>")])
+
+    assert result.error_type == "ProductTimeout"
+    assert result.error_info and result.error_info["step"] == "parse_name"
+
+
+def test_batch_runner_invalid_backend():
+    with pytest.raises(ValueError):
+        BatchRunner(build_mock_factory, backend="gpu")
+
+
+def test_batch_stats():
+    stats = BatchStats()
+    stats.add(BatchResult(url="https://foo.bar/1", product="1"))  # type: ignore
+    stats.add(BatchResult(url="https://foo.bar/2", error="UnregisteredDomain: foo"))
+    stats.finish()
+
+    assert stats.total == 2
+    assert stats.failed == 1
+    assert stats.errors == {"UnregisteredDomain": 1}
+    assert "UnregisteredDomain: 1" in stats.summary()
+
+
+def test_worker_hard_budget(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(batch, "_factory", None)
+
+    batch._init_worker(build_mock_factory, True, None)
+    assert batch._factory and batch._factory.hard_budget is False
+
+    batch._init_worker(build_mock_factory, True, True)
+    assert batch._factory.hard_budget is True
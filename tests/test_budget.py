@@ -0,0 +1,82 @@
+import signal
+import time
+
+import pytest
+
+from figure_parser import regex
+from figure_parser.core.budget import BudgetMeter, enforce_budget, get_active_meter
+from figure_parser.exceptions import (
+    BudgetExceeded,
+    MemoryBudgetExceeded,
+    ProductTimeout,
+    RegexBudgetExceeded,
+)
+
+
+def test_budget_meter_check():
+    meter = BudgetMeter("https://foo.bar/114514", seconds=10)
+    meter.check("parse_name")
+    assert meter.step == "parse_name"
+
+    meter = BudgetMeter("https://foo.bar/114514", seconds=0)
+    with pytest.raises(ProductTimeout) as exc_info:
+        meter.check("parse_name")
+
+    error = exc_info.value
+    assert isinstance(error, BudgetExceeded)
+    assert error.url == "https://foo.bar/114514"
+    assert error.step == "start"
+    assert error.limit == 0
+    assert error.to_dict()["type"] == "ProductTimeout"
+
+
+def test_budget_meter_memory_check():
+    meter = BudgetMeter("https://foo.bar/114514", memory=0)
+    if meter._rss_at_start is None:
+        pytest.skip("The resident memory is unavailable.")
+
+    data = bytearray(64 * 2**20)
+    data[:: 2**12] = b"\x01" * len(data[:: 2**12])
+    # The memory is sampled at the stages only.
+    meter.check("parse_images", stage=False)
+    with pytest.raises(MemoryBudgetExceeded) as exc_info:
+        meter.check("sort_releases")
+    assert exc_info.value.step == "sort_releases"
+
+
+def test_enforce_budget_sets_active_meter():
+    meter = BudgetMeter("https://foo.bar/114514")
+    assert get_active_meter() is None
+    with enforce_budget(meter) as active:
+        assert active is meter
+        assert get_active_meter() is meter
+    assert get_active_meter() is None
+
+
+def test_enforce_budget_interrupts_step():
+    meter = BudgetMeter("https://foo.bar/114514", seconds=0.05)
+    meter.check("parse_name")
+
+    start = time.perf_counter()
+    with pytest.raises(ProductTimeout) as exc_info:
+        with enforce_budget(meter, hard=True):
+            while time.perf_counter() - start < 5:
+                pass
+    assert exc_info.value.step == "parse_name"
+    assert time.perf_counter() - start < 5
+
+
+def test_hard_budget_shares_timer_with_regex():
+    meter = BudgetMeter("https://foo.bar/114514", seconds=5)
+    with enforce_budget(meter, hard=True), regex.regex_budget(0.05):
+        with pytest.raises(RegexBudgetExceeded):
+            regex.match(r"(a+)+$", "a" * 64 + "!")
+        # The timer of product is restored.
+        assert 0 < signal.getitimer(signal.ITIMER_REAL)[0] < 5
+    assert signal.getitimer(signal.ITIMER_REAL)[0] == 0
+
+    meter = BudgetMeter("https://foo.bar/114514", seconds=0.05)
+    with pytest.raises(ProductTimeout):
+        with enforce_budget(meter, hard=True), regex.regex_budget(5):
+            regex.match(r"(a+)+$", "a" * 64 + "!")
+    assert signal.getitimer(signal.ITIMER_REAL)[0] == 0
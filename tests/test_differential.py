@@ -0,0 +1,54 @@
+from typing import Union
+
+import pytest
+
+from figure_parser.core.factory_base import GenericProductFactory
+from figure_parser.core.models import ProductBase
+from figure_parser.differential import FactoryConfig, resolve_config, run_differential
+from figure_parser.exceptions import UnregisteredDomain
+
+
+class MockProductFactory(GenericProductFactory[str]):
+    def __init__(self, product: ProductBase, name: str = ""):
+        super().__init__()
+        self.product = product
+        self.name = name
+
+    def create_product_from_html(
+        self, url: str, html: Union[str, bytes], prune: bool = True
+    ):
+        if "foo.bar" not in url:
+            raise UnregisteredDomain(url)
+        return self.product.copy(update={"url": url, "name": self.name or html})
+
+
+def test_run_differential(product: ProductBase):
+    pages = [(f"https://foo.bar/{i}", str(i)) for i in range(5)]
+    pages.append(("https://bar.foo/1", "unknown"))
+
+    same = run_differential(
+        pages,
+        FactoryConfig("a", lambda: MockProductFactory(product)),
+        FactoryConfig("b", lambda: MockProductFactory(product)),
+    )
+    assert same.checked == 6 and not same.divergences
+    assert same.baseline.failed == same.candidate.failed == 1
+    assert same.candidate.throughput > 0 and same.speedup > 0
+
+    report = run_differential(
+        pages[:2],
+        FactoryConfig("a", lambda: MockProductFactory(product)),
+        FactoryConfig("b", lambda: MockProductFactory(product, name="changed")),
+    )
+    assert [d.url for d in report.divergences] == [url for url, _ in pages[:2]]
+    assert report.divergences[0].fields == {"name": ("0", "changed")}
+    assert "DIVERGED" in report.format()
+
+
+def test_resolve_config():
+    assert resolve_config("whole").prune is False
+    assert resolve_config("pruned").prune is True
+    config = resolve_config("tests.test_differential:MockProductFactory")
+    assert config.factory_builder.__name__ == "MockProductFactory"
+    with pytest.raises(ValueError):
+        resolve_config("unknown")
@@ -1,17 +1,29 @@
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+from bs4 import BeautifulSoup
 from pytest_mock import MockerFixture
 
-from figure_parser import GeneralBs4ProductFactory
-from figure_parser.core.factory_base import GenericProductFactory
+from figure_parser import Bs4ProductFactory, GeneralBs4ProductFactory, regex
+from figure_parser.core.factory_base import PRODUCT_FIELD_PARSERS, GenericProductFactory
 from figure_parser.core.models import ProductBase
-from figure_parser.core.parser_base import AbstractProductParser
+from figure_parser.core.parser_base import AbstractProductParser, ParserVariants
 from figure_parser.exceptions import (
     DomainInvalid,
     DuplicatedDomainRegistration,
     FailedToCreateProduct,
     FailedToProcessProduct,
+    ParserInitializationFailed,
+    ProductTimeout,
+    RegexBudgetExceeded,
     UnregisteredDomain,
 )
+from figure_parser.parsers.base import AbstractBs4ProductParser, Bs4ParserVariants
+from figure_parser.parsers.regions import Region
+from figure_parser.parsers.source_cache import SourceCache
 
 
 class MockStrProductFactory(GenericProductFactory[str]):
@@ -26,6 +38,14 @@ class MockStrProductParser(AbstractProductParser[str]):
     pass
 
 
+class MockNewStrProductParser(MockStrProductParser):
+    pass
+
+
+class MockStrParserVariants(ParserVariants[str]):
+    variants = ((lambda source: source.startswith("new"), MockNewStrProductParser),)
+
+
 def test_factory_initialization(mocker: MockerFixture):
     MockStrProductFactory(
         parser_registrations={
@@ -95,6 +115,13 @@ def test_factory_get_parser_by_domain():
     assert factory.get_parser_by_domain("foo.bar") is MockStrProductParser
 
 
+def test_factory_build_source_not_implemented():
+    factory = MockStrProductFactory()
+
+    with pytest.raises(NotImplementedError, match="MockStrProductFactory"):
+        factory.build_source("<h1>1</h1>", MockStrProductParser)
+
+
 def test_factory_product_creation(mocker: MockerFixture, product: ProductBase):
     mocker.patch.object(MockStrProductParser, "__abstractmethods__", new_callable=set)
     factory = MockStrProductFactory()
@@ -111,6 +138,33 @@ def test_factory_product_creation(mocker: MockerFixture, product: ProductBase):
     assert type(p) is ProductBase
 
 
+def test_factory_parser_variants(mocker: MockerFixture, product: ProductBase):
+    mocker.patch.object(MockStrProductParser, "__abstractmethods__", new_callable=set)
+    mocker.patch.object(
+        MockNewStrProductParser, "__abstractmethods__", new_callable=set
+    )
+    factory = MockStrProductFactory()
+    mock_product_create = mocker.MagicMock(return_value=product)
+    factory._create_product_by_parser = mock_product_create  # type: ignore
+    factory.register_parser("foo.bar", MockStrParserVariants)
+
+    assert factory.get_parser_by_url("https://foo.bar/1") is MockStrParserVariants
+    factory.create_product(url="https://foo.bar/1", source="new page")
+    parser = mock_product_create.call_args.kwargs["parser"]
+    assert type(parser) is MockNewStrProductParser
+
+    with pytest.raises(ParserInitializationFailed):
+        factory.create_product(url="https://foo.bar/1", source="old page")
+
+    class FallbackVariants(MockStrParserVariants):
+        variants = (*MockStrParserVariants.variants, (None, MockStrProductParser))
+
+    factory.register_parser("bar.foo", FallbackVariants)
+    factory.create_product(url="https://bar.foo/1", source="old page")
+    parser = mock_product_create.call_args.kwargs["parser"]
+    assert type(parser) is MockStrProductParser
+
+
 def test_factory_product_creation_failed(mocker: MockerFixture, product: ProductBase):
     mocker.patch.object(MockStrProductParser, "__abstractmethods__", new_callable=set)
     factory = MockStrProductFactory()
@@ -138,6 +192,236 @@ def test_factory__failed_to_process_product_with_pipe(
         factory.create_product(url="https://foo.bar/114514", source="114514")
 
 
+def test_factory_regex_budget(mocker: MockerFixture, product: ProductBase):
+    mocker.patch.object(MockStrProductParser, "__abstractmethods__", new_callable=set)
+    factory = MockStrProductFactory(regex_budget=0)
+    factory.register_parser("foo.bar", MockStrProductParser)  # type: ignore
+    mocker.patch.object(
+        MockStrProductParser,
+        "parse_name",
+        create=True,
+        side_effect=lambda: regex.search(r"\d+", "114514"),
+    )
+
+    with pytest.raises(RegexBudgetExceeded):
+        factory.create_product(url="https://foo.bar/114514", source="114514")
+
+    def regex_pipe(p: ProductBase) -> ProductBase:
+        regex.sub(r"\d+", "", p.name)
+        return p
+
+    factory._create_product_by_parser = mocker.MagicMock(return_value=product)  # type: ignore
+    factory.add_pipe(regex_pipe, 1)
+    with pytest.raises(RegexBudgetExceeded):
+        factory.create_product(url="https://foo.bar/114514", source="114514")
+
+
+def test_factory_time_budget(mocker: MockerFixture, product: ProductBase):
+    mocker.patch.object(MockStrProductParser, "__abstractmethods__", new_callable=set)
+    factory = MockStrProductFactory(time_budget=0)
+    factory.register_parser("foo.bar", MockStrProductParser)  # type: ignore
+
+    with pytest.raises(ProductTimeout) as exc_info:
+        factory.create_product(url="https://foo.bar/114514", source="114514")
+    assert exc_info.value.url == "https://foo.bar/114514"
+
+    def slow_pipe(p: ProductBase) -> ProductBase:
+        time.sleep(0.02)
+        return p
+
+    factory = MockStrProductFactory(time_budget=0.01)
+    factory.register_parser("foo.bar", MockStrProductParser)  # type: ignore
+    factory._create_product_by_parser = mocker.MagicMock(return_value=product)  # type: ignore
+    factory.add_pipe(slow_pipe, 1)
+    factory.add_pipe(lambda p: p, 2)
+    with pytest.raises(ProductTimeout) as exc_info:
+        factory.create_product(url="https://foo.bar/114514", source="114514")
+    assert exc_info.value.step == slow_pipe.__qualname__
+
+
+def test_factory_field_workers(mocker: MockerFixture, product: ProductBase):
+    mocker.patch.object(MockStrProductParser, "__abstractmethods__", new_callable=set)
+    product.url = "https://foo.bar/114514"
+    values = product.dict()
+    for field, method in PRODUCT_FIELD_PARSERS:
+        mocker.patch.object(
+            MockStrProductParser,
+            method,
+            create=True,
+            side_effect=lambda value=values[field]: value,
+        )
+    factory = MockStrProductFactory(field_workers=2)
+    factory.register_parser("foo.bar", MockStrProductParser)  # type: ignore
+
+    p = factory.create_product(url=product.url, source="114514")
+    assert p == product
+
+    # The budgets are kept in the threads of fields.
+    factory.regex_budget = 0
+    mocker.patch.object(
+        MockStrProductParser,
+        "parse_name",
+        side_effect=lambda: regex.search(r"\d+", "114514"),
+    )
+    with pytest.raises(RegexBudgetExceeded):
+        factory.create_product(url=product.url, source="114514")
+
+
+def test_factory_field_executor():
+    with MockStrProductFactory(field_workers=2) as factory:
+        with ThreadPoolExecutor(8) as executor:
+            executors = set(
+                executor.map(lambda _: factory._get_field_executor(), range(32))
+            )
+        (field_executor,) = executors
+
+    assert factory._field_executor is None
+    with pytest.raises(RuntimeError):
+        field_executor.submit(print)
+
+
+@pytest.mark.parametrize("field_workers", [None, 2])
+def test_factory_multi_locale_product(
+    mocker: MockerFixture, product: ProductBase, field_workers
+):
+    mocker.patch.object(MockStrProductParser, "__abstractmethods__", new_callable=set)
+    mocker.patch.object(
+        MockStrProductParser, "locale_independent_fields", ("images", "jan")
+    )
+    values = product.dict()
+    mocks = {
+        field: mocker.patch.object(
+            MockStrProductParser,
+            method,
+            create=True,
+            side_effect=lambda value=values[field]: value,
+        )
+        for field, method in PRODUCT_FIELD_PARSERS
+    }
+    factory = MockStrProductFactory(field_workers=field_workers)
+    factory.register_parser("foo.bar", MockStrProductParser)  # type: ignore
+    factory.add_pipe(lambda p: p.copy(update={"name": p.name.upper()}), 1)
+
+    result = factory.create_multi_locale_product(
+        {"ja": ("https://foo.bar/ja/1", "ja"), "en": ("https://foo.bar/en/1", "en")}
+    )
+    assert result.locales == ["ja", "en"]
+    assert result.shared_fields == ("images", "jan")
+    assert result["en"].url == "https://foo.bar/en/1"
+    assert result["en"].name == product.name.upper()
+    assert result["en"].images == result["ja"].images == product.images
+    assert mocks["images"].call_count == mocks["jan"].call_count == 1
+    assert mocks["name"].call_count == 2
+
+    with pytest.raises(ValueError):
+        factory.create_multi_locale_product({})
+
+    # The shared values are not aliased between locales.
+    def tag_images(p: ProductBase) -> ProductBase:
+        p.images.append("tagged")
+        return p
+
+    factory.add_pipe(tag_images, 2)
+    result = factory.create_multi_locale_product(
+        {"ja": ("https://foo.bar/ja/1", "ja"), "en": ("https://foo.bar/en/1", "en")}
+    )
+    assert result["en"].images == result["ja"].images == [*product.images, "tagged"]
+    assert result["en"].images is not result["ja"].images
+
+
 def test_general_bs4_factory_creation():
     factory = GeneralBs4ProductFactory.create_factory()
     assert isinstance(factory, GeneralBs4ProductFactory)
+
+
+def test_factory_lazy_parser_registration():
+    factory = MockStrProductFactory()
+    factory.register_parser("foo.bar", f"{__name__}:MockStrProductParser")
+
+    assert isinstance(factory.parser_registration["foo.bar"], str)
+    assert factory.get_parser_by_url("https://foo.bar/114514") is MockStrProductParser
+    assert factory.parser_registration["foo.bar"] is MockStrProductParser
+
+
+def test_general_bs4_factory_imports_parser_lazily():
+    code = (
+        "import sys\n"
+        "from figure_parser import GeneralBs4ProductFactory\n"
+        "factory = GeneralBs4ProductFactory.create_factory()\n"
+        "assert 'bs4' not in sys.modules\n"
+        "factory.get_parser_by_url('https://www.native-web.jp/creators/1/')\n"
+        "assert 'figure_parser.parsers.native' in sys.modules\n"
+        "assert 'figure_parser.parsers.gsc' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_bs4_parser_variants_regions():
+    class NewParser(AbstractBs4ProductParser):
+        regions = (Region("h1"), Region(class_="new"))
+
+    class OldParser(AbstractBs4ProductParser):
+        regions = (Region("h1"), Region(id="old"))
+
+    class Variants(Bs4ParserVariants):
+        variants = ((None, NewParser), (None, OldParser))
+
+    class WholePageVariants(Bs4ParserVariants):
+        variants = ((None, NewParser), (None, AbstractBs4ProductParser))
+
+    assert Variants.regions == (Region("h1"), Region(class_="new"), Region(id="old"))
+    assert WholePageVariants.regions is None
+
+
+def test_bs4_factory_product_creation_from_html(mocker: MockerFixture, tmp_path):
+    class MockBs4ProductParser(AbstractBs4ProductParser):
+        regions = (Region("h1"),)
+
+        @classmethod
+        def create_parser(cls, url: str, source: BeautifulSoup):
+            return cls(source=source)
+
+    mocker.patch.object(MockBs4ProductParser, "__abstractmethods__", new_callable=set)
+    factory = Bs4ProductFactory()
+    factory.register_parser("foo.bar", MockBs4ProductParser)  # type: ignore
+    mock_product_create = mocker.MagicMock()
+    factory.create_product = mock_product_create  # type: ignore
+
+    html = "<html><body><nav>nav</nav><h1>name</h1></body></html>"
+    factory.create_product_from_html(url="https://foo.bar/1", html=html)
+    source = mock_product_create.call_args.kwargs["source"]
+    assert source.select_one("h1") and not source.select_one("nav")
+
+    factory.create_product_from_html(url="https://foo.bar/1", html=html, prune=False)
+    source = mock_product_create.call_args.kwargs["source"]
+    assert source.select_one("nav")
+
+    with pytest.raises(UnregisteredDomain):
+        factory.create_product_from_html(url="https://bar.foo/1", html=html)
+
+    factory.create_product_from_stream(
+        url="https://foo.bar/1", chunks=[html[:20].encode(), html[20:].encode()]
+    )
+    source = mock_product_create.call_args.kwargs["source"]
+    assert source.select_one("h1") and not source.select_one("nav")
+
+    factory.source_cache = SourceCache(tmp_path)
+    factory.create_product_from_html(url="https://foo.bar/1", html=html)
+    source = mock_product_create.call_args.kwargs["source"]
+    assert source.select_one("h1") and not source.select_one("nav")
+    assert list(tmp_path.rglob("*.html"))
+
+
+def test_bs4_factory_stream_budget(mocker: MockerFixture):
+    class MockBs4ProductParser(AbstractBs4ProductParser):
+        regions = (Region("h1"),)
+
+    factory = Bs4ProductFactory(time_budget=0)
+    factory.register_parser("foo.bar", MockBs4ProductParser)  # type: ignore
+    factory.create_product = mocker.MagicMock()  # type: ignore
+
+    with pytest.raises(ProductTimeout):
+        factory.create_product_from_stream(
+            url="https://foo.bar/1", chunks=[b"<h1>name</h1>"]
+        )
+    factory.create_product.assert_not_called()
@@ -0,0 +1,35 @@
+from figure_parser.batch import BatchResult
+from figure_parser.core.models import ProductBase
+from figure_parser.golden import canonical_result, check_golden, golden_path
+
+
+def test_canonical_result(product: ProductBase):
+    record = canonical_result(BatchResult(url=product.url, product=product))
+    assert record["url"] == product.url and record["error"] is None
+    assert "url" not in record["product"]
+    assert isinstance(record["product"]["order_period"]["start"], str)
+
+    record = canonical_result(BatchResult(url="https://foo.bar/1", error="Foo: bar"))
+    assert record == {"url": "https://foo.bar/1", "error": "Foo"}
+
+
+def test_check_golden(product: ProductBase, tmp_path):
+    results = [
+        BatchResult(url=product.url, product=product),
+        BatchResult(url="https://foo.bar/1", error="UnregisteredDomain: foo"),
+    ]
+
+    report = check_golden(results, tmp_path)
+    assert not report.ok
+    assert report.missing == [product.url, "https://foo.bar/1"]
+
+    report = check_golden(results, tmp_path, update=True)
+    assert report.updated == 2
+    assert check_golden(results, tmp_path).ok
+
+    changed = product.copy(update={"name": "changed"})
+    report = check_golden([BatchResult(url=product.url, product=changed)], tmp_path)
+    (mismatch,) = report.mismatches
+    assert mismatch.fields == {"name": (product.name, "changed")}
+    assert report.stale == [golden_path(tmp_path, "https://foo.bar/1")]
+    assert "CHANGED" in report.format()
@@ -0,0 +1,58 @@
+import pytest
+
+from figure_parser.core.parser_base import depends_on, plan_field_levels, shared_field
+
+
+class MockDependentParser:
+    calls = 0
+
+    @shared_field
+    def parse_series(self):
+        self.calls += 1
+        return "series"
+
+    @depends_on("parse_series")
+    def parse_name(self):
+        return f"{self.parse_series()} name"
+
+    @depends_on("_parse_info")
+    def parse_size(self):
+        return 1
+
+    @depends_on("parse_series")
+    def _parse_info(self):
+        return self.parse_series()
+
+    def parse_scale(self):
+        return 8
+
+
+class MockCircularParser:
+    @depends_on("parse_size")
+    def parse_name(self):
+        ...
+
+    @depends_on("parse_name")
+    def parse_size(self):
+        ...
+
+
+def test_shared_field():
+    parser = MockDependentParser()
+    assert parser.parse_name() == "series name"
+    assert parser.parse_series() == "series"
+    assert parser.calls == 1
+
+
+def test_plan_field_levels():
+    levels = plan_field_levels(
+        MockDependentParser, ("parse_name", "parse_size", "parse_scale")
+    )
+
+    # parse_size inherits the dependency of the inline _parse_info.
+    assert levels == (("parse_series", "parse_scale"), ("parse_name", "parse_size"))
+
+
+def test_plan_field_levels_circular_dependencies():
+    with pytest.raises(ValueError):
+        plan_field_levels(MockCircularParser, ("parse_name", "parse_size"))
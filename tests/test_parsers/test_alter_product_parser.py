@@ -4,6 +4,7 @@ from figure_parser.parsers import AlterProductParser
 
 from .test_product_parser import (
     TEST_CASE_DIR,
+    BaseBudgetTestCase,
     BaseTestCase,
     ParserTestTarget,
     get_html,
@@ -33,3 +34,8 @@ class TestAlterParser(BaseTestCase):
             if "pagespeed" in thumbnail:
                 pytest.skip()
         assert thumbnail == target.expected.get("thumbnail")
+
+
+class TestAlterBudget(BaseBudgetTestCase):
+    site = "alter"
+    parser_cls = AlterProductParser
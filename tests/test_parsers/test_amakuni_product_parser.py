@@ -1,9 +1,14 @@
+from datetime import datetime
+
 import pytest
 
+from figure_parser import OrderPeriod
 from figure_parser.parsers import AmakuniProductParser
+from figure_parser.parsers.amakuni.product_parser import _parse_order_period
 
 from .test_product_parser import (
     TEST_CASE_DIR,
+    BaseBudgetTestCase,
     BaseTestCase,
     ParserTestTarget,
     get_html,
@@ -23,3 +28,18 @@ class TestAmakuniParser(BaseTestCase):
             ),
             expected=request.param,
         )
+
+
+class TestAmakuniBudget(BaseBudgetTestCase):
+    site = "amakuni"
+    parser_cls = AmakuniProductParser
+
+
+def test_parse_order_period():
+    period = _parse_order_period("●価格／9,800円●受注期間／2015年12月1日～1月10日")
+    assert period.start == datetime(2015, 12, 1)
+    assert period.end == datetime(2016, 1, 10, 23, 59, 59)
+
+    period = _parse_order_period("●受注期間／2015年3月1日～2015年4月30日©NITRO")
+    assert period.end == datetime(2015, 4, 30, 23, 59, 59)
+    assert _parse_order_period("●発売／2015年8月") == OrderPeriod()
@@ -1,9 +1,11 @@
 import pytest
+from bs4 import BeautifulSoup
 
 from figure_parser.parsers import GscProductParser
 
 from .test_product_parser import (
     TEST_CASE_DIR,
+    BaseBudgetTestCase,
     BaseTestCase,
     ParserTestTarget,
     get_html,
@@ -48,3 +50,48 @@ class TestGSCParser(BaseTestCase):
         assert parse_people(worker6) == ["ナナシ"]
         assert parse_people(worker7) == ["市橋卓也"]
         assert parse_people(worker8) == ["eriko", "雷電"]
+
+
+class TestGSCBudget(BaseBudgetTestCase):
+    site = "gsc"
+    parser_cls = GscProductParser
+
+
+def test_find_label():
+    source = BeautifulSoup(
+        "<div class='itemDetail'><dl>"
+        "<dt>商品名</dt><dd>A</dd>"
+        "<dt>再販価格</dt><dd>11,000円</dd>"
+        "<dt>価格</dt><dd>12,000円</dd>"
+        "<dt>再販</dt><dd>2021年03月</dd>"
+        "<dt>原型<b>制作</b></dt><dd>B</dd>"
+        "</dl></div>"
+        "<div class='itemInfo'><p>※18歳以上<!--推奨--></p><!--18歳以上推奨--></div>",
+        "lxml",
+    )
+    parser = GscProductParser.create_parser(
+        url="https://www.goodsmile.info/ja/product/1", source=source
+    )
+
+    def label_of(text, prefix=False):
+        label = parser._find_label(text, prefix=prefix)
+        return label.text if label else None
+
+    assert label_of("再販") == "再販価格"
+    assert label_of("価格") == "再販価格"
+    assert label_of("価格", prefix=True) == "価格"
+    assert label_of("原型制作") is None
+    assert parser.parse_adult()
+
+    source = BeautifulSoup(
+        "<div class='itemDetail'><dl>"
+        "<dt>Product Name</dt><dd>A</dd>"
+        "<dt>RELEASE DATE</dt><dd>03/2021</dd>"
+        "</dl></div>",
+        "lxml",
+    )
+    parser = GscProductParser.create_parser(
+        url="https://www.goodsmile.info/en/product/1", source=source
+    )
+    assert label_of("Release Date") == "RELEASE DATE"
+    assert label_of("product", prefix=True) == "Product Name"
@@ -0,0 +1,38 @@
+from figure_parser.parsers.images import canonicalize_image_url, canonicalize_image_urls
+
+
+def test_canonicalize_image_url():
+    base_url = "https://foo.bar/product/1"
+    assert canonicalize_image_url("/1.jpg", base_url) == "https://foo.bar/1.jpg"
+    assert canonicalize_image_url("img/1.jpg", base_url) == (
+        "https://foo.bar/product/img/1.jpg"
+    )
+    assert canonicalize_image_url("//CDN.Foo.bar:443/1.jpg#zoom", base_url) == (
+        "https://cdn.foo.bar/1.jpg"
+    )
+    assert canonicalize_image_url(" HTTP://foo.bar:8080/A.jpg?v=1 ") == (
+        "http://foo.bar:8080/A.jpg?v=1"
+    )
+
+
+def test_canonicalize_image_urls():
+    images = canonicalize_image_urls(
+        [
+            "/img/medium/a.jpg",
+            "/img/b.jpg",
+            "/img/large/a.jpg",
+            "/img/thumb/a.jpg",
+            "/img/b.jpg#1",
+            "/img/c-300x200.jpg",
+            "/img/c.jpg",
+            "/img/d-300x200.jpg",
+            "/img/d-150x100.jpg",
+        ],
+        "https://foo.bar/",
+    )
+    assert images == [
+        "https://foo.bar/img/large/a.jpg",
+        "https://foo.bar/img/b.jpg",
+        "https://foo.bar/img/c.jpg",
+        "https://foo.bar/img/d-300x200.jpg",
+    ]
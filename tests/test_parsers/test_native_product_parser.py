@@ -4,6 +4,7 @@ from figure_parser.parsers import NativeProductParser
 
 from .test_product_parser import (
     TEST_CASE_DIR,
+    BaseBudgetTestCase,
     BaseTestCase,
     ParserTestTarget,
     get_html,
@@ -45,3 +46,8 @@ class TestNativeParser(BaseTestCase):
                 pytest.skip("The url is cache url.")
         else:
             super().test_og_image(target)
+
+
+class TestNativeBudget(BaseBudgetTestCase):
+    site = "native"
+    parser_cls = NativeProductParser
@@ -1,22 +1,27 @@
 import os
-import urllib.request
 from dataclasses import dataclass
 from datetime import date, datetime
-from hashlib import md5
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, Mapping, Type, Union
 
 import pytest
 import yaml
 from bs4 import BeautifulSoup
+from bs4.dammit import UnicodeDammit
 from pytest_mock import MockerFixture
 
 from figure_parser import PriceTag, Release
-from figure_parser.parsers.base import AbstractBs4ProductParser
+from figure_parser.core.factory_base import PRODUCT_FIELD_PARSERS
+from figure_parser.parsers.base import AbstractBs4ProductParser, Bs4ParserVariants
+from figure_parser.parsers.regions import make_source
+from figure_parser.parsers.streaming import stream_source
 from figure_parser.pipes.sorting import _sort_release
+from figure_parser.profiling import measure_heap
+from figure_parser.store import PageStore
 
 THIS_DIR = Path(os.path.dirname(__file__)).resolve()
 TEST_CASE_DIR = THIS_DIR.joinpath("product_case")
+PAGE_STORE = PageStore(TEST_CASE_DIR.joinpath("pages"))
 
 
 @dataclass
@@ -25,6 +30,12 @@ class ParserTestTarget:
     expected: Mapping
 
 
+@dataclass
+class RecordedPage:
+    url: str
+    html: Union[str, bytes]
+
+
 def load_yaml(path):
     with open(path, "r", encoding="utf-8") as stream:
         sth = yaml.safe_load(stream)
@@ -33,28 +44,8 @@ def load_yaml(path):
 
 
 def get_html(url: str, headers={}, cookies={}) -> BeautifulSoup:
-    m = md5()
-    m.update(url.encode("utf-8"))
-    hash_name = m.hexdigest()
-
-    html_dir = THIS_DIR.joinpath("product_case", "html")
-    html_dir.mkdir(exist_ok=True)
-
-    html_path = html_dir.joinpath(f"{hash_name}.html")
-    if html_path.exists():
-        with open(html_path, "r", encoding="utf-8") as html:
-            page = BeautifulSoup(html, "lxml")
-
-    else:
-        with open(html_path, "w", encoding="utf-8") as html:
-            cookies_value = ",".join([f"{k}={v}" for k, v in cookies.items()])
-            req = urllib.request.Request(url=url, headers=headers)
-            req.add_header("Cookie", cookies_value)
-            content = urllib.request.urlopen(req).read()
-            page = BeautifulSoup(content, "lxml")
-            html.write(str(page))
-
-    return page
+    page = PAGE_STORE.fetch(url, headers=headers, cookies=cookies)
+    return BeautifulSoup(PAGE_STORE.read(page), "lxml")
 
 
 class BaseTestCase:
@@ -178,6 +169,77 @@ class BaseTestCase:
         assert jan == expected_jan
 
 
+def load_recorded_pages(test_case_name: str) -> list[RecordedPage]:
+    """The recorded pages of test cases, the pages not recorded yet are skipped."""
+    pages = []
+    for case in load_yaml(TEST_CASE_DIR.joinpath(f"{test_case_name}.yml")):
+        stored = PAGE_STORE.get(case["url"])
+        if stored and stored.size:
+            pages.append(RecordedPage(url=case["url"], html=PAGE_STORE.read(stored)))
+    return pages
+
+
+class BaseBudgetTestCase:
+    """
+    Keep the heap of parsing the recorded pages of site under the budgets,
+    and the pruned or streamed source equivalent to the whole page.
+    See `benchmarks.parsers` for the parse rate.
+    """
+
+    site: str
+    """The name of test cases."""
+    parser_cls: Type[Union[AbstractBs4ProductParser, Bs4ParserVariants]]
+    peak_budget = 16 * 2**20
+    """The peak of heap while parsing a page in bytes."""
+    retained_budget = 256 * 2**10
+    """The heap retained by parsing a page again in bytes."""
+
+    @pytest.fixture(scope="class")
+    def pages(self) -> list[RecordedPage]:
+        pages = load_recorded_pages(self.site)
+        if not pages:
+            pytest.skip("No recorded page, run the parser tests first.")
+        return pages
+
+    def parse_fields(self, url: str, source: BeautifulSoup) -> dict[str, Any]:
+        parser = self.parser_cls.create_parser(url=url, source=source)
+        return {
+            field: getattr(parser, method)() for field, method in PRODUCT_FIELD_PARSERS
+        }
+
+    def parse_page(self, page: RecordedPage) -> dict[str, Any]:
+        """Build the pruned soup of page and parse all the fields."""
+        return self.parse_fields(
+            page.url, make_source(page.html, self.parser_cls.regions)
+        )
+
+    def test_memory_budget(self, pages: list[RecordedPage]):
+        for page in pages:
+            self.parse_page(page)
+            usage = measure_heap(lambda: self.parse_page(page))
+            assert usage.peak < self.peak_budget, page.url
+            assert usage.retained < self.retained_budget, page.url
+
+    def test_pruned_source(self, pages: list[RecordedPage]):
+        """The pruned source must give the same fields as the whole page."""
+        for page in pages:
+            expected = self.parse_fields(page.url, BeautifulSoup(page.html, "lxml"))
+            assert self.parse_page(page) == expected, page.url
+
+    def test_stream_source(self, pages: list[RecordedPage]):
+        """Streaming the page must keep the same regions as pruning it."""
+        parser_cls = self.parser_cls
+        for page in pages:
+            html = page.html
+            if isinstance(html, bytes):
+                html = UnicodeDammit(html, is_html=True).unicode_markup
+            data = html.encode("utf-8")
+            chunks = (data[i : i + 4096] for i in range(0, len(data), 4096))
+            source = stream_source(chunks, parser_cls.regions, encoding="utf-8")
+            expected = make_source(html, parser_cls.regions)
+            assert str(source) == str(expected), page.url
+
+
 class MockStrProductParser(AbstractBs4ProductParser):
     ...
 
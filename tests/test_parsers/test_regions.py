@@ -0,0 +1,59 @@
+from bs4 import BeautifulSoup
+
+from figure_parser.parsers.regions import (
+    HEAD_META_REGIONS,
+    Region,
+    extract_regions,
+    make_source,
+)
+
+HTML = """
+<html>
+<head>
+    <meta content="https://foobar.com/og.jpg" property="og:image"/>
+    <script>var foo = "bar";</script>
+</head>
+<body>
+    <nav><a href="/">home</a></nav>
+    <div id="contents">
+        <h1>Name</h1>
+        <div class="spec detail"><span>1/7</span></div>
+    </div>
+    <div class="detail"><a rel="lightbox[01]" href="/1.jpg">image</a></div>
+    <footer><p class="copyright">© foo</p></footer>
+</body>
+</html>
+"""
+
+
+def test_region_xpath():
+    assert Region("div", class_="detail").to_xpath() == (
+        "//div[contains(concat(' ', normalize-space(@class), ' '), ' detail ')]"
+    )
+    assert Region(id="contents").to_xpath() == "//*[@id='contents']"
+    assert Region("a", attrs=(("rel", "lightbox[01]"),)).to_xpath() == (
+        "//a[@rel='lightbox[01]']"
+    )
+
+
+def test_extract_regions():
+    regions = (Region(id="contents"), Region(class_="detail"), *HEAD_META_REGIONS)
+    extracted = extract_regions(HTML, regions)
+    assert extracted
+
+    source = BeautifulSoup(extracted, "lxml")
+    assert source.select_one("meta[property='og:image']")
+    assert source.select_one("#contents h1")
+    # nested match is kept once.
+    assert len(source.select(".spec")) == 1
+    assert source.select_one("[rel='lightbox[01]']")
+    assert not source.select_one("nav")
+    assert not source.select_one("script")
+    assert not source.select_one(".copyright")
+
+
+def test_make_source():
+    assert make_source(HTML).select_one("nav")
+    assert not make_source(HTML.encode("utf-8"), (Region("h1"),)).select_one("nav")
+    # fallback to the whole page.
+    assert make_source("", (Region("h1"),)) is not None
@@ -0,0 +1,78 @@
+import json
+import re
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from figure_parser.parsers.site_data import CACHE_DIR_ENV, load_site_data
+
+SITE_DATA_YAML = """
+en:
+  series: Series
+  release_date_pattern: (?P<year>\\d+)
+  seasons:
+    spring: 3
+  keywords:
+    - foo
+    - bar
+"""
+
+
+@pytest.fixture
+def site_data_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path.joinpath("cache")))
+    load_site_data.cache_clear()
+    path = tmp_path.joinpath("site.yml")
+    path.write_text(SITE_DATA_YAML, encoding="utf-8")
+    yield path
+    load_site_data.cache_clear()
+
+
+def test_site_data_is_compiled_and_frozen(site_data_path: Path):
+    data = load_site_data(site_data_path)
+
+    assert data["en"]["series"] == "Series"
+    assert isinstance(data["en"]["release_date_pattern"], re.Pattern)
+    assert data["en"]["keywords"] == ("foo", "bar")
+
+    with pytest.raises(TypeError):
+        data["en"]["seasons"]["spring"] = 4  # type: ignore
+
+
+def test_site_data_cache(site_data_path: Path):
+    cache_dir = site_data_path.parent.joinpath("cache")
+
+    load_site_data(site_data_path)
+    caches = list(cache_dir.glob("site-*.json"))
+    assert len(caches) == 1
+
+    load_site_data.cache_clear()
+    assert load_site_data(site_data_path)["en"]["seasons"]["spring"] == 3
+
+    site_data_path.write_text(
+        SITE_DATA_YAML.replace("spring: 3", "spring: 4"), encoding="utf-8"
+    )
+    load_site_data.cache_clear()
+    assert load_site_data(site_data_path)["en"]["seasons"]["spring"] == 4
+    assert len(list(cache_dir.glob("site-*.json"))) == 2
+
+
+def test_site_data_without_cache(site_data_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv(CACHE_DIR_ENV, "")
+    assert load_site_data(site_data_path)["en"]["series"] == "Series"
+    assert not site_data_path.parent.joinpath("cache").exists()
+
+
+def test_site_data_cache_is_plain_data(site_data_path: Path):
+    load_site_data(site_data_path)
+    (cache,) = site_data_path.parent.joinpath("cache").glob("site-*.json")
+    assert json.loads(cache.read_text("utf-8"))["en"]["release_date_pattern"] == (
+        "(?P<year>\\d+)"
+    )
+
+    cache.write_text('{"en": {"series": "Cached", "title_pattern": "\\\\d+"}}')
+    load_site_data.cache_clear()
+    data = load_site_data(site_data_path)
+    assert data["en"]["series"] == "Cached"
+    assert isinstance(data["en"]["title_pattern"], re.Pattern)
@@ -0,0 +1,36 @@
+from figure_parser.parsers.regions import Region, make_source
+from figure_parser.parsers.source_cache import SourceCache
+
+HTML = """
+<html>
+<body>
+    <nav><a href="/">home</a></nav>
+    <div id="contents"><h1>名前</h1></div>
+</body>
+</html>
+"""
+REGIONS = (Region(id="contents"),)
+
+
+def test_source_cache(tmp_path):
+    cache = SourceCache(tmp_path)
+    path = cache.snapshot_path(HTML, REGIONS)
+    assert not path.exists()
+
+    source = cache.make_source(HTML.encode("utf-8"), REGIONS)
+    assert path.exists()
+    assert str(source) == str(make_source(HTML, REGIONS))
+
+    # The snapshot is used on later runs.
+    path.write_text('<div id="contents"><h1>cached</h1></div>', "utf-8")
+    assert cache.make_source(HTML, REGIONS).h1.text == "cached"  # type: ignore
+
+    # Other regions are cached separately.
+    other_path = cache.snapshot_path(HTML, (Region("nav"),))
+    assert other_path != path
+
+
+def test_source_cache_whole_page(tmp_path):
+    cache = SourceCache(tmp_path)
+    assert cache.make_source(HTML).nav is not None
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,82 @@
+from typing import Iterator, List
+
+from figure_parser.parsers.regions import Region, make_source
+from figure_parser.parsers.streaming import RegionStream, stream_source
+
+HTML = """
+<html>
+<head><meta content="https://foobar.com/og.jpg" property="og:image"/></head>
+<body>
+    <nav><a href="/">home</a></nav>
+    <div id="contents"><h1>Name</h1><p class="resale">再販</p></div>
+    <img class="itemImg" src="/1.jpg"/>
+    <img class="itemImg" src="/2.jpg"/>
+    <p class="copyright">© foo</p>
+    <div class="related">%s</div>
+</body>
+</html>
+""" % (
+    "<p>related</p>" * 1000
+)
+
+REGIONS = (
+    Region(id="contents"),
+    Region("meta", attrs=(("property", "og:image"),), optional=True),
+    Region(class_="itemImg", optional=True),
+)
+
+
+def chunked(html: str, size: int = 64) -> Iterator[bytes]:
+    data = html.encode("utf-8")
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def record(chunks: Iterator[bytes], consumed: List[bytes]) -> Iterator[bytes]:
+    for chunk in chunks:
+        consumed.append(chunk)
+        yield chunk
+
+
+def test_stream_keeps_trailing_optional_regions():
+    consumed: List[bytes] = []
+    source = stream_source(
+        record(chunked(HTML), consumed), regions=REGIONS, encoding="utf-8"
+    )
+
+    assert b"".join(consumed) == HTML.encode("utf-8")
+    assert source.select_one("#contents h1").text == "Name"  # type: ignore
+    assert source.select_one(".resale")
+    assert source.select_one("meta[property='og:image']")
+    assert [img["src"] for img in source.select(".itemImg")] == ["/1.jpg", "/2.jpg"]
+    assert not source.select_one("nav")
+    assert str(source) == str(make_source(HTML, REGIONS))
+
+
+def test_stream_stops_after_terminal_region():
+    regions = (*REGIONS, Region(class_="copyright", terminal=True))
+    consumed: List[bytes] = []
+    source = stream_source(
+        record(chunked(HTML), consumed), regions=regions, encoding="utf-8"
+    )
+
+    assert sum(len(c) for c in consumed) < len(HTML.encode("utf-8")) / 2
+    assert len(source.select(".itemImg")) == 2
+    assert source.select_one(".copyright")
+    assert not source.select_one(".related")
+    assert str(source) == str(make_source(HTML, regions))
+
+
+def test_stream_with_optional_regions_only():
+    stream = RegionStream((Region(class_="related", optional=True),))
+    for chunk in chunked(HTML):
+        assert not stream.feed(chunk)
+
+    source = stream.to_source()
+    assert len(source.select(".related > p")) == 1000
+    assert stream.done
+
+
+def test_stream_without_regions():
+    source = stream_source(chunked(HTML))
+    assert source.select_one("nav")
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from figure_parser.core.factory_base import GenericProductFactory
+from figure_parser.core.models import ProductBase
+from figure_parser.core.pipeline import (
+    FieldPipe,
+    FusedFieldPipe,
+    compile_pipes,
+    declare_fields,
+    get_declared_fields,
+)
+from figure_parser.pipes import (
+    normalize_general_fields,
+    normalize_worker_fields,
+    sort_releases,
+)
+
+upper_name = FieldPipe(str.upper, ["name"])
+strip_sculptors = FieldPipe(str.strip, ["sculptors", "paintworks"])
+
+
+@declare_fields(reads=["name"], writes=["name"])
+def suffix_name(product: ProductBase) -> ProductBase:
+    product.name += " Ver."
+    return product
+
+
+def test_field_pipe(product: ProductBase):
+    product.name = "foo"
+    product.sculptors = [" foo ", "bar "]
+    product.size = 1
+
+    assert upper_name(product).name == "FOO"
+    assert strip_sculptors(product).sculptors == ["foo", "bar"]
+    assert get_declared_fields(upper_name) == ({"name"}, {"name"})
+    assert get_declared_fields(lambda p: p) is None
+
+
+def test_compile_pipes_fuses_field_pipes():
+    stages = compile_pipes([upper_name, sort_releases, strip_sculptors])
+
+    assert len(stages) == 2
+    assert isinstance(stages[0], FusedFieldPipe)
+    assert stages[0].pipes == (upper_name, strip_sculptors)
+    assert stages[1] is sort_releases
+
+
+def test_compile_pipes_keeps_dependencies():
+    # suffix_name writes name, upper_name can't be moved before it.
+    assert compile_pipes([upper_name, suffix_name, upper_name]) == [
+        upper_name,
+        suffix_name,
+        upper_name,
+    ]
+
+    def undeclared(p: ProductBase) -> ProductBase:
+        return p
+
+    assert compile_pipes([upper_name, undeclared, strip_sculptors]) == [
+        upper_name,
+        undeclared,
+        strip_sculptors,
+    ]
+
+
+def test_fused_pipes_are_equivalent(product: ProductBase):
+    product.name = "ＫＡＤＯＫＡＷＡ  ’19’"
+    product.sculptors = ["Master(HW)", "Newbie［NW］"]
+    pipes = [normalize_general_fields, normalize_worker_fields, sort_releases]
+
+    expected = product.copy(deep=True)
+    for pipe in pipes:
+        expected = pipe(expected)
+
+    stages = compile_pipes(pipes)
+    assert len(stages) == 2
+    for stage in stages:
+        product = stage(product)
+    assert product == expected
+    assert product.sculptors == ["Master (HW)", "Newbie (NW)"]
+
+
+def test_factory_pipe_stages(product: ProductBase):
+    factory: GenericProductFactory = GenericProductFactory()
+    factory.add_pipes((normalize_worker_fields, 2), (normalize_general_fields, 1))
+    (stage,) = factory.pipe_stages
+    assert stage.__qualname__ == "normalize_general_fields+normalize_worker_fields"
+
+    factory.add_pipe(suffix_name, 3)
+    assert len(factory.pipe_stages) == 2
+
+    products = [product.copy(deep=True) for _ in range(4)]
+    with ThreadPoolExecutor(2) as executor:
+        processed = factory.process_products_with_pipes(products, executor)
+    assert all(p.name.endswith(" Ver.") for p in processed)
@@ -0,0 +1,140 @@
+import io
+import re
+from collections import Counter
+
+from bs4 import BeautifulSoup
+
+from figure_parser import regex
+from figure_parser.core.models import OrderPeriod
+from figure_parser.factories import Bs4ProductFactory
+from figure_parser.parsers.base import AbstractBs4ProductParser
+from figure_parser.profiling import measure_heap, profile_pages
+
+
+class MockProfiledParser(AbstractBs4ProductParser):
+    @classmethod
+    def create_parser(cls, url: str, source: BeautifulSoup):
+        return cls(source=source)
+
+    def parse_name(self):
+        return self.source.select_one("h1").text.strip()
+
+    def parse_scale(self):
+        scale = re.search(r"1/(\d+)", self.source.text)
+        return int(scale.group(1)) if scale else None
+
+    def parse_manufacturer(self):
+        return "foo"
+
+    def parse_category(self):
+        return "figure"
+
+    def parse_rerelease(self):
+        return False
+
+    def parse_adult(self):
+        return False
+
+    def parse_order_period(self):
+        return OrderPeriod()
+
+    def parse_releases(self):
+        return []
+
+    def parse_prices(self):
+        return []
+
+    def parse_release_dates(self):
+        return []
+
+    def parse_sculptors(self):
+        return []
+
+    def parse_paintworks(self):
+        return []
+
+    def parse_images(self):
+        return []
+
+    def parse_size(self):
+        return None
+
+    def parse_series(self):
+        series = regex.search(r"Series: (\w+)", self.source.text)
+        return series.group(1) if series else None
+
+    def parse_copyright(self):
+        return None
+
+    def parse_releaser(self):
+        return None
+
+    def parse_distributer(self):
+        return None
+
+    def parse_JAN(self):
+        return None
+
+    def parse_thumbnail(self):
+        return None
+
+    def parse_og_image(self):
+        return None
+
+
+def upper_name(product):
+    return product.copy(update={"name": product.name.upper()})
+
+
+def test_profile_pages():
+    factory = Bs4ProductFactory(regex_budget=10)
+    factory.register_parser("foo.bar", MockProfiledParser)  # type: ignore
+    factory.add_pipe(upper_name, 1)
+
+    pages = [
+        ("https://foo.bar/1", "<html><body><h1>name</h1><p>1/7</p></body></html>"),
+        ("https://foo.bar/2", "<html><body><h1>name</h1></body></html>"),
+        ("https://bar.foo/1", "<html></html>"),
+    ]
+    report = profile_pages(pages, factory=factory)
+
+    assert report.pages == {"MockProfiledParser": 2, "<unregistered>": 1}
+    assert report.errors["<unregistered>"] == 1
+    assert ("MockProfiledParser", "parse_name") in report.fields
+    assert ("MockProfiledParser", "parse_scale") in report.fields
+    assert "upper_name" in report.pipes
+
+    call_sites: Counter = Counter()
+    for call_site, count in report.call_counts.items():
+        call_sites[call_site.split(" @ ")[0]] += count
+    assert call_sites["bs4.element.select_one"] == 2
+    assert call_sites["re.search"] == 4
+    # The calls through `figure_parser.regex` are reported at the parser.
+    regex_lines = {
+        call_site.rsplit(":", 1)[1]
+        for call_site in report.call_counts
+        if call_site.startswith("re.search @ tests/test_profiling.py:")
+        or call_site.startswith(f"re.search @ {__file__}:")
+    }
+    assert len(regex_lines) == 2
+
+    stream = io.StringIO()
+    report.write_collapsed(stream)
+    lines = stream.getvalue().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("parse_name" in line for line in lines)
+
+    table = report.format_top(5)
+    assert "MockProfiledParser.parse_name" in table
+
+
+def test_measure_heap():
+    kept = []
+
+    def allocate():
+        kept.append(bytearray(2**20))
+        bytearray(2**20)
+
+    usage = measure_heap(allocate)
+    assert usage.peak >= 2 * 2**20
+    assert 2**20 <= usage.retained < 2 * 2**20
@@ -0,0 +1,66 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+import pytest
+
+from figure_parser import regex
+from figure_parser.exceptions import RegexBudgetExceeded
+
+
+def test_regex_without_budget():
+    assert regex.get_budget() is None
+    assert regex.search(r"\d+", "abc123").group() == "123"  # type: ignore
+    assert regex.sub(pattern=r"\d", repl="", string="a1b2") == "ab"
+    assert regex.split(pattern=r"・", string="a・b") == ["a", "b"]
+    assert [m.group() for m in regex.finditer(r"\d", "1a2")] == ["1", "2"]
+
+
+def test_regex_budget_is_metered():
+    with regex.regex_budget(10) as budget:
+        assert budget is regex.get_budget()
+        regex.findall(r"\d", "1a2")
+        assert [m.group() for m in regex.finditer(r"\d", "1a2")] == ["1", "2"]
+        assert budget and budget.calls == 2 and budget.spent > 0
+    assert regex.get_budget() is None
+
+    with regex.regex_budget(None) as budget:
+        assert budget is None
+
+
+def test_regex_budget_exceeded():
+    with pytest.raises(RegexBudgetExceeded):
+        with regex.regex_budget(0):
+            regex.search(r"\d+", "114514")
+
+
+def test_regex_budget_interrupts_catastrophic_backtracking():
+    with pytest.raises(RegexBudgetExceeded):
+        with regex.regex_budget(0.05):
+            regex.match(r"(a+)+$", "a" * 64 + "!")
+
+
+def test_regex_budget_in_thread():
+    errors = []
+
+    def run():
+        try:
+            with regex.regex_budget(0.01) as budget:
+                assert budget
+                budget.spent = 0.02
+                regex.search(r"\d+", "114514")
+        except RegexBudgetExceeded as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert errors
+
+
+def test_regex_budget_shared_by_threads():
+    with regex.regex_budget(60) as budget:
+        with ThreadPoolExecutor(8) as executor:
+            for _ in range(4000):
+                executor.submit(copy_context().run, regex.search, r"\d+", "114514")
+    assert budget and budget.calls == 4000
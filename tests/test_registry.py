@@ -0,0 +1,92 @@
+from importlib.metadata import EntryPoint
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from figure_parser import GeneralBs4ProductFactory
+from figure_parser.parsers.site_data import CACHE_DIR_ENV
+from figure_parser.registry import (
+    BUILTIN_MANIFEST_PATH,
+    clear_registration_cache,
+    collect_parser_registrations,
+    discover_entry_point_parsers,
+    load_parser_manifest,
+)
+
+
+@pytest.fixture
+def manifest_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv(CACHE_DIR_ENV, "")
+    path = tmp_path.joinpath("manifest.yml")
+    path.write_text("foo.bar: private_parsers.foo:FooProductParser\n")
+    return path
+
+
+@pytest.fixture
+def entry_points(mocker: MockerFixture):
+    clear_registration_cache()
+    yield mocker.patch(
+        "figure_parser.registry._entry_points",
+        return_value=[
+            EntryPoint(
+                name="baz.net",
+                value="private_parsers.baz:BazProductParser",
+                group="figure_parser.parsers",
+            )
+        ],
+    )
+
+
+def test_builtin_manifest():
+    manifest = load_parser_manifest(BUILTIN_MANIFEST_PATH)
+    assert manifest["goodsmile.info"] == "figure_parser.parsers.gsc:GscProductParser"
+
+
+def test_entry_point_discovery(entry_points):
+    assert discover_entry_point_parsers() == {
+        "baz.net": "private_parsers.baz:BazProductParser"
+    }
+
+
+def test_collect_parser_registrations(manifest_path: Path, entry_points):
+    registrations = collect_parser_registrations(manifests=[manifest_path])
+    assert registrations == {
+        "foo.bar": "private_parsers.foo:FooProductParser",
+        "baz.net": "private_parsers.baz:BazProductParser",
+    }
+
+    registrations = collect_parser_registrations(
+        manifests=[manifest_path], entry_point_group=None
+    )
+    assert "baz.net" not in registrations
+
+
+def test_collect_parser_registrations_is_cached(manifest_path: Path, entry_points):
+    registrations = collect_parser_registrations(manifests=[manifest_path])
+    registrations["foo.bar"] = "mutated"
+
+    assert collect_parser_registrations(manifests=[manifest_path])["foo.bar"] == (
+        "private_parsers.foo:FooProductParser"
+    )
+    GeneralBs4ProductFactory.create_factory(manifests=[manifest_path])
+    assert entry_points.call_count == 1
+
+    clear_registration_cache()
+    collect_parser_registrations(manifests=[manifest_path])
+    assert entry_points.call_count == 2
+
+
+def test_factory_with_plugins(manifest_path: Path, entry_points):
+    factory = GeneralBs4ProductFactory.create_factory(
+        manifests=[BUILTIN_MANIFEST_PATH, manifest_path]
+    )
+    for domain in ("goodsmile.info", "foo.bar", "baz.net"):
+        assert domain in factory.parser_registration
+
+    # the parsers are not imported until they are requested.
+    assert factory.parser_registration["foo.bar"] == (
+        "private_parsers.foo:FooProductParser"
+    )
+    with pytest.raises(ModuleNotFoundError):
+        factory.get_parser_by_url("https://foo.bar/114514")
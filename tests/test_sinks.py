@@ -0,0 +1,73 @@
+import io
+import json
+from datetime import date
+
+import pytest
+
+from figure_parser.batch import BatchResult
+from figure_parser.core.models import OrderPeriod, ProductBase, Release
+from figure_parser.sinks import JsonLinesSink, open_sink
+
+
+@pytest.fixture
+def results():
+    product = ProductBase(
+        url="https://foo.bar/1",
+        name="foo",
+        manufacturer="bar",
+        category="figure",
+        rerelease=False,
+        adult=False,
+        images=["https://foo.bar/1.jpg"],
+        sculptors=[],
+        paintworks=[],
+        releases=[Release(release_date=date(2022, 1, 1), price=100)],
+        order_period=OrderPeriod(),
+    )
+    return [
+        BatchResult(url=product.url, product=product),
+        BatchResult(url="https://foo.bar/2", error="FailedToCreateProduct: foo"),
+        BatchResult(
+            url="https://foo.bar/3",
+            error="RegexBudgetExceeded: foo",
+            error_info={"step": "parse_name", "limit": 1},
+        ),
+    ]
+
+
+def test_jsonl_sink(results):
+    stream = io.StringIO()
+    with JsonLinesSink(stream) as sink:
+        for result in results:
+            sink.write(result)
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert records[0]["name"] == "foo"
+    assert records[0]["releases"][0]["release_date"] == "2022-01-01"
+    assert records[1] == {
+        "url": "https://foo.bar/2",
+        "error": "FailedToCreateProduct: foo",
+    }
+
+
+def test_parquet_sink(results, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "products.parquet"
+    with open_sink(path) as sink:
+        for result in results:
+            sink.write(result)
+
+    table = pq.read_table(path)
+    assert table.column("name").to_pylist() == ["foo", None, None]
+    assert table.column("releases").to_pylist()[0][0]["price"] == 100
+    error_info = table.column("error_info").to_pylist()
+    assert error_info[:2] == [None, None]
+    assert json.loads(error_info[2]) == {"step": "parse_name", "limit": 1}
+
+
+def test_open_sink_invalid_output():
+    with pytest.raises(ValueError):
+        open_sink("-", "parquet")
+
+    with pytest.raises(ValueError):
+        open_sink("-", "csv")
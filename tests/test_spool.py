@@ -0,0 +1,28 @@
+import pytest
+
+from figure_parser.spool import SPOOL_MAGIC, SpoolWriter, map_spool, read_page
+
+
+def test_spool_round_trip(tmp_path):
+    path = tmp_path / "pages.spool"
+    with SpoolWriter(path) as writer:
+        ref_1 = writer.write("https://foo.bar/1", "<h1>フィギュア</h1>")
+        ref_2 = writer.write("https://foo.bar/2", b"<h1>raw</h1>")
+        ref_3 = writer.write("https://foo.bar/3", "<h1>sjis</h1>", encoding="shift_jis")
+
+    assert ref_1.encoding == "utf-8"
+    assert ref_2.encoding is None
+    assert ref_1.offset > len(SPOOL_MAGIC)
+
+    with map_spool(path) as mapped:
+        assert read_page(mapped, ref_1) == "<h1>フィギュア</h1>"
+        assert read_page(mapped, ref_2) == b"<h1>raw</h1>"
+        assert read_page(mapped, ref_3) == "<h1>sjis</h1>"
+
+
+def test_map_spool_rejects_other_files(tmp_path):
+    path = tmp_path / "pages.html"
+    path.write_bytes(b"<html></html>")
+
+    with pytest.raises(ValueError):
+        map_spool(path)
@@ -0,0 +1,61 @@
+import pytest
+
+from figure_parser.archive import iter_records
+from figure_parser.store import OFFLINE_ENV, PageStore, is_page_store
+
+
+def test_page_store(tmp_path):
+    store = PageStore(tmp_path / "pages")
+    page = store.put(
+        "https://foo.bar/1",
+        "<h1>フィギュア</h1>".encode("shift_jis"),
+        status=200,
+        headers={"Content-Type": "text/html; charset=Shift_JIS"},
+    )
+    # The same content is stored once.
+    store.put("https://foo.bar/2", "<h1>フィギュア</h1>".encode("shift_jis"))
+
+    assert is_page_store(tmp_path / "pages")
+    assert page.encoding == "Shift_JIS"
+    assert store.read("https://foo.bar/1").decode("shift_jis") == "<h1>フィギュア</h1>"
+    assert len(list((tmp_path / "pages" / "objects").rglob("*.gz"))) == 1
+
+    # Other stores see the pages from the index.
+    other = PageStore(tmp_path / "pages")
+    assert "https://foo.bar/2" in other
+    assert other.get("https://foo.bar/1") == page
+    assert [url for url, _ in iter_records(tmp_path / "pages")] == [
+        "https://foo.bar/1",
+        "https://foo.bar/2",
+    ]
+
+
+def test_page_store_latest_entry_wins(tmp_path):
+    store = PageStore(tmp_path)
+    store.put("https://foo.bar/1", b"old")
+    store.put("https://foo.bar/1", b"new")
+    with open(store.index_path, "ab") as f:
+        f.write(b'{"url": "https://foo.bar/2", "dig')
+
+    other = PageStore(tmp_path)
+    assert len(other) == 1
+    assert other.read("https://foo.bar/1") == b"new"
+
+    other.compact()
+    assert len(store.index_path.read_text().splitlines()) == 1
+    assert store.read("https://foo.bar/1") == b"new"
+
+
+def test_page_store_offline(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    store = PageStore(tmp_path)
+    store.put("https://foo.bar/1", b"<h1>1</h1>")
+
+    monkeypatch.setenv(OFFLINE_ENV, "1")
+    assert store.fetch("https://foo.bar/1").size == 10
+    with pytest.raises(KeyError):
+        store.fetch("https://foo.bar/2")
+
+
+def test_page_store_invalid_codec(tmp_path):
+    with pytest.raises(ValueError):
+        PageStore(tmp_path, codec="lz4")
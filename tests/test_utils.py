@@ -1,7 +1,9 @@
 import pytest
+from bs4 import BeautifulSoup
 from faker import Faker
 
 from figure_parser.parsers.utils import (
+    index_description_list,
     make_last_element_filler,
     price_parse,
     scale_parse,
@@ -51,3 +53,22 @@ def test_last_element_filler():
     list_to_fill = [1, 2, 3]
     list_to_fill.extend(make_last_element_filler(list_to_fill, 5))
     assert list_to_fill == [1, 2, 3, 3, 3]
+
+
+def test_description_list_index():
+    html = """
+    <dl>
+        <dt>Price</dt><dd>100</dd>
+        <dd>stray</dd>
+        <dt>Lonely</dt>
+        <dt> Size </dt>
+        <dd>10cm</dd>
+        <dt>Price</dt><dd>200</dd>
+    </dl>
+    """
+    index = index_description_list(BeautifulSoup(html, "lxml"))
+
+    assert {key: dd.text for key, dd in index.items()} == {
+        "Price": "100",
+        "Size": "10cm",
+    }